@@ -0,0 +1,121 @@
+"""
+Regression check between two benchmark result files (benchmarks/run.py).
+
+Records are matched on (stage, model, scale, width). For every compared
+metric, the relative change is signed so that positive means worse (slower,
+bigger, lower throughput); a regression is a change above the threshold
+that is also larger, in absolute terms, than the noise floor of the metric's
+unit (e.g. a few milliseconds on a tiny fit are ignored).
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(os.path.abspath("."))
+
+import yaml
+
+# Compared metrics: unit (key of regression.noise_floor) and direction.
+COMPARED_METRICS: Dict[str, Tuple[str, str]] = {
+    "save_time_s": ("s", "lower"),
+    "load_time_s": ("s", "lower"),
+    "search_time_s": ("s", "lower"),
+    "mean_candidate_fit_s": ("s", "lower"),
+    "throughput_rows_per_s": ("rows_per_s", "higher"),
+    "latency_p50_ms": ("ms", "lower"),
+    "latency_p95_ms": ("ms", "lower"),
+    "peak_rss_mb": ("mb", "lower"),
+    "import_time_ms": ("import_ms", "lower"),
+}
+
+
+def _key(record: Dict[str, Any]) -> Tuple:
+    return record["stage"], record["model"], record["scale"], record["width"]
+
+
+def compare_results(
+    baseline: Dict[str, Any], current: Dict[str, Any], regression_cfg: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    One row per metric present in both runs, with its relative change
+    (positive = worse) and whether it is a regression.
+    """
+    threshold = regression_cfg.get("threshold", 0.2)
+    floors = regression_cfg.get("noise_floor", {})
+    base_records = {_key(r): r for r in baseline["records"]}
+
+    rows = []
+    for record in current["records"]:
+        base = base_records.get(_key(record))
+        if base is None:
+            continue
+        for metric, (unit, direction) in COMPARED_METRICS.items():
+            if metric not in record["metrics"] or metric not in base["metrics"]:
+                continue
+            old, new = float(base["metrics"][metric]), float(record["metrics"][metric])
+            if old == 0:
+                continue
+            change = (new - old) / old if direction == "lower" else (old - new) / old
+            rows.append({
+                "stage": record["stage"],
+                "model": record["model"],
+                "scale": record["scale"],
+                "width": record["width"],
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": change,
+                "regression": change > threshold and abs(new - old) > floors.get(unit, 0.0),
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], only_regressions: bool = False) -> None:
+    shown = [r for r in rows if r["regression"]] if only_regressions else rows
+    print(
+        f"{'stage':<9} {'model':<24} {'scale':>5} {'width':>5} {'metric':<22} "
+        f"{'baseline':>12} {'current':>12} {'change':>8}"
+    )
+    for r in shown:
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(
+            f"{r['stage']:<9} {str(r['model'] or '-'):<24} {str(r['scale'] or '-'):>5} "
+            f"{str(r['width'] or '-'):>5} {r['metric']:<22} "
+            f"{r['baseline']:>12.4g} {r['current']:>12.4g} {r['change']:>+8.1%}{flag}"
+        )
+    n_regressions = sum(r["regression"] for r in rows)
+    print(f"{n_regressions} regression(s) over {len(rows)} compared metrics.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a benchmark run with a baseline.")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold", type=float, help="Override regression.threshold of benchmarks/config.yaml."
+    )
+    parser.add_argument("--only-regressions", action="store_true")
+    args = parser.parse_args()
+
+    with open(Path(__file__).resolve().parent / "config.yaml", "r", encoding="utf-8") as f:
+        regression_cfg = yaml.safe_load(f)["regression"]
+    if args.threshold is not None:
+        regression_cfg["threshold"] = args.threshold
+
+    with args.baseline.open("r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with args.current.open("r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, regression_cfg)
+    print_comparison(rows, args.only_regressions)
+    if any(r["regression"] for r in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+"""
+Synthetic versions of the breast-cancer dataset for the benchmarks
+(see src/data/synthetic.py): `scale` x 569 rows and `width` x 30 features.
+"""
+
+import pandas as pd
+
+from src.data.synthetic import synthetic_dataset as _synthetic_dataset
+
+BASE_ROWS = 569
+
+
+def synthetic_dataset(scale: int, width: int = 1, random_state: int = 0) -> pd.DataFrame:
+    return _synthetic_dataset(scale * BASE_ROWS, width=width, random_state=random_state)
@@ -0,0 +1,73 @@
+"""
+Import time of the script entry points, checked against the budgets of
+benchmarks/config.yaml (`imports.budget_ms`).
+
+Every entry point is imported `imports.runs` times in a fresh interpreter
+(`python -X importtime`, after one warm-up run that compiles the bytecode)
+and its median cumulative import time is compared with its budget.
+run.py stores the same measures as "import" records, so that
+compare.py also reports their regressions.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+sys.path.append(os.path.abspath("."))
+
+from src.utils.paths import PROJECT_ROOT
+
+
+def import_time_ms(module: str) -> float:
+    """
+    Cumulative import time of `module` in a fresh interpreter, in ms.
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in reversed(out.stderr.splitlines()):
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}.")
+
+
+def measure_imports(imports_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    One "import" benchmark record per entry point of `imports_cfg["budget_ms"]`.
+    """
+    runs = imports_cfg.get("runs", 5)
+    records = []
+    for module, budget in imports_cfg["budget_ms"].items():
+        import_time_ms(module)
+        median = statistics.median(import_time_ms(module) for _ in range(runs))
+        records.append({
+            "stage": "import", "model": module, "scale": None, "width": None,
+            "n_rows": 0, "n_features": 0,
+            "metrics": {"import_time_ms": median, "budget_ms": budget},
+        })
+    return records
+
+
+def over_budget(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [r for r in records if r["metrics"]["import_time_ms"] > r["metrics"]["budget_ms"]]
+
+
+def main():
+    from benchmarks.run import load_bench_config
+
+    records = measure_imports(load_bench_config()["imports"])
+    print(f"{'entry point':<26} {'import (ms)':>12} {'budget (ms)':>12}")
+    for r in records:
+        m = r["metrics"]
+        flag = "  OVER BUDGET" if m["import_time_ms"] > m["budget_ms"] else ""
+        print(f"{r['model']:<26} {m['import_time_ms']:>12.1f} {m['budget_ms']:>12.0f}{flag}")
+    if over_budget(records):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
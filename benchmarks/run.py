@@ -0,0 +1,285 @@
+"""
+Benchmark of the prepare / train / evaluate pipeline on synthetic data.
+
+For every (scale, width) of benchmarks/config.yaml, the synthetic dataset is
+split and written like scripts/prepare_data.py does (stage "prepare"), then
+every model is trained with its configured search and evaluated on the test
+split in a fresh process (stages "train" and "evaluate"), so that peak RSS
+is measured per model. Results go to benchmarks/results/<timestamp>.json and
+can be compared with a baseline (benchmarks/compare.py).
+"""
+
+import argparse
+import copy
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.append(os.path.abspath("."))
+
+import numpy as np
+import yaml
+
+from benchmarks.compare import compare_results, print_comparison
+from benchmarks.data import synthetic_dataset
+from benchmarks.imports import measure_imports, over_budget
+from src.config.config import Config
+from src.data.data_loader import auto_detect_columns, get_features_and_target
+from src.data.split import create_train_test_split, load_split
+from src.evaluation.metrics import compute_classification_metrics
+from src.evaluation.tuning import build_grid_search
+from src.features.preprocessing import build_pipeline, build_preprocessor
+from src.training.manifest import library_versions
+from src.training.scheduler import available_cores
+from src.utils.logging import get_logger
+from src.utils.paths import PROJECT_ROOT
+
+logger = get_logger(__name__)
+
+BENCH_DIR = PROJECT_ROOT / "benchmarks"
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+def load_bench_config(path: Path = BENCH_DIR / "config.yaml") -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def _cut_grid(param_grid: Dict[str, Any], max_values: int | None) -> Dict[str, Any]:
+    if max_values is None:
+        return param_grid
+    return {k: v[:max_values] if isinstance(v, list) else v for k, v in param_grid.items()}
+
+
+def _import_model_class(class_path: str):
+    module_name, class_name = class_path.rsplit(".", maxsplit=1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def bench_prepare(df, directory: Path, config: Config) -> Dict[str, Any]:
+    """
+    Stage "prepare": stratified split and storage of the dataset table and
+    split positions (create_train_test_split, as scripts/prepare_data.py),
+    then the memory-mapped reload of both splits done by the training and
+    evaluation scripts. The optional CSV export of the splits is left out.
+    """
+    config = copy.copy(config)
+    storage = {**config.dataset.storage, "export_csv": False}
+    config.dataset = replace(config.dataset, storage=storage)
+
+    start = time.perf_counter()
+    create_train_test_split(config, df, directory)
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in ("train", "test"):
+        load_split(config, name, directory)
+    load_time = time.perf_counter() - start
+
+    return {"save_time_s": save_time, "load_time_s": load_time}
+
+
+def bench_model(
+    directory: str, model_name: str, bench_cfg: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Stages "train" and "evaluate" of one model, run in a fresh worker process.
+    """
+    config = Config()
+    train_df = load_split(config, "train", Path(directory))
+    test_df = load_split(config, "test", Path(directory))
+    auto_detect_columns(config, train_df)
+    X, y = get_features_and_target(config, train_df)
+    X_test, y_test = get_features_and_target(config, test_df)
+
+    model_cfg = config.models.models[model_name]
+    wrapper = _import_model_class(model_cfg.class_path)(hyperparameters=model_cfg.hyperparameters)
+    pipeline = build_pipeline(
+        build_preprocessor(
+            config.dataset, use_scaler=model_cfg.use_scaler, binning=model_cfg.binning
+        ),
+        wrapper.build_estimator(),
+    )
+    cv = {**config.training.cv, "n_splits": bench_cfg["cv_folds"]}
+    training_cfg = replace(config.training, cv=cv)
+    search = build_grid_search(
+        pipeline=pipeline,
+        param_grid=_cut_grid(wrapper.hyperparam_grid(), bench_cfg.get("max_values_per_param")),
+        training_cfg=training_cfg,
+        search_cfg=model_cfg.search,
+    )
+
+    start = time.perf_counter()
+    search.fit(X, y)
+    search_time = time.perf_counter() - start
+    fit_times = np.asarray(search.cv_results_["mean_fit_time"], dtype=float)
+    train = {
+        "search_time_s": search_time,
+        "n_candidates": len(fit_times),
+        "mean_candidate_fit_s": float(np.nanmean(fit_times)),
+        "max_candidate_fit_s": float(np.nanmax(fit_times)),
+        "candidates": [
+            {"params": {k: repr(v) for k, v in params.items()}, "mean_fit_time_s": float(t)}
+            for params, t in zip(search.cv_results_["params"], fit_times)
+        ],
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+    model = search.best_estimator_
+    # Throughput: whole test split, repeated for at least 0.2 s.
+    n_runs, start = 0, time.perf_counter()
+    while True:
+        y_pred = model.predict(X_test)
+        n_runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= 0.2:
+            break
+    row = X_test.iloc[:1]
+    latencies = []
+    for _ in range(bench_cfg["latency_calls"]):
+        t0 = time.perf_counter()
+        model.predict(row)
+        latencies.append((time.perf_counter() - t0) * 1e3)
+
+    evaluate = {
+        "throughput_rows_per_s": n_runs * len(X_test) / elapsed,
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "f1_macro": float(compute_classification_metrics(y_test, y_pred)["f1_macro"]),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    return {"train": train, "evaluate": evaluate}
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(bench_cfg: Dict[str, Any], models: List[str]) -> Dict[str, Any]:
+    config = Config()
+    records = measure_imports(bench_cfg["imports"])
+    for record in over_budget(records):
+        logger.warning(
+            "%s imports in %.0f ms, over its %.0f ms budget.",
+            record["model"], record["metrics"]["import_time_ms"], record["metrics"]["budget_ms"],
+        )
+    for scale in bench_cfg["scales"]:
+        for width in bench_cfg["widths"]:
+            df = synthetic_dataset(scale, width, bench_cfg.get("random_state", 0))
+            shape = {
+                "scale": scale, "width": width, "n_rows": len(df), "n_features": df.shape[1] - 2
+            }
+            logger.info(
+                "Benchmark data: %d rows x %d features.", shape["n_rows"], shape["n_features"]
+            )
+
+            with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+                prepare = bench_prepare(df, Path(directory), config)
+                del df
+                records.append({"stage": "prepare", "model": None, **shape, "metrics": prepare})
+
+                for model_name in models:
+                    if scale > bench_cfg.get("max_scale", {}).get(model_name, float("inf")):
+                        logger.info("Skipping %s at scale %d (max_scale).", model_name, scale)
+                        continue
+                    # One worker per model, so that peak RSS is the model's own.
+                    spawn = get_context("spawn")
+                    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                        stages = pool.submit(bench_model, directory, model_name, bench_cfg).result()
+                    for stage, metrics in stages.items():
+                        records.append(
+                            {"stage": stage, "model": model_name, **shape, "metrics": metrics}
+                        )
+                    logger.info(
+                        "%s: search %.2fs, %.0f rows/s, p50 latency %.2f ms, peak RSS %.0f MB",
+                        model_name, stages["train"]["search_time_s"],
+                        stages["evaluate"]["throughput_rows_per_s"],
+                        stages["evaluate"]["latency_p50_ms"], stages["train"]["peak_rss_mb"],
+                    )
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cores": available_cores(),
+            "libraries": library_versions(),
+            "config": bench_cfg,
+        },
+        "records": records,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the training and evaluation pipeline.")
+    parser.add_argument("--scales", type=int, nargs="+", help="Override the scales of the config.")
+    parser.add_argument("--widths", type=int, nargs="+", help="Override the widths of the config.")
+    parser.add_argument(
+        "--models", nargs="+", help="Models to benchmark (default: the enabled ones)."
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Result file (default: benchmarks/results/<timestamp>.json)."
+    )
+    parser.add_argument(
+        "--compare-to", type=Path, help="Baseline result file to check for regressions."
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    bench_cfg = load_bench_config()
+    if args.scales:
+        bench_cfg["scales"] = args.scales
+    if args.widths:
+        bench_cfg["widths"] = args.widths
+    models = args.models or [name for name, cfg in Config().models.models.items() if cfg.enabled]
+
+    results = run_benchmarks(bench_cfg, models)
+
+    output = args.output or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    logger.info("Benchmark results saved to %s", output)
+
+    if args.compare_to is not None:
+        if not args.compare_to.exists():
+            logger.warning("Baseline %s not found, skipping the regression check.", args.compare_to)
+            return
+        with args.compare_to.open("r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_results(baseline, results, bench_cfg["regression"])
+        print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,28 @@
+"""
+Summary script:
+- Collect the CV and test metrics of every model into summary.csv
+- Add bootstrap confidence intervals and paired tests against the best model,
+  computed from the prediction store (src/evaluation/prediction_store.py) and
+  the CV fold scores (no model is run)
+- Write every model-vs-model test to pairwise_tests.csv
+"""
+
 from __future__ import annotations
 
 import sys, os
 sys.path.append(os.path.abspath("."))
 
 import re
+from itertools import combinations
 from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import numpy as np
 import pandas as pd
 
+from src.config.config import Config
+from src.evaluation import prediction_store, resampling
+from src.evaluation.metrics import REPORTED_METRICS
 from src.utils.logging import get_logger
 from src.utils.paths import MODELS_REPORTS_DIR
 
@@ -17,17 +33,20 @@ def _infer_model_name(path: Path) -> str:
     return re.sub(r"_(cv_results|test_metrics)\.csv$", "", path.name)
 
 
+def _best_cv_row(df: pd.DataFrame) -> pd.Series | None:
+    if "rank_test_score" in df.columns:
+        return df.loc[df["rank_test_score"].idxmin()]
+    if "mean_test_score" in df.columns:
+        return df.loc[df["mean_test_score"].idxmax()]
+    return None
+
+
 def load_cv_best_scores(reports_dir: Path) -> pd.DataFrame:
     rows = []
     for p in sorted(reports_dir.glob("*_cv_results.csv")):
         model = _infer_model_name(p)
-        df = pd.read_csv(p)
-
-        if "rank_test_score" in df.columns:
-            best_row = df.loc[df["rank_test_score"].idxmin()]
-        elif "mean_test_score" in df.columns:
-            best_row = df.loc[df["mean_test_score"].idxmax()]
-        else:
+        best_row = _best_cv_row(pd.read_csv(p))
+        if best_row is None:
             logger.warning("CV file %s has no score columns, skipping.", p.name)
             continue
 
@@ -40,6 +59,39 @@ def load_cv_best_scores(reports_dir: Path) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+def load_cv_fold_scores(reports_dir: Path) -> Tuple[Dict[str, np.ndarray], Dict[str, str | None]]:
+    """
+    Test scores of the best candidate of every model on each CV fold
+    (split<k>_test_score), and the folds they come from (cv_scheme column,
+    None for the CV results saved without it).
+    """
+    scores, schemes = {}, {}
+    for p in sorted(reports_dir.glob("*_cv_results.csv")):
+        best_row = _best_cv_row(pd.read_csv(p))
+        if best_row is None:
+            continue
+        folds = sorted((c for c in best_row.index if re.fullmatch(r"split\d+_test_score", c)),
+                       key=lambda c: int(c[5:-11]))
+        if len(folds) > 1:
+            model = _infer_model_name(p)
+            scores[model] = best_row[folds].to_numpy(dtype=float)
+            scheme = best_row.get("cv_scheme")
+            schemes[model] = scheme if isinstance(scheme, str) else None
+    return scores, schemes
+
+
+def load_test_predictions() -> Dict[str, pd.DataFrame]:
+    """
+    Row-level test predictions of the prediction store (scripts/evaluate.py).
+    """
+    predictions = {}
+    for model in prediction_store.stored_models():
+        df = prediction_store.load_predictions(model, "test")
+        if len(df):
+            predictions[model] = df
+    return predictions
+
+
 def load_test_metrics(reports_dir: Path) -> pd.DataFrame:
     rows = []
     for p in sorted(reports_dir.glob("*_test_metrics.csv")):
@@ -53,9 +105,106 @@ def load_test_metrics(reports_dir: Path) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+def bootstrap_intervals(
+    predictions: Dict[str, pd.DataFrame], cv_scores: Dict[str, np.ndarray], options: Dict[str, Any]
+) -> pd.DataFrame:
+    """
+    Bootstrap confidence intervals of the test metrics and of the mean CV
+    score of every model.
+    """
+    rows = {}
+    for model, df in predictions.items():
+        row = rows.setdefault(model, {"model": model})
+        for metric in REPORTED_METRICS:
+            ci = resampling.bootstrap_metric(df["label"], df["prediction"], metric, **options)
+            row[f"{metric}_ci_low"], row[f"{metric}_ci_high"] = ci["ci_low"], ci["ci_high"]
+    for model, scores in cv_scores.items():
+        row = rows.setdefault(model, {"model": model})
+        ci = resampling.bootstrap_mean(scores, **options)
+        row["cv_best_score_ci_low"], row["cv_best_score_ci_high"] = ci["ci_low"], ci["ci_high"]
+    return pd.DataFrame(list(rows.values())) if rows else pd.DataFrame({"model": []})
+
+
+def pairwise_tests(
+    predictions: Dict[str, pd.DataFrame],
+    cv_scores: Dict[str, np.ndarray],
+    cv_schemes: Dict[str, str | None],
+    scoring: str,
+    options: Dict[str, Any],
+) -> pd.DataFrame:
+    """
+    Paired comparison of every pair of models: paired bootstrap of the test
+    `scoring` difference and corrected resampled t-test on the CV fold
+    scores. Fold scores are only paired when both models were
+    cross-validated on the same, known folds (cv_schemes).
+    """
+    rows = []
+    for a, b in combinations(sorted(set(predictions) | set(cv_scores)), 2):
+        row: Dict[str, Any] = {"model_a": a, "model_b": b, "metric": scoring}
+        if a in predictions and b in predictions:
+            pa, pb = predictions[a], predictions[b]
+            if len(pa) == len(pb) and (pa["row"].to_numpy() == pb["row"].to_numpy()).all():
+                test = resampling.paired_bootstrap(
+                    pa["label"], pa["prediction"], pb["prediction"], scoring, **options
+                )
+                row.update({f"test_{k}": v for k, v in test.items()})
+            else:
+                logger.warning(
+                    "Test predictions of %s and %s are not on the same rows, skipping.", a, b
+                )
+        if a in cv_scores and b in cv_scores:
+            same_folds = cv_schemes.get(a) is not None and cv_schemes.get(a) == cv_schemes.get(b)
+            if same_folds and len(cv_scores[a]) == len(cv_scores[b]):
+                n_splits = len(cv_scores[a])
+                cv = resampling.corrected_ttest(cv_scores[a], cv_scores[b], 1 / (n_splits - 1))
+                row.update({"cv_diff": cv["diff"], "cv_p_value": cv["p_value"]})
+            else:
+                logger.warning(
+                    "CV folds of %s (%s) and %s (%s) differ or are unknown, skipping the CV test.",
+                    a, cv_schemes.get(a), b, cv_schemes.get(b),
+                )
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _versus_best(summary: pd.DataFrame, pairs: pd.DataFrame, scoring: str) -> pd.DataFrame:
+    """
+    Difference and p-values of every model against the model with the best
+    test `scoring`, read from the pairwise tests.
+    """
+    if pairs.empty or scoring not in summary.columns or summary[scoring].isna().all():
+        return summary
+    best = summary.loc[summary[scoring].idxmax(), "model"]
+    columns = {
+        "test_diff": "diff_vs_best",
+        "test_p_value": "p_value_vs_best",
+        "cv_p_value": "cv_p_value_vs_best",
+    }
+    rows = []
+    for model in summary["model"]:
+        row = {"model": model}
+        pair = pairs[((pairs["model_a"] == model) & (pairs["model_b"] == best))
+                     | ((pairs["model_a"] == best) & (pairs["model_b"] == model))]
+        if not pair.empty:
+            sign = 1 if pair["model_a"].iloc[0] == model else -1
+            for source, target in columns.items():
+                if source in pair.columns:
+                    value = pair[source].iloc[0]
+                    row[target] = sign * value if source.endswith("diff") and value else value
+        rows.append(row)
+    logger.info("Paired tests against the best test %s: %s", scoring, best)
+    return summary.merge(pd.DataFrame(rows), on="model", how="left")
+
+
 def main():
     reports_dir = Path(MODELS_REPORTS_DIR)
     reports_dir.mkdir(parents=True, exist_ok=True)
+    config = Config()
+    options = {
+        "n_resamples": 10_000, "confidence": 0.95, "random_state": config.training.random_state,
+        **config.training.evaluation.get("bootstrap", {}),
+    }
+    scoring = config.training.scoring
 
     cv_df = load_cv_best_scores(reports_dir)
     test_df = load_test_metrics(reports_dir)
@@ -65,8 +214,20 @@ def main():
 
     summary = pd.merge(test_df, cv_df, on="model", how="outer")
 
-    preferred = ["model", "accuracy", "f1_macro", "precision_macro", "recall_macro", "roc_auc",
-                 "cv_best_score", "cv_best_params"]
+    predictions = load_test_predictions()
+    cv_scores, cv_schemes = load_cv_fold_scores(reports_dir)
+    known = set(summary["model"])
+    predictions = {m: df for m, df in predictions.items() if m in known}
+    cv_scores = {m: s for m, s in cv_scores.items() if m in known}
+    pairs = pairwise_tests(predictions, cv_scores, cv_schemes, scoring, options)
+    intervals = bootstrap_intervals(predictions, cv_scores, options)
+    summary = summary.merge(intervals, on="model", how="left")
+    summary = _versus_best(summary, pairs, scoring)
+
+    preferred = ["model"]
+    for metric in [*REPORTED_METRICS, "roc_auc", "cv_best_score"]:
+        preferred += [metric, f"{metric}_ci_low", f"{metric}_ci_high"]
+    preferred += ["diff_vs_best", "p_value_vs_best", "cv_p_value_vs_best", "cv_best_params"]
     cols = [c for c in preferred if c in summary.columns] + [c for c in summary.columns if c not in preferred]
     summary = summary[cols].sort_values("model")
 
@@ -74,6 +235,12 @@ def main():
     summary.to_csv(out_path, index=False)
     logger.info("Summary written to %s", out_path)
 
+    if not pairs.empty:
+        pairs_path = reports_dir / "pairwise_tests.csv"
+        pairs.to_csv(pairs_path, index=False)
+        logger.info("Pairwise tests (%d pairs, %d bootstrap resamples) written to %s",
+                    len(pairs), options["n_resamples"], pairs_path)
+
 
 if __name__ == "__main__":
     main()
@@ -1,90 +1,173 @@
 """
 Evaluation script:
 - Load trained pipelines from disk
-- Evaluate them on the test set
+- Evaluate them on the test set (concurrently, see src/evaluation/engine.py)
 - Save metrics, confusion matrix, classification report
+- Store the test predictions and scores (src/evaluation/prediction_store.py)
+
+With --from-store, the reports are rebuilt from the stored test predictions
+instead: no model and no test features are loaded.
 """
 
-import joblib
-import pandas as pd
+import argparse
+import math
+from concurrent.futures import Executor
+from typing import Iterator, List
 
 import sys, os
 sys.path.append(os.path.abspath("."))
 
 from src.config.config import Config
 from src.data.data_loader import get_features_and_target
-from src.evaluation.metrics import compute_classification_metrics
+from src.data.split import load_split, split_rows
+from src.evaluation import prediction_store
+from src.evaluation.engine import (
+    ModelEvaluation,
+    evaluate_models,
+    evaluate_predictions,
+    figure_pool,
+    render_figure,
+)
 from src.utils.io import save_csv, save_text
+from src.utils.lazy import lazy_import
 from src.utils.logging import get_logger
-from src.utils.paths import (
-    DATA_INTERIM_DIR,
-    MODELS_ARTIFACTS_DIR,
-    MODELS_REPORTS_DIR,
-)
-from src.utils.plotting import plot_confusion_matrix, save_classification_report
+from src.utils.paths import MODELS_ARTIFACTS_DIR, MODELS_REPORTS_DIR
+from src.utils.plotting import plot_confusion_counts, preload_plotting
+from src.utils.profiling import configure_profiling, count, span
+
+pd = lazy_import("pandas")
 
 logger = get_logger(__name__)
 
 
-def evaluate_model(config: Config, model_name: str, test_df: pd.DataFrame) -> None:
+def save_evaluation(result: ModelEvaluation, figures: Executor | None, plots: bool = True):
     """
-    Evaluate a single trained model on the test set.
+    Save the reports of one evaluated model. The confusion matrix figure
+    is rendered by `figures` (inline when None), unless `plots` is False;
+    returns its future.
     """
-    model_path = MODELS_ARTIFACTS_DIR / f"{model_name}_best.joblib"
-    if not model_path.exists():
-        logger.warning("Model %s not found at %s, skipping.", model_name, model_path)
-        return
-
-    logger.info("Evaluating model %s", model_name)
-
-    model = joblib.load(model_path)
-
-    X_test, y_test = get_features_and_target(config, test_df)
-    y_pred = model.predict(X_test)
-
-    metrics = compute_classification_metrics(y_test, y_pred)
+    model_name = result.name
+    if math.isnan(result.predict_time):
+        logger.info("Evaluated model %s (from the prediction store)", model_name)
+    else:
+        logger.info("Evaluated model %s (prediction: %.3fs)", model_name, result.predict_time)
 
     MODELS_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     txt_path = MODELS_REPORTS_DIR / f"{model_name}_test_metrics.txt"
     csv_path = MODELS_REPORTS_DIR / f"{model_name}_test_metrics.csv"
 
-    save_text("\n".join([f"{k}: {v:.4f}" for k, v in metrics.items()]), txt_path)
-    save_csv(pd.DataFrame([metrics]), csv_path)
+    save_text("\n".join([f"{k}: {v:.4f}" for k, v in result.metrics.items()]), txt_path)
+    save_csv(pd.DataFrame([result.metrics]), csv_path)
 
     logger.info("Test metrics saved to %s and %s", txt_path, csv_path)
 
+    report_path = MODELS_REPORTS_DIR / f"{model_name}_classification_report.txt"
+    save_text(result.report(), report_path)
+    logger.info("Classification report saved to %s", report_path)
+
+    count("models_evaluated")
+    if not plots:
+        return None
     conf_path = MODELS_REPORTS_DIR / f"{model_name}_confusion_matrix.png"
-    plot_confusion_matrix(
-        y_true=y_test,
-        y_pred=y_pred,
-        title=f"Confusion Matrix - {model_name}",
-        out_path=str(conf_path),
+    return render_figure(
+        figures, plot_confusion_counts,
+        result.confusion, result.labels, f"Confusion Matrix - {model_name}", str(conf_path),
     )
-    logger.info("Confusion matrix saved to %s", conf_path)
 
-    report_path = MODELS_REPORTS_DIR / f"{model_name}_classification_report.txt"
-    target_names = [str(c) for c in sorted(set(y_test))]
-    save_classification_report(
-        y_true=y_test,
-        y_pred=y_pred,
-        target_names=target_names,
-        out_path=str(report_path),
-    )
-    logger.info("Classification report saved to %s", report_path)
 
+def store_evaluation(result: ModelEvaluation, test_rows, y_test) -> None:
+    """
+    Store the row-level test predictions and scores of one evaluated model,
+    resampled by scripts/build_summary.py.
+    """
+    path = prediction_store.write_predictions(
+        result.name, "test", test_rows, y_test,
+        result.predictions, result.scores, result.score_names,
+    )
+    logger.info("Test predictions saved to %s", path)
 
-def main():
-    config = Config()
 
-    test_path = DATA_INTERIM_DIR / "test.csv"
-    if not test_path.exists():
-        raise FileNotFoundError("Run scripts.prepare_data first.")
+def stored_evaluations(model_names: List[str]) -> Iterator[ModelEvaluation]:
+    """
+    Evaluations rebuilt from the test predictions of the prediction store.
+    """
+    for model_name in model_names:
+        with span("evaluate.from_store", model=model_name):
+            df = prediction_store.load_predictions(model_name, "test")
+            if len(df) == 0:
+                logger.warning("No stored test predictions for %s, skipping.", model_name)
+                continue
+            yield evaluate_predictions(
+                model_name, df["label"].to_numpy(), df["prediction"].to_numpy()
+            )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate the trained models on the test set.")
+    parser.add_argument(
+        "--no-plots",
+        action="store_true",
+        help="Only write the metrics and classification reports (matplotlib is not loaded).",
+    )
+    parser.add_argument(
+        "--from-store",
+        action="store_true",
+        help="Rebuild the reports from the stored test predictions, without loading the models.",
+    )
+    return parser.parse_args()
 
-    test_df = pd.read_csv(test_path)
 
-    for model_name, model_cfg in config.models.models.items():
-        if model_cfg.enabled:
-            evaluate_model(config, model_name, test_df)
+def main():
+    args = parse_args()
+    config = Config()
+    configure_profiling(config.training.profiling, "evaluate")
+    eval_cfg = config.training.evaluation
+
+    enabled = [name for name, model_cfg in config.models.models.items() if model_cfg.enabled]
+
+    if args.from_store:
+        stored = set(prediction_store.stored_models())
+        model_names = [name for name in enabled if name in stored]
+        for model_name in sorted(set(enabled) - stored):
+            logger.warning("No stored predictions for %s, skipping.", model_name)
+        logger.info("Evaluating %d models from the prediction store.", len(model_names))
+        results = stored_evaluations(model_names)
+    else:
+        test_df = load_split(config, "test")
+        X_test, y_test = get_features_and_target(config, test_df)
+        test_rows = split_rows("test")
+
+        model_paths = {}
+        for model_name in enabled:
+            model_path = MODELS_ARTIFACTS_DIR / f"{model_name}_best.joblib"
+            if not model_path.exists():
+                logger.warning("Model %s not found at %s, skipping.", model_name, model_path)
+                continue
+            model_paths[model_name] = model_path
+
+        logger.info("Evaluating %d models on %d test rows.", len(model_paths), len(X_test))
+        results = evaluate_models(model_paths, X_test, y_test, n_jobs=eval_cfg.get("n_jobs", -1))
+
+    # evaluate_models is lazy: its threads only start after the figure pool.
+    figures = None
+    if not args.no_plots:
+        preload_plotting()
+        figures = figure_pool(eval_cfg.get("plot_workers", 2))
+    pending = {}
+    try:
+        for result in results:
+            if not args.from_store:
+                store_evaluation(result, test_rows, y_test)
+            future = save_evaluation(result, figures, plots=not args.no_plots)
+            if future is not None:
+                pending[result.name] = future
+        with span("evaluate.wait_figures", n_figures=len(pending)):
+            for model_name, future in pending.items():
+                future.result()
+                logger.info("Confusion matrix of %s saved.", model_name)
+    finally:
+        if figures is not None:
+            figures.shutdown()
 
 
 if __name__ == "__main__":
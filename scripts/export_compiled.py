@@ -0,0 +1,63 @@
+"""
+Export script:
+- Load every trained pipeline (*_best.joblib)
+- Compile it into a NumPy-only predictor (*_compiled.npz)
+- Check that it reproduces the sklearn pipeline on the test split
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath("."))
+
+import joblib
+
+from src.config.config import Config
+from src.data.data_loader import get_features_and_target
+from src.data.split import load_split
+from src.inference.export import check_parity, compile_pipeline, save_compiled
+from src.inference.npy_predictor import CompiledPredictor
+from src.utils.logging import get_logger
+from src.utils.paths import MODELS_ARTIFACTS_DIR
+
+logger = get_logger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Export trained pipelines to NumPy-only predictors."
+    )
+    parser.add_argument(
+        "--models", nargs="*", default=None, help="Models to export (default: all)."
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = Config()
+
+    X_test, _ = get_features_and_target(config, load_split(config, "test"))
+
+    for model_path in sorted(MODELS_ARTIFACTS_DIR.glob("*_best.joblib")):
+        name = model_path.name[: -len("_best.joblib")]
+        if args.models and name not in args.models:
+            continue
+
+        pipeline = joblib.load(model_path)
+        try:
+            arrays = compile_pipeline(pipeline)
+        except NotImplementedError as exc:
+            logger.warning("Skipping %s: %s", name, exc)
+            continue
+
+        compiled_path = MODELS_ARTIFACTS_DIR / f"{name}_compiled.npz"
+        save_compiled(arrays, compiled_path)
+
+        report = check_parity(pipeline, CompiledPredictor.load(compiled_path), X_test)
+        logger.info("Exported %s to %s, parity on the test split: %s", name, compiled_path, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,58 @@
 """
 Data preparation script:
-- Load the raw breast cancer dataset (from sklearn)
+- Load the raw breast cancer dataset (from the source of configs/dataset.yaml)
 - Create train/test splits
 """
 
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath("."))
+
 from src.config.config import Config
 from src.data.data_loader import load_raw_dataset
 from src.data.split import create_train_test_split
 from src.utils.logging import get_logger
+from src.utils.profiling import configure_profiling, span
 
 logger = get_logger(__name__)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Load the raw dataset and create the train/test splits."
+    )
+    parser.add_argument(
+        "--source",
+        choices=["sklearn", "csv", "parquet", "synthetic"],
+        help="Override ingestion.source of configs/dataset.yaml.",
+    )
+    parser.add_argument("--path", help="Override the path of the csv / parquet source.")
+    parser.add_argument("--rows", type=int, help="Number of rows of the synthetic source.")
+    return parser.parse_args()
+
+
 def main() -> None:
     """
     Main entry point for the prepare_data script.
     """
+    args = parse_args()
     config = Config()
+    ingestion = config.dataset.ingestion
+    if args.source:
+        ingestion["source"] = args.source
+    if args.path:
+        ingestion["path"] = args.path
+    if args.rows:
+        ingestion["synthetic"] = {**ingestion.get("synthetic", {}), "n_rows": args.rows}
+    configure_profiling(config.training.profiling, "prepare_data")
 
     logger.info("Preparing data for dataset '%s'.", config.dataset.name)
 
-    df_raw = load_raw_dataset(config)
-    create_train_test_split(config, df_raw)
+    with span("prepare_data", profile=True, dataset=config.dataset.name):
+        df_raw = load_raw_dataset(config)
+        create_train_test_split(config, df_raw)
 
     logger.info("Data preparation completed successfully.")
 
@@ -0,0 +1,62 @@
+"""
+Scoring server script:
+- Load and warm up every trained pipeline once
+- Serve single-row predictions over HTTP (TCP or Unix socket) with micro-batching
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath("."))
+
+from src.inference.server import build_server, load_models
+from src.utils.logging import get_logger
+from src.utils.paths import MODELS_ARTIFACTS_DIR
+
+logger = get_logger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the trained models over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--unix-socket", default=None, help="Listen on a Unix socket instead of TCP."
+    )
+    parser.add_argument("--models", nargs="*", default=None, help="Models to serve (default: all).")
+    parser.add_argument("--max-batch", type=int, default=256, help="Maximum rows per predict call.")
+    parser.add_argument(
+        "--max-wait-ms", type=float, default=0.5,
+        help="Time window used to group concurrent requests into one batch.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    batchers = load_models(
+        MODELS_ARTIFACTS_DIR,
+        names=args.models,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+    )
+    if not batchers:
+        raise FileNotFoundError("No trained model found. Run `make train` first.")
+
+    server = build_server(batchers, host=args.host, port=args.port, unix_socket=args.unix_socket)
+    logger.info(
+        "Serving %s on %s", ", ".join(batchers),
+        args.unix_socket or f"http://{args.host}:{args.port}",
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
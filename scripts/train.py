@@ -1,18 +1,46 @@
+from __future__ import annotations
+
+import argparse
 import importlib
+import time
+from dataclasses import replace
+from functools import partial
 
 import sys, os
 sys.path.append(os.path.abspath("."))
 
-import pandas as pd
-from joblib import dump
-
 from src.config.config import Config, ModelConfig
-from src.data.data_loader import get_features_and_target, auto_detect_columns
-from src.features.preprocessing import build_preprocessor, build_pipeline
-from src.evaluation.tuning import build_grid_search
+from src.data.data_loader import get_features_and_target, load_columns
+from src.data.split import SPLITS_PATH, dataset_path, load_split, split_window
+from src.training.manifest import TrainingManifest, file_digest, model_fingerprint
+from src.training.scheduler import (
+    grid_cost,
+    order_longest_first,
+    plan_core_split,
+    resolve_core_budget,
+    run_jobs,
+)
 from src.utils.io import save_csv
+from src.utils.lazy import lazy_import
 from src.utils.logging import get_logger
-from src.utils.paths import DATA_INTERIM_DIR, MODELS_ARTIFACTS_DIR, MODELS_REPORTS_DIR
+from src.utils.paths import (
+    FOLD_CACHE_DIR,
+    MODELS_ARTIFACTS_DIR,
+    MODELS_REPORTS_DIR,
+    TRAINING_MANIFEST_PATH,
+)
+from src.utils.profiling import configure_profiling, count, span, timed
+
+# Heavy modules, loaded on first use (see src/utils/lazy.py).
+pd = lazy_import("pandas")
+joblib = lazy_import("joblib")
+cache = lazy_import("src.features.cache")
+crossval = lazy_import("src.evaluation.crossval")
+nested = lazy_import("src.evaluation.nested")
+prediction_store = lazy_import("src.evaluation.prediction_store")
+preprocessing = lazy_import("src.features.preprocessing")
+streaming = lazy_import("src.training.streaming")
+tuning = lazy_import("src.evaluation.tuning")
 
 logger = get_logger(__name__)
 
@@ -30,71 +58,433 @@ def train_single_model(
     config: Config,
     model_cfg: ModelConfig,
     train_df: pd.DataFrame,
-) -> None:
+    n_jobs: int | None = None,
+    cache_key: str | None = None,
+) -> list:
     """
     Train a single model using GridSearchCV.
+    Returns the paths of the artifacts written for this model.
+
+    The feature columns come from config.dataset (see load_columns).
+    n_jobs overrides training.n_jobs for the search when the model is
+    trained by the model-level scheduler. cache_key is the fingerprint of
+    train_df, used to share preprocessed folds between candidates and models.
     """
     logger.info("===== Training model: %s =====", model_cfg.name)
 
-    # 1) Auto-detect feature columns from the training data
-    auto_detect_columns(config, train_df)
-
-    # 2) Split features/target
+    # 1) Split features/target (views of train_df)
     X, y = get_features_and_target(config, train_df)
 
-    # 3) Build preprocessor using the detected features
-    preprocessor = build_preprocessor(
+    # 2) Build the pipeline and its search, then fit
+    grid_search = _build_search(config, model_cfg, n_jobs, cache_key)
+    store_cfg = config.training.prediction_store
+    engine = "keep_outputs_mb" in grid_search.get_params(deep=False)
+    if store_cfg.get("out_of_fold", True) and engine:
+        # The search engine keeps the test-fold outputs of the best candidate (fold_outputs_).
+        grid_search.set_params(keep_outputs_mb=store_cfg.get("keep_outputs_mb", 256))
+    tuning.fit_search(grid_search, X, y, model_cfg.name)
+
+    artifacts = _save_search_outputs(config, model_cfg, grid_search)
+
+    # 3) Out-of-fold predictions of the best candidate (prediction store)
+    if config.training.prediction_store.get("out_of_fold", True):
+        artifacts.append(_store_out_of_fold(model_cfg, grid_search, X, y))
+
+    if cache_key is not None:
+        logger.info("Preprocessing cache: %s", cache.get_fold_cache().stats())
+
+    return artifacts
+
+
+def _build_search(
+    config: Config,
+    model_cfg: ModelConfig,
+    n_jobs: int | None = None,
+    cache_key: str | None = None,
+):
+    """
+    Pipeline of a model (preprocessor built from the detected features +
+    estimator) wrapped in its configured hyperparameter search.
+    """
+    cache_cfg = config.training.preprocessing_cache
+    preprocessor = preprocessing.build_preprocessor(
         dataset_cfg=config.dataset,
         use_scaler=model_cfg.use_scaler,
+        cache_key=cache_key,
+        cache_max_bytes=int(cache_cfg.get("max_mb", 512) * 1024**2),
+        binning=model_cfg.binning,
+        cache_dir=str(FOLD_CACHE_DIR) if cache_cfg.get("shared", False) else None,
     )
 
     ModelClass = _import_model_class(model_cfg.class_path)
     model_wrapper = ModelClass(hyperparameters=model_cfg.hyperparameters)
 
     estimator = model_wrapper.build_estimator()
-    pipeline = build_pipeline(preprocessor, estimator)
+    pipeline = preprocessing.build_pipeline(preprocessor, estimator)
     param_grid = model_wrapper.hyperparam_grid()
 
-    grid_search = build_grid_search(
+    training_cfg = config.training
+    if n_jobs is not None:
+        training_cfg = replace(training_cfg, n_jobs=n_jobs)
+
+    return tuning.build_grid_search(
         pipeline=pipeline,
         param_grid=param_grid,
-        training_cfg=config.training,
+        training_cfg=training_cfg,
+        search_cfg=model_cfg.search,
     )
 
-    grid_search.fit(X, y)
 
-    logger.info("Best params: %s", grid_search.best_params_)
+def _fold_cache_key(config: Config, train_df: pd.DataFrame) -> str | None:
+    """
+    Dataset key of the preprocessing cache (None when disabled). Entries
+    left in the shared cache directory by an interrupted run are removed.
+    """
+    cache_cfg = config.training.preprocessing_cache
+    if not cache_cfg.get("enabled", False):
+        return None
+    if cache_cfg.get("shared", False):
+        cache.clear_shared_cache(FOLD_CACHE_DIR)
+    return cache.dataset_fingerprint(train_df)
+
+
+@timed("train.save_outputs")
+def _save_search_outputs(config: Config, model_cfg: ModelConfig, search, suffix: str = "") -> list:
+    """
+    Save the refitted best model and the CV results of a finished search
+    under `<model><suffix>_...`, with the description of its folds in the
+    cv_scheme column. Returns the paths of the artifacts written.
+    """
+    logger.info("Best params: %s", search.best_params_)
     logger.info(
         "Best %s score: %.4f",
         config.training.refit_metric,
-        grid_search.best_score_,
+        search.best_score_,
     )
 
     MODELS_ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
-    model_path = MODELS_ARTIFACTS_DIR / f"{model_cfg.name}_best.joblib"
-    dump(grid_search.best_estimator_, model_path)
+    name = f"{model_cfg.name}{suffix}"
+    model_path = MODELS_ARTIFACTS_DIR / f"{name}_best.joblib"
+    joblib.dump(cache.unwrap_cached_preprocessor(search.best_estimator_), model_path)
     logger.info("Best model saved to %s", model_path)
 
     MODELS_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-    cv_results_path = MODELS_REPORTS_DIR / f"{model_cfg.name}_cv_results.csv"
-    save_csv(pd.DataFrame(grid_search.cv_results_), cv_results_path)
+    cv_results_path = MODELS_REPORTS_DIR / f"{name}_cv_results.csv"
+    cv_results = pd.DataFrame(search.cv_results_)
+    cv_results["cv_scheme"] = getattr(search, "cv_scheme_", None) or crossval.fold_scheme(search.cv)
+    save_csv(cv_results, cv_results_path)
     logger.info("CV results saved to %s", cv_results_path)
+    artifacts = [model_path, cv_results_path]
 
+    curves = getattr(search, "learning_curves_", None)
+    if curves:
+        curves_path = MODELS_REPORTS_DIR / f"{name}_learning_curves.csv"
+        save_csv(pd.DataFrame(curves), curves_path)
+        logger.info("Learning curves saved to %s", curves_path)
+        artifacts.append(curves_path)
 
-def main():
-    config = Config()
+    count("models_trained")
+    return artifacts
 
-    train_path = DATA_INTERIM_DIR / "train.csv"
-    if not train_path.exists():
+
+@timed("train.out_of_fold")
+def _store_out_of_fold(model_cfg: ModelConfig, search, X, y):
+    """
+    Store the predictions of the best candidate of a finished search on the
+    held-out part of every CV fold: the ones kept by the search engine when
+    available, else a refit on the training part of each fold of the
+    search's splitter. The rows are the positions of X in the dataset table
+    (X is a view of it). Returns the path of the stored table.
+    """
+    outputs = getattr(search, "fold_outputs_", None)
+    if outputs is None:
+        outputs = prediction_store.out_of_fold(search.best_estimator_, X, y, search.cv)
+    folds, predictions, scores, score_names = outputs
+    path = prediction_store.write_predictions(
+        model_cfg.name, "oof", X.index.to_numpy(), y.to_numpy(), predictions,
+        scores, score_names, folds=folds,
+    )
+    logger.info("Out-of-fold predictions saved to %s", path)
+    return path
+
+
+def train_streaming_model(config: Config, model_cfg: ModelConfig, path, window: slice) -> list:
+    """
+    Train a single model out-of-core: the `window` rows of the dataset table are
+    read by chunks and the candidates are updated with partial_fit (see
+    StreamingSearch). The outputs are written as `<model>_streaming_best.joblib`
+    and `<model>_streaming_cv_results.csv`, next to (not over) the ones of
+    the regular training. Returns the paths of the artifacts written.
+    """
+    logger.info("===== Streaming training: %s =====", model_cfg.name)
+    stream_cfg = config.training.streaming
+    chunk_rows = stream_cfg.get("chunk_rows", 100_000)
+
+    ModelClass = _import_model_class(model_cfg.class_path)
+    model_wrapper = ModelClass(hyperparameters=model_cfg.hyperparameters)
+
+    search = streaming.StreamingSearch(
+        estimator=model_wrapper.build_estimator(),
+        param_grid=model_wrapper.hyperparam_grid(),
+        numerical_features=config.dataset.numerical_features,
+        categorical_features=config.dataset.categorical_features,
+        target_column=config.dataset.target_column,
+        key_column=config.dataset.id_column,
+        use_scaler=model_cfg.use_scaler,
+        scoring=config.training.scoring,
+        n_splits=config.training.cv["n_splits"],
+        chunk_rows=chunk_rows,
+        n_epochs=stream_cfg.get("n_epochs", 5),
+        random_state=config.training.cv.get("random_state"),
+    )
+    with span("streaming.fit", profile=True, model=model_cfg.name):
+        search.fit(path, window=window)
+    logger.info("Trained on %d rows by chunks of %d.", search.n_samples_, chunk_rows)
+    return _save_search_outputs(config, model_cfg, search, suffix="_streaming")
+
+
+def train_streaming(config: Config) -> None:
+    """
+    Streaming mode of main(): the models listed in training.streaming.models
+    (default: the enabled ones) whose estimator supports partial_fit are
+    trained one after the other. The training manifest is not updated.
+    """
+    path = dataset_path(config)
+    if not path.exists():
         raise FileNotFoundError("Run scripts.prepare_data first.")
+    window = split_window("train")
+
+    names = config.training.streaming.get("models") or [
+        name for name, model_cfg in config.models.models.items() if model_cfg.enabled
+    ]
+    for name in names:
+        model_cfg = config.models.models[name]
+        ModelClass = _import_model_class(model_cfg.class_path)
+        estimator = ModelClass(hyperparameters=model_cfg.hyperparameters).build_estimator()
+        if not streaming.supports_streaming(estimator):
+            logger.info("Model %s has no partial_fit, skipping in streaming mode.", name)
+            continue
+        train_streaming_model(config, model_cfg, path, window)
+
+
+def _train_from_split(config: Config, model_cfg: ModelConfig, **kwargs) -> list:
+    """
+    Scheduler job: memory-map the training split in the worker process
+    (instead of pickling the DataFrame) and train one model.
+    """
+    return train_single_model(config, model_cfg, load_split(config, "train"), **kwargs)
 
-    train_df = pd.read_csv(train_path)
 
+def _nested_fold(
+    config: Config, model_cfg: ModelConfig, fold, n_jobs: int, cache_key: str | None
+) -> dict:
+    """
+    Scheduler job of the nested mode: run the search of one model on the
+    training rows of an outer fold and score its best model on the held-out rows.
+    """
+    X, y = get_features_and_target(config, load_split(config, "train"))
+    search = _build_search(config, model_cfg, n_jobs, cache_key)
+    start = time.perf_counter()
+    tuning.fit_search(
+        search, X.iloc[fold.train_rows], y.iloc[fold.train_rows], f"{model_cfg.name}:{fold.name}"
+    )
+    fit_time = time.perf_counter() - start
+    scores = nested.score_outer_fold(
+        search, X.iloc[fold.test_rows], y.iloc[fold.test_rows], config.training.scoring
+    )
+    return {
+        "model": model_cfg.name,
+        "repeat": fold.repeat,
+        "fold": fold.fold,
+        "n_train": len(fold.train_rows),
+        "n_test": len(fold.test_rows),
+        "fit_time": fit_time,
+        **scores,
+    }
+
+
+@timed("train.save_nested")
+def _save_nested_results(rows: list) -> None:
+    """
+    Save the per-outer-fold results of every model and their summary.
+    """
+    MODELS_REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    results = pd.DataFrame(rows).sort_values(["model", "repeat", "fold"], ignore_index=True)
+    for model_name, model_results in results.groupby("model"):
+        path = MODELS_REPORTS_DIR / f"{model_name}_nested_cv.csv"
+        save_csv(model_results, path)
+        logger.info("Nested CV results of %s saved to %s", model_name, path)
+
+    summary = nested.summarise(results)
+    summary_path = MODELS_REPORTS_DIR / "nested_cv_summary.csv"
+    save_csv(summary, summary_path)
+    for row in summary.itertuples():
+        logger.info(
+            "%s: outer score %.4f +/- %.4f (inner %.4f, optimism %+.4f), params stability %.0f%%",
+            row.model, row.outer_score_mean, row.outer_score_std, row.inner_score_mean,
+            row.optimism, 100 * row.params_stability,
+        )
+    logger.info("Nested CV summary saved to %s", summary_path)
+
+
+def train_nested(config: Config) -> None:
+    """
+    Nested mode of main(): every outer fold (training.nested_cv) of every model
+    listed in nested_cv.models (default: the enabled ones) is one scheduler
+    job. The core budget is split between the concurrent folds and the n_jobs
+    of their searches. Model artifacts and the training manifest are not updated.
+    """
+    nested_cfg = config.training.nested_cv
+    names = nested_cfg.get("models") or [
+        name for name, model_cfg in config.models.models.items() if model_cfg.enabled
+    ]
+    train_df = load_split(config, "train")
+    folds = nested.outer_folds(nested_cfg, train_df[config.dataset.target_column])
+
+    cache_key = _fold_cache_key(config, train_df)
+
+    jobs, costs = {}, {}
+    for name in names:
+        model_cfg = config.models.models[name]
+        ModelClass = _import_model_class(model_cfg.class_path)
+        grid = ModelClass(hyperparameters=model_cfg.hyperparameters).hyperparam_grid()
+        cost = grid_cost(grid, config.training.cv["n_splits"])
+        for fold in folds:
+            jobs[f"{name}/{fold.name}"] = (config, model_cfg, fold)
+            costs[f"{name}/{fold.name}"] = cost
+
+    n_cores = resolve_core_budget(config.training.scheduler.get("n_cores", config.training.n_jobs))
+    n_workers, n_jobs = plan_core_split(
+        n_models=len(jobs),
+        n_cores=n_cores,
+        max_parallel_models=nested_cfg.get("max_parallel_folds", -1),
+    )
+    order = order_longest_first(costs.items())
+    logger.info(
+        "Nested CV: %d models x %d outer folds on %d cores: %d concurrent folds x n_jobs>=%d.",
+        len(names), len(folds), n_cores, n_workers, n_jobs,
+    )
+
+    with span("train.nested", profile=True, n_jobs=len(jobs)):
+        results = run_jobs(
+            partial(_nested_fold, cache_key=cache_key), jobs, order, n_workers, n_cores=n_cores
+        )
+    if results:
+        _save_nested_results(list(results.values()))
+    if len(results) < len(jobs):
+        raise RuntimeError(
+            f"{len(jobs) - len(results)} of {len(jobs)} nested CV folds failed, see the log."
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train all enabled models.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip models whose data, configuration and code did not change "
+             "since their artifacts were written.",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Train out-of-core: read the training table by chunks and update "
+             "the models with partial_fit (see training.streaming).",
+    )
+    parser.add_argument(
+        "--nested",
+        action="store_true",
+        help="Estimate the performance of every model by nested cross-validation "
+             "(see training.nested_cv) instead of training the final models.",
+    )
+    return parser.parse_args()
+
+
+def train_all(config: Config, incremental: bool = False) -> None:
+    """
+    Default mode of main(): the enabled models (only the ones whose manifest
+    entry is out of date when `incremental`) trained by the scheduler.
+    """
+    train_df = load_split(config, "train")
+
+    enabled = {}
     for model_name, model_cfg in config.models.models.items():
         if not model_cfg.enabled:
             logger.info("Model %s disabled, skipping.", model_name)
             continue
-        train_single_model(config, model_cfg, train_df)
+        enabled[model_name] = model_cfg
+
+    manifest = TrainingManifest(TRAINING_MANIFEST_PATH)
+    data_digest = file_digest(dataset_path(config)) + file_digest(SPLITS_PATH)
+    fingerprints = {}
+    costs = {}
+    for model_name, model_cfg in list(enabled.items()):
+        ModelClass = _import_model_class(model_cfg.class_path)
+        param_grid = ModelClass(hyperparameters=model_cfg.hyperparameters).hyperparam_grid()
+        fingerprints[model_name] = model_fingerprint(
+            config, model_cfg, ModelClass, param_grid, data_digest
+        )
+        costs[model_name] = grid_cost(param_grid, config.training.cv["n_splits"])
+
+        if incremental and manifest.is_up_to_date(model_name, fingerprints[model_name]):
+            logger.info("Model %s is up to date, reusing stored artifacts.", model_name)
+            del enabled[model_name]
+
+    if not enabled:
+        logger.info("All models are up to date, nothing to train.")
+        return
+
+    scheduler_cfg = config.training.scheduler
+    n_cores = resolve_core_budget(scheduler_cfg.get("n_cores", config.training.n_jobs))
+    n_workers, n_jobs = plan_core_split(
+        n_models=len(enabled),
+        n_cores=n_cores,
+        max_parallel_models=scheduler_cfg.get("max_parallel_models", -1),
+    )
+
+    order = order_longest_first((name, costs[name]) for name in enabled)
+    logger.info(
+        "Training %d models on %d cores: %d concurrent models x n_jobs>=%d.",
+        len(order), n_cores, n_workers, n_jobs,
+    )
+    logger.info("Schedule (longest first): %s", ", ".join(f"{n} ({costs[n]} fits)" for n in order))
+
+    cache_key = _fold_cache_key(config, train_df)
+
+    if n_workers > 1:
+        jobs = {name: (config, enabled[name]) for name in order}
+        job_fn = _train_from_split
+    else:
+        jobs = {name: (config, enabled[name], train_df) for name in order}
+        job_fn = train_single_model
+
+    results = run_jobs(
+        partial(job_fn, cache_key=cache_key), jobs, order, n_workers,
+        on_result=lambda name, artifacts: manifest.record(name, fingerprints[name], artifacts),
+        n_cores=n_cores,
+    )
+    if len(results) < len(order):
+        failed = [name for name in order if name not in results]
+        raise RuntimeError(f"Training failed for {', '.join(failed)}, see the log.")
+
+
+def main():
+    args = parse_args()
+    config = Config()
+    configure_profiling(config.training.profiling, "train")
+    load_columns(config)
+
+    try:
+        if args.streaming:
+            train_streaming(config)
+        elif args.nested:
+            train_nested(config)
+        else:
+            train_all(config, incremental=args.incremental)
+    finally:
+        # The shared preprocessing cache only serves the processes of this run.
+        if config.training.preprocessing_cache.get("shared", False):
+            cache.clear_shared_cache(FOLD_CACHE_DIR)
 
 
 if __name__ == "__main__":
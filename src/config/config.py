@@ -14,6 +14,10 @@ class DatasetConfig:
     id_column: str | None
     numerical_features: list[str]
     categorical_features: list[str]
+    storage: Dict[str, Any]
+    use_sklearn_loader: bool
+    csv_path: str | None
+    ingestion: Dict[str, Any]
 
 
 @dataclass
@@ -24,6 +28,14 @@ class TrainingConfig:
     n_jobs: int
     refit_metric: str
     cv: Dict[str, Any]
+    scheduler: Dict[str, Any]
+    search: Dict[str, Any]
+    preprocessing_cache: Dict[str, Any]
+    streaming: Dict[str, Any]
+    profiling: Dict[str, Any]
+    evaluation: Dict[str, Any]
+    nested_cv: Dict[str, Any]
+    prediction_store: Dict[str, Any]
 
 
 @dataclass
@@ -33,6 +45,8 @@ class ModelConfig:
     enabled: bool
     use_scaler: bool
     hyperparameters: Dict[str, Any]
+    search: Dict[str, Any]
+    binning: Dict[str, Any]
 
 
 @dataclass
@@ -64,6 +78,10 @@ class Config:
             id_column=data.get("id_column"),
             numerical_features=data.get("numerical_features", []),
             categorical_features=data.get("categorical_features", []),
+            storage=data.get("storage", {}),
+            use_sklearn_loader=data.get("use_sklearn_loader", True),
+            csv_path=data.get("csv_path"),
+            ingestion=data.get("ingestion", {}),
         )
 
     def _load_training_config(self) -> TrainingConfig:
@@ -75,6 +93,14 @@ class Config:
             n_jobs=data["n_jobs"],
             refit_metric=data["refit_metric"],
             cv=data["cv"],
+            scheduler=data.get("scheduler", {}),
+            search=data.get("search", {}),
+            preprocessing_cache=data.get("preprocessing_cache", {}),
+            streaming=data.get("streaming", {}),
+            profiling=data.get("profiling", {}),
+            evaluation=data.get("evaluation", {}),
+            nested_cv=data.get("nested_cv", {}),
+            prediction_store=data.get("prediction_store", {}),
         )
 
     def _load_models_config(self) -> ModelsConfig:
@@ -86,8 +112,10 @@ class Config:
                 name=name,
                 class_path=cfg["class_path"],
                 enabled=cfg.get("enabled", True),
-                use_scaler=cfg.get("use_scaler", False),
-                hyperparameters=cfg.get("hyperparameters", {}),
+                use_scaler=cfg.get("use_scaler", cfg.get("use_standard_scaler", False)),
+                hyperparameters=cfg.get("hyperparameters", cfg.get("grid", {})),
+                search=cfg.get("search", {}),
+                binning=cfg.get("binning", {}),
             )
 
         return ModelsConfig(models=model_dict)
@@ -1,34 +1,27 @@
-from typing import Tuple
+from __future__ import annotations
 
-import pandas as pd
-from sklearn.datasets import load_breast_cancer
+import json
+from pathlib import Path
+from typing import Tuple
 
 from src.config.config import Config
-from src.utils.paths import DATA_RAW_DIR
+from src.data.ingestion import load_source
+from src.utils.io import save_csv, save_table
+from src.utils.lazy import lazy_import
+from src.utils.paths import DATA_INTERIM_DIR, DATA_RAW_DIR
 from src.utils.logging import get_logger
+from src.utils.profiling import timed
 
-logger = get_logger(__name__)
-
-RAW_FILENAME = "breast-cancer.csv"
-
-
-def _build_dataset_from_sklearn() -> pd.DataFrame:
-    """
-    Load the breast cancer dataset directly from sklearn
-    and return it as a DataFrame.
-
-    We do NOT hardcode any feature names here.
-    """
-    sk = load_breast_cancer(as_frame=True)
-    df = sk.frame.copy()
+pd = lazy_import("pandas")
 
-    # Add an ID column at the beginning
-    df.insert(0, "id", range(1, len(df) + 1))
+logger = get_logger(__name__)
 
-    # Target column is 'target' (numeric 0/1)
-    return df
+RAW_NAME = "breast-cancer"
+RAW_FILENAME = f"{RAW_NAME}.csv"
+COLUMNS_PATH = DATA_INTERIM_DIR / "columns.json"
 
 
+@timed()
 def auto_detect_columns(config: Config, df: pd.DataFrame) -> None:
     """
     Automatically detect numerical and categorical feature columns
@@ -59,27 +52,70 @@ def auto_detect_columns(config: Config, df: pd.DataFrame) -> None:
     logger.info("Auto-detected categorical features: %s", categorical_cols)
 
 
+def save_columns(config: Config) -> Path:
+    """
+    Persist the detected feature columns, so that the later stages reuse
+    them instead of detecting them again.
+    """
+    dataset = config.dataset
+    COLUMNS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(COLUMNS_PATH, "w", encoding="utf-8") as f:
+        json.dump({
+            "id_column": dataset.id_column,
+            "target_column": dataset.target_column,
+            "numerical_features": dataset.numerical_features,
+            "categorical_features": dataset.categorical_features,
+        }, f, indent=2)
+    return COLUMNS_PATH
+
+
+def load_columns(config: Config) -> None:
+    """
+    Fill config.dataset.numerical_features and categorical_features with
+    the columns detected by scripts.prepare_data.
+    """
+    if not COLUMNS_PATH.exists():
+        raise FileNotFoundError("Run scripts.prepare_data first.")
+    with open(COLUMNS_PATH, "r", encoding="utf-8") as f:
+        columns = json.load(f)
+    dataset = config.dataset
+    expected = (dataset.id_column, dataset.target_column)
+    if (columns["id_column"], columns["target_column"]) != expected:
+        raise ValueError(
+            f"{COLUMNS_PATH} was written for other id / target columns, "
+            "run scripts.prepare_data again."
+        )
+    dataset.numerical_features = columns["numerical_features"]
+    dataset.categorical_features = columns["categorical_features"]
+
+
+@timed()
 def load_raw_dataset(config: Config) -> pd.DataFrame:
     """
-    Load the dataset from sklearn, automatically detect the
-    feature columns, and save a raw CSV copy.
+    Load the dataset from the configured source (see ingestion.py),
+    automatically detect and persist the feature columns, and save a raw
+    copy in the configured storage format (plus a CSV export if requested).
 
     No manual CSV download is required and no column names
     are hardcoded for features.
     """
     DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
-    raw_path = DATA_RAW_DIR / RAW_FILENAME
+    storage = config.dataset.storage
 
-    logger.info("Loading breast cancer dataset from sklearn...")
-    df = _build_dataset_from_sklearn()
+    df = load_source(config.dataset)
 
-    # Automatically detect features and store them in config
+    # Automatically detect features, store them in config and on disk
     auto_detect_columns(config, df)
+    save_columns(config)
 
     # Save raw dataset for reproducibility
-    df.to_csv(raw_path, index=False)
+    fmt = storage.get("format", "csv")
+    raw_path = save_table(df, DATA_RAW_DIR, RAW_NAME, fmt)
     logger.info("Raw dataset saved to %s", raw_path)
 
+    if fmt != "csv" and storage.get("export_csv", False):
+        save_csv(df, DATA_RAW_DIR / RAW_FILENAME)
+
     return df
 
 
@@ -90,13 +126,12 @@ def get_features_and_target(
     """
     Split a DataFrame into features (X) and target (y)
     using only id_column and target_column from the config.
+    Both are views of df: no column is copied.
     """
     target = config.dataset.target_column
+    id_col = config.dataset.id_column
 
     y = df[target]
-    X = df.drop(columns=[target])
-
-    if config.dataset.id_column and config.dataset.id_column in X.columns:
-        X = X.drop(columns=[config.dataset.id_column])
+    X = df.drop(columns=[c for c in (target, id_col) if c and c in df.columns])
 
     return X, y
@@ -0,0 +1,211 @@
+"""
+Raw dataset sources of scripts/prepare_data.py.
+
+The source comes from the `ingestion` block of configs/dataset.yaml
+(defaulting to the legacy `use_sklearn_loader` / `csv_path` keys):
+
+- "sklearn": the 569-row Wisconsin dataset shipped with scikit-learn;
+- "csv": a local CSV file, cut into byte ranges of about `chunk_mb` MB on
+  line boundaries and parsed by `n_jobs` processes (fields must not contain
+  line breaks);
+- "parquet": a local Parquet file, read by batches of `chunk_rows` rows;
+- "synthetic": the Wisconsin data upsampled to any number of rows
+  (src/data/synthetic.py).
+
+With `downcast`, the csv, parquet and synthetic sources store the float
+features as float32 (already at parse time for CSV) and the target as the
+smallest integer type, which halves the memory of the feature matrix. The
+sklearn source keeps float64, so that the reference results do not change.
+"""
+
+from __future__ import annotations
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from src.config.config import DatasetConfig
+from src.data.synthetic import synthetic_dataset
+from src.training.scheduler import resolve_core_budget
+from src.utils.io import _require_pyarrow
+from src.utils.lazy import lazy_import
+from src.utils.logging import get_logger
+from src.utils.paths import PROJECT_ROOT
+
+datasets = lazy_import("sklearn.datasets")
+pd = lazy_import("pandas")
+
+logger = get_logger(__name__)
+
+# Rows read to infer the CSV columns and dtypes.
+_SAMPLE_ROWS = 10_000
+
+
+def resolve_source(dataset_cfg: DatasetConfig) -> Tuple[str, Path | None]:
+    """
+    (source name, source path) of the dataset configuration.
+    """
+    options = dataset_cfg.ingestion
+    path = options.get("path") or dataset_cfg.csv_path
+    path = PROJECT_ROOT / path if path else None
+    source = options.get("source")
+    if source is None:
+        if dataset_cfg.use_sklearn_loader or path is None:
+            source = "sklearn"
+        else:
+            source = "parquet" if path.suffix == ".parquet" else "csv"
+    if source not in SOURCES:
+        raise ValueError(
+            f"Unknown dataset source '{source}'. Available: {', '.join(sorted(SOURCES))}"
+        )
+    if source not in ("csv", "parquet"):
+        return source, None
+    if path is None or not path.exists():
+        raise FileNotFoundError(f"Dataset source '{source}' needs an existing file, got {path}.")
+    return source, path
+
+
+def downcast_frame(df: pd.DataFrame, target_column: str) -> pd.DataFrame:
+    """
+    float64 columns -> float32 and the target -> smallest integer type
+    (when its values are integers).
+    """
+    floats = [c for c in df.columns if c != target_column and df[c].dtype == np.float64]
+    df = df.astype({c: np.float32 for c in floats}, copy=False)
+    if target_column in df.columns:
+        target = df[target_column]
+        if pd.api.types.is_float_dtype(target) and target.notna().all() and (target % 1 == 0).all():
+            target = target.astype(np.int64)
+        if pd.api.types.is_integer_dtype(target):
+            df[target_column] = pd.to_numeric(target, downcast="integer")
+    return df
+
+
+def _load_sklearn(
+    dataset_cfg: DatasetConfig, path: Path | None, options: Dict[str, Any]
+) -> pd.DataFrame:
+    sk = datasets.load_breast_cancer()
+    df = pd.DataFrame(sk.data, columns=sk.feature_names, copy=False)
+    df.insert(0, dataset_cfg.id_column or "id", np.arange(1, len(df) + 1))
+    df[dataset_cfg.target_column] = sk.target
+    return df
+
+
+def _csv_ranges(path: Path, header_end: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Byte ranges of about `chunk_bytes` bytes covering the rows of a CSV
+    file, each starting at the beginning of a line.
+    """
+    size = path.stat().st_size
+    bounds = [header_end]
+    with path.open("rb") as f:
+        while bounds[-1] < size:
+            f.seek(min(bounds[-1] + chunk_bytes, size))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_csv_range(
+    path: Path,
+    start: int,
+    stop: int,
+    columns: List[str],
+    dtypes: Dict[str, Any],
+    target_column: str,
+    downcast: bool,
+) -> pd.DataFrame:
+    with path.open("rb") as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns, dtype=dtypes)
+    return downcast_frame(chunk, target_column) if downcast else chunk
+
+
+def _load_csv(dataset_cfg: DatasetConfig, path: Path, options: Dict[str, Any]) -> pd.DataFrame:
+    downcast = options.get("downcast", True)
+    target = dataset_cfg.target_column
+    sample = pd.read_csv(path, nrows=_SAMPLE_ROWS)
+    columns = list(sample.columns)
+    # Float columns are parsed straight into float32; the others are inferred per range.
+    dtypes = {
+        c: np.float32 for c in columns
+        if downcast and c != target and pd.api.types.is_float_dtype(sample[c])
+    }
+    with path.open("rb") as f:
+        f.readline()
+        header_end = f.tell()
+
+    ranges = _csv_ranges(path, header_end, int(options.get("chunk_mb", 64) * 1024**2))
+    n_workers = min(len(ranges), resolve_core_budget(options.get("n_jobs", -1)))
+    args = [(path, start, stop, columns, dtypes, target, downcast) for start, stop in ranges]
+    logger.info("Parsing %s in %d blocks with %d processes.", path, len(ranges), n_workers)
+    if n_workers <= 1:
+        chunks = [_parse_csv_range(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            chunks = list(executor.map(_parse_csv_range, *zip(*args)))
+    if not chunks:
+        return sample.iloc[:0]
+    df = pd.concat(chunks, ignore_index=True, copy=False)
+    # Integer columns may have been inferred with different widths per range.
+    return downcast_frame(df, target) if downcast else df
+
+
+def _load_parquet(dataset_cfg: DatasetConfig, path: Path, options: Dict[str, Any]) -> pd.DataFrame:
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    downcast = options.get("downcast", True)
+    chunks = []
+    batch_size = options.get("chunk_rows", 200_000)
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, use_threads=True):
+        chunk = batch.to_pandas()
+        chunks.append(downcast_frame(chunk, dataset_cfg.target_column) if downcast else chunk)
+    df = pd.concat(chunks, ignore_index=True, copy=False)
+    return downcast_frame(df, dataset_cfg.target_column) if downcast else df
+
+
+def _load_synthetic(
+    dataset_cfg: DatasetConfig, path: Path | None, options: Dict[str, Any]
+) -> pd.DataFrame:
+    synthetic = options.get("synthetic", {})
+    df = synthetic_dataset(
+        n_rows=int(synthetic.get("n_rows", 1_000_000)),
+        width=synthetic.get("width", 1),
+        random_state=synthetic.get("random_state", 0),
+        jitter=synthetic.get("jitter", 0.05),
+        dtype=np.float32 if options.get("downcast", True) else np.float64,
+        id_column=dataset_cfg.id_column or "id",
+        target_column=dataset_cfg.target_column,
+        chunk_rows=options.get("chunk_rows", 200_000),
+    )
+    return downcast_frame(df, dataset_cfg.target_column) if options.get("downcast", True) else df
+
+
+SOURCES: Dict[str, Callable[[DatasetConfig, Path | None, Dict[str, Any]], pd.DataFrame]] = {
+    "sklearn": _load_sklearn,
+    "csv": _load_csv,
+    "parquet": _load_parquet,
+    "synthetic": _load_synthetic,
+}
+
+
+def load_source(dataset_cfg: DatasetConfig) -> pd.DataFrame:
+    """
+    Load the raw dataset from the configured source.
+    """
+    source, path = resolve_source(dataset_cfg)
+    logger.info(
+        "Loading dataset '%s' from source '%s'%s.",
+        dataset_cfg.name, source, f" ({path})" if path else "",
+    )
+    df = SOURCES[source](dataset_cfg, path, dataset_cfg.ingestion)
+    logger.info(
+        "Loaded %d rows x %d columns (%.1f MB).",
+        len(df), df.shape[1], df.memory_usage(index=False).sum() / 1024**2,
+    )
+    return df
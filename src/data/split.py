@@ -1,48 +1,133 @@
-from typing import Tuple
+"""
+Train/test split of the prepared dataset.
 
-import pandas as pd
-from sklearn.model_selection import train_test_split
+The dataset is stored once, as the interim table "dataset" whose rows are
+ordered split by split (the train rows, then the test rows), and the splits
+are integer arrays of row positions in that table, saved in
+data/interim/splits.npz (with "source_rows", the position of every row in
+the raw table). Every split is a contiguous range of a memory-mapped table,
+so load_split returns a view: no split is ever copied, and worker processes
+loading the same split share one physical copy.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
 
 from src.config.config import Config
+from src.utils.io import load_table, save_csv, save_table, table_path
+from src.utils.lazy import lazy_import
 from src.utils.paths import DATA_INTERIM_DIR
 from src.utils.logging import get_logger
+from src.utils.profiling import timed
+
+pd = lazy_import("pandas")
+model_selection = lazy_import("sklearn.model_selection")
 
 logger = get_logger(__name__)
 
+DATASET_NAME = "dataset"
+SPLITS_PATH = DATA_INTERIM_DIR / "splits.npz"
 
+
+@timed()
 def create_train_test_split(
-    config: Config, df: pd.DataFrame
-) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    config: Config, df: pd.DataFrame, directory: Path = DATA_INTERIM_DIR
+) -> Dict[str, np.ndarray]:
     """
-    Create train/test splits and save them under data/interim.
+    Draw a stratified train/test split of df and save the dataset table
+    (train rows first) and the split positions under `directory`
+    (data/interim by default). Returns the positions of the splits in the
+    dataset table.
     """
-    DATA_INTERIM_DIR.mkdir(parents=True, exist_ok=True)
-
-    target_col = config.dataset.target_column
-    X = df.drop(columns=[target_col])
-    y = df[target_col]
+    directory.mkdir(parents=True, exist_ok=True)
+    splits_path = directory / SPLITS_PATH.name
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
+    # Same draw as splitting the frame itself, but only row positions are shuffled.
+    train_rows, test_rows = model_selection.train_test_split(
+        np.arange(len(df)),
         test_size=config.training.test_size,
         random_state=config.training.random_state,
-        stratify=y,
+        stratify=df[config.dataset.target_column],
     )
+    order = np.concatenate([train_rows, test_rows])
+    splits = {
+        "train": np.arange(len(train_rows)),
+        "test": np.arange(len(train_rows), len(order)),
+        "source_rows": order,
+    }
 
-    train_df = X_train.copy()
-    train_df[target_col] = y_train
+    storage = config.dataset.storage
+    fmt = storage.get("format", "csv")
 
-    test_df = X_test.copy()
-    test_df[target_col] = y_test
+    path = save_table(df, directory, DATASET_NAME, fmt, rows=order)
+    np.savez(splits_path, **splits)
+    logger.info(
+        "Dataset saved to %s (%d train / %d test rows, splits in %s)",
+        path, len(train_rows), len(test_rows), splits_path,
+    )
 
-    train_path = DATA_INTERIM_DIR / "train.csv"
-    test_path = DATA_INTERIM_DIR / "test.csv"
+    if fmt != "csv" and storage.get("export_csv", False):
+        for name in ("train", "test"):
+            save_csv(df.take(order[splits[name]]), directory / f"{name}.csv")
 
-    train_df.to_csv(train_path, index=False)
-    test_df.to_csv(test_path, index=False)
+    return splits
 
-    logger.info("Train split saved to %s", train_path)
-    logger.info("Test split saved to %s", test_path)
 
-    return train_df, test_df
+def dataset_path(config: Config, directory: Path = DATA_INTERIM_DIR) -> Path:
+    """
+    Path of the interim dataset table in the configured format.
+    """
+    return table_path(directory, DATASET_NAME, config.dataset.storage.get("format", "csv"))
+
+
+def split_rows(name: str, directory: Path = DATA_INTERIM_DIR) -> np.ndarray:
+    """
+    Positions of the rows of split `name` ("train" or "test") in the dataset table.
+    """
+    splits_path = directory / SPLITS_PATH.name
+    if not splits_path.exists():
+        raise FileNotFoundError("Run scripts.prepare_data first.")
+    with np.load(splits_path) as splits:
+        return splits[name]
+
+
+def as_slice(rows: np.ndarray) -> slice | None:
+    """
+    `rows` as a slice when they are a contiguous increasing range, else None.
+    """
+    if len(rows) == 0:
+        return slice(0, 0)
+    if rows[-1] - rows[0] == len(rows) - 1 and (np.diff(rows) == 1).all():
+        return slice(int(rows[0]), int(rows[-1]) + 1)
+    return None
+
+
+def split_window(name: str) -> slice:
+    """
+    Range of the rows of split `name` in the dataset table, for the readers
+    working by chunks (iter_table, predict_file).
+    """
+    window = as_slice(split_rows(name))
+    if window is None:
+        raise ValueError(f"Split '{name}' is not a contiguous range of the dataset table.")
+    return window
+
+
+@timed()
+def load_split(config: Config, name: str, directory: Path = DATA_INTERIM_DIR) -> pd.DataFrame:
+    """
+    Rows of split `name` of the memory-mapped dataset table: a view when
+    they form a range (always the case for the splits written by
+    create_train_test_split), a copy otherwise.
+    """
+    path = dataset_path(config, directory)
+    if not path.exists():
+        raise FileNotFoundError("Run scripts.prepare_data first.")
+    rows = split_rows(name, directory)
+    df = load_table(path, mmap=True)
+    window = as_slice(rows)
+    return df.iloc[window] if window is not None else df.take(rows)
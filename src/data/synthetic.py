@@ -0,0 +1,70 @@
+"""
+Synthetic versions of the breast-cancer dataset, of any size.
+
+Rows are resampled from the real dataset with a small per-feature Gaussian
+jitter, so that class balance, feature scales and correlations stay
+realistic at every size; wider variants append noisy, rescaled copies of
+shuffled original features. The layout matches the raw data (an id column,
+the features, the target). Rows are generated by blocks of `chunk_rows`
+into one preallocated feature matrix, so memory use is the size of the
+result plus one block.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from src.utils.lazy import lazy_import
+
+datasets = lazy_import("sklearn.datasets")
+pd = lazy_import("pandas")
+
+JITTER = 0.05
+
+
+def synthetic_dataset(
+    n_rows: int,
+    width: int = 1,
+    random_state: int = 0,
+    jitter: float = JITTER,
+    dtype=np.float64,
+    id_column: str = "id",
+    target_column: str = "target",
+    chunk_rows: int = 1_000_000,
+) -> pd.DataFrame:
+    """
+    `n_rows` rows and `width` x 30 features of `dtype`. With n_rows equal to
+    the size of the real dataset, every real row is used once (plus jitter).
+    """
+    sk = datasets.load_breast_cancer()
+    X, y = sk.data, sk.target
+    n_base, n_features = X.shape
+    rng = np.random.default_rng(random_state)
+    std = X.std(axis=0, ddof=1)
+
+    perms, factors = [np.arange(n_features)], [np.ones(n_features)]
+    names = list(sk.feature_names)
+    for w in range(1, width):
+        perms.append(rng.permutation(n_features))
+        factors.append(rng.uniform(0.5, 2.0, size=n_features))
+        names += [f"{sk.feature_names[j]} #{w}" for j in perms[-1]]
+
+    values = np.empty((n_rows, n_features * width), dtype=dtype)
+    targets = np.empty(n_rows, dtype=y.dtype)
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        if n_rows == n_base:
+            rows = np.arange(start, stop)
+        else:
+            rows = rng.integers(0, n_base, size=stop - start)
+        base = X[rows]
+        for w, (perm, factor) in enumerate(zip(perms, factors)):
+            noise = rng.normal(size=base.shape) * jitter * std[perm] * factor
+            block = base[:, perm] * factor + noise
+            values[start:stop, w * n_features:(w + 1) * n_features] = block
+        targets[start:stop] = y[rows]
+
+    df = pd.DataFrame(values, columns=names, copy=False)
+    df.insert(0, id_column, np.arange(1, n_rows + 1))
+    df[target_column] = targets
+    return df
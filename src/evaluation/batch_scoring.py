@@ -0,0 +1,132 @@
+"""
+Vectorised scoring of many prediction vectors against the same labels.
+
+Search engines that produce the predictions of hundreds of candidates at
+once (e.g. a closed-form sweep) would otherwise spend most of their time in
+the per-call validation of the sklearn scorers. For the label-based metrics
+below, one confusion matrix per candidate is built with a single bincount
+and the metric is computed from it, with the sklearn defaults (macro /
+binary averaging, pos_label=1, zero_division=0).
+"""
+
+from typing import Callable, Dict
+
+import numpy as np
+
+
+def confusion_matrices(
+    y_true_codes: np.ndarray, pred_codes: np.ndarray, n_classes: int
+) -> np.ndarray:
+    """
+    Confusion matrices of shape (n_candidates, n_classes, n_classes), rows =
+    true class, columns = predicted class, from `pred_codes` of shape
+    (n_candidates, n_samples).
+    """
+    n_candidates = pred_codes.shape[0]
+    flat = (
+        np.arange(n_candidates)[:, None] * n_classes**2
+        + y_true_codes[None, :] * n_classes
+        + pred_codes
+    )
+    counts = np.bincount(flat.ravel(), minlength=n_candidates * n_classes**2)
+    return counts.reshape(n_candidates, n_classes, n_classes)
+
+
+def _divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    return np.divide(num, den, out=np.zeros_like(num, dtype=float), where=den > 0)
+
+
+def per_class_scores(cm: np.ndarray):
+    """
+    (precision, recall, f1) per class, each of shape (n_candidates, n_classes),
+    from confusion matrices of shape (n_candidates, n_classes, n_classes).
+    """
+    tp = np.diagonal(cm, axis1=1, axis2=2).astype(float)
+    precision = _divide(tp, cm.sum(axis=1))
+    recall = _divide(tp, cm.sum(axis=2))
+    f1 = _divide(2 * tp, cm.sum(axis=1) + cm.sum(axis=2))
+    return precision, recall, f1
+
+
+def _support(cm: np.ndarray) -> np.ndarray:
+    return cm.sum(axis=2)
+
+
+def _accuracy(cm: np.ndarray, pos: int) -> np.ndarray:
+    return np.diagonal(cm, axis1=1, axis2=2).sum(axis=1) / cm.sum(axis=(1, 2))
+
+
+def _balanced_accuracy(cm: np.ndarray, pos: int) -> np.ndarray:
+    recall = per_class_scores(cm)[1]
+    present = _support(cm) > 0
+    return (recall * present).sum(axis=1) / present.sum(axis=1)
+
+
+def _macro(index: int) -> Callable[[np.ndarray, int], np.ndarray]:
+    # Like sklearn, only the labels present in y_true or y_pred are averaged.
+    def metric(cm: np.ndarray, pos: int) -> np.ndarray:
+        present = (cm.sum(axis=1) + cm.sum(axis=2)) > 0
+        return (per_class_scores(cm)[index] * present).sum(axis=1) / present.sum(axis=1)
+    return metric
+
+
+def _weighted(index: int) -> Callable[[np.ndarray, int], np.ndarray]:
+    def metric(cm: np.ndarray, pos: int) -> np.ndarray:
+        support = _support(cm)
+        return (per_class_scores(cm)[index] * support).sum(axis=1) / support.sum(axis=1)
+    return metric
+
+
+def _binary(index: int) -> Callable[[np.ndarray, int], np.ndarray]:
+    return lambda cm, pos: per_class_scores(cm)[index][:, pos]
+
+
+BATCH_METRICS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "accuracy": _accuracy,
+    "balanced_accuracy": _balanced_accuracy,
+    "precision_macro": _macro(0),
+    "recall_macro": _macro(1),
+    "f1_macro": _macro(2),
+    "precision_weighted": _weighted(0),
+    "recall_weighted": _weighted(1),
+    "f1_weighted": _weighted(2),
+    "precision": _binary(0),
+    "recall": _binary(1),
+    "f1": _binary(2),
+}
+
+BINARY_METRICS = ("precision", "recall", "f1")
+
+
+def supports(scoring, classes: np.ndarray) -> bool:
+    """
+    Whether `scoring` can be computed by batch_scores for these classes.
+    """
+    if not isinstance(scoring, str) or scoring not in BATCH_METRICS:
+        return False
+    if scoring in BINARY_METRICS:
+        return len(classes) == 2 and 1 in classes.tolist()
+    return True
+
+
+def batch_scores(scoring: str, classes: np.ndarray, y_true, predictions: np.ndarray) -> np.ndarray:
+    """
+    Score every row of `predictions` (n_candidates, n_samples), whose values
+    are labels from `classes`, against `y_true`.
+    """
+    classes = np.asarray(classes)
+    labels = np.union1d(classes, np.asarray(y_true))
+    y_codes = np.searchsorted(labels, np.asarray(y_true))
+    pred_codes = np.searchsorted(labels, predictions)
+    cm = confusion_matrices(y_codes, pred_codes, len(labels))
+    return scores_from_confusion(scoring, labels, cm)
+
+
+def scores_from_confusion(scoring: str, labels: np.ndarray, cm: np.ndarray) -> np.ndarray:
+    """
+    Metric of every confusion matrix of `cm` (n_candidates, n_labels,
+    n_labels), whose rows and columns follow the sorted `labels`. Matrices
+    accumulated over several batches give the score of the whole sample.
+    """
+    pos = int(np.searchsorted(labels, 1)) if scoring in BINARY_METRICS else -1
+    return BATCH_METRICS[scoring](cm, pos)
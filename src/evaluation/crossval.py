@@ -1,4 +1,6 @@
-from sklearn.model_selection import StratifiedKFold
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import RepeatedStratifiedKFold, StratifiedKFold
 
 
 def build_cv_splits(cv_cfg: dict) -> StratifiedKFold:
@@ -10,3 +12,45 @@ def build_cv_splits(cv_cfg: dict) -> StratifiedKFold:
         shuffle=cv_cfg.get("shuffle", True),
         random_state=cv_cfg.get("random_state", 42),
     )
+
+
+def build_outer_splits(nested_cfg: dict) -> RepeatedStratifiedKFold:
+    """
+    Build the outer folds of nested cross-validation from the training config.
+    """
+    return RepeatedStratifiedKFold(
+        n_splits=nested_cfg.get("n_splits", 5),
+        n_repeats=nested_cfg.get("n_repeats", 1),
+        random_state=nested_cfg.get("random_state", 42),
+    )
+
+
+def hash_folds(keys, n_splits: int, random_state: int | None = None) -> np.ndarray:
+    """
+    Fold index (0 .. n_splits - 1) of every row from a hash of its key (an id
+    column or the row position in the table). The assignment of a row never
+    depends on the other rows, so folds can be computed chunk by chunk on
+    data that does not fit in memory. Folds are balanced in expectation but
+    not stratified.
+    """
+    hashes = pd.util.hash_array(np.asarray(keys))
+    if random_state is not None:
+        hashes = pd.util.hash_array(hashes ^ np.uint64(random_state))
+    return (hashes % np.uint64(n_splits)).astype(np.intp)
+
+
+def fold_scheme(cv) -> str:
+    """
+    Description of the CV folds of a search, saved with its CV results
+    (cv_scheme column): fold scores of two models are only paired when they
+    come from the same folds of the same rows.
+    """
+    return repr(cv)
+
+
+def hash_fold_scheme(n_splits: int, random_state: int | None, key_column: str | None) -> str:
+    """
+    fold_scheme of the folds drawn by hash_folds.
+    """
+    key = key_column or "position"
+    return f"hash_folds(n_splits={n_splits}, random_state={random_state}, key={key})"
@@ -0,0 +1,131 @@
+"""
+Evaluation of several trained models against one test set.
+
+The test features are extracted once and shared by every model: models are
+evaluated concurrently in threads of the same process (no copy of the test
+matrix, and most of the prediction time is spent in numpy / BLAS code that
+releases the GIL). Each model predicts the test set once and everything
+else (metrics, classification report, confusion matrix figure) is derived
+from a single confusion matrix (see metrics.py). Figures are rendered by a
+separate process pool (render_figure), so that matplotlib never delays the
+predictions.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from dataclasses import dataclass, field
+from multiprocessing import get_all_start_methods, get_context
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from src.evaluation.metrics import (
+    classification_report_from_confusion,
+    confusion_counts,
+    metrics_from_confusion,
+)
+from src.evaluation.prediction_store import model_scores
+from src.training.scheduler import resolve_core_budget
+from src.utils.lazy import lazy_import
+from src.utils.profiling import span
+
+joblib = lazy_import("joblib")
+
+
+@dataclass
+class ModelEvaluation:
+    name: str
+    labels: np.ndarray
+    confusion: np.ndarray
+    metrics: Dict[str, float]
+    predict_time: float
+    predictions: np.ndarray | None = None
+    scores: np.ndarray | None = None
+    score_names: List[str] = field(default_factory=list)
+
+    def report(self, digits: int = 2) -> str:
+        return classification_report_from_confusion(
+            self.confusion, [str(label) for label in self.labels], digits=digits
+        )
+
+
+def evaluate_predictions(
+    name: str, y_true, y_pred, predict_time: float = float("nan")
+) -> ModelEvaluation:
+    labels, cm = confusion_counts(y_true, y_pred)
+    return ModelEvaluation(
+        name, labels, cm, metrics_from_confusion(cm), predict_time, np.asarray(y_pred)
+    )
+
+
+def _evaluate_one(name: str, model_path: Path, X_test, y_test: np.ndarray) -> ModelEvaluation:
+    with span("evaluate_model", profile=True, model=name):
+        with span("evaluate.load_model", model=name):
+            model = joblib.load(model_path)
+        start = time.perf_counter()
+        with span("evaluate.predict", model=name, rows=len(X_test)):
+            y_pred = model.predict(X_test)
+        predict_time = time.perf_counter() - start
+        with span("evaluate.scores", model=name):
+            scores, score_names = model_scores(model, X_test)
+        with span("evaluate.metrics", model=name):
+            result = evaluate_predictions(name, y_test, y_pred, predict_time)
+        result.scores, result.score_names = scores, score_names
+        return result
+
+
+def evaluate_models(
+    model_paths: Dict[str, Path],
+    X_test,
+    y_test,
+    n_jobs: int = -1,
+) -> Iterator[ModelEvaluation]:
+    """
+    Evaluate every model of `model_paths` (name -> joblib file) on the same
+    test set, `n_jobs` models at a time, and yield the results as the models
+    finish.
+    """
+    y_test = np.asarray(y_test)
+    n_workers = max(1, min(len(model_paths), resolve_core_budget(n_jobs)))
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(_evaluate_one, name, path, X_test, y_test)
+            for name, path in model_paths.items()
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def figure_pool(n_workers: int) -> Executor | None:
+    """
+    Process pool rendering the figures in the background (None: render inline).
+    """
+    if n_workers <= 0:
+        return None
+    # Forked workers start in milliseconds (spawned ones re-import the script),
+    # but a process must not be forked while other threads run: the workers
+    # are started here, before the evaluation threads.
+    method = "fork" if "fork" in get_all_start_methods() else "spawn"
+    pool = ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context(method))
+    for future in [pool.submit(int) for _ in range(n_workers)]:
+        future.result()
+    return pool
+
+
+def render_figure(pool: Executor | None, func, *args) -> Future | None:
+    """
+    Run the plotting function `func(*args)` in `pool`, or right away without one.
+    """
+    if pool is None:
+        func(*args)
+        return None
+    return pool.submit(func, *args)
@@ -0,0 +1,364 @@
+"""
+Epoch-level search for MLPClassifier pipelines.
+
+Within each fold, every candidate is trained one epoch at a time
+(`partial_fit`, mini-batches of `batch_size`) on the training part minus a
+stratified validation split, and scored on that split after every epoch:
+
+- early stopping: a candidate stops when its validation score has not
+  improved by more than `tol` for `patience` epochs, and its weights are
+  restored to the best epoch;
+- pruning: every `check_every` epochs (after `min_epochs`), candidates whose
+  best validation score is more than `prune_margin` below the best one of
+  the fold stop training;
+- the per-epoch curves (training loss, validation score) are kept in
+  `learning_curves_`.
+
+The fold test score of a candidate is computed with its best weights,
+pruned or not. Candidates whose solver has no `partial_fit` (lbfgs) are
+fitted normally. The refit on the whole training set follows the same
+early-stopping loop.
+"""
+
+import time
+import warnings
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+
+from src.evaluation import batch_scoring
+from src.evaluation.fold_search import (
+    FoldResults,
+    FoldSearchCV,
+    fit_and_score,
+    fold_outputs,
+    split_fold,
+    split_pipeline,
+    transform_fold,
+)
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class _EpochTrainer:
+    """
+    One candidate trained epoch by epoch with early stopping on a validation split.
+    """
+
+    def __init__(
+        self, clf, classes: np.ndarray, max_epochs: int, patience: int, tol: float
+    ) -> None:
+        self.clf = clf
+        self.classes = classes
+        self.max_epochs = max_epochs
+        self.patience = patience
+        self.tol = tol
+
+        self.epoch = 0
+        self.best_score = -np.inf
+        self.best_weights = None
+        self.no_improvement = 0
+        self.pruned = False
+        self.fit_time = 0.0
+        self.curve: List[Tuple[int, float, float]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.pruned or self.no_improvement >= self.patience or self.epoch >= self.max_epochs
+
+    def step(self, X, y, X_val, y_val, score_fn) -> None:
+        start = time.perf_counter()
+        self.clf.partial_fit(X, y, classes=self.classes)
+        self.fit_time += time.perf_counter() - start
+        self.epoch += 1
+
+        score = score_fn(self.clf, X_val, y_val)
+        self.curve.append((self.epoch, float(self.clf.loss_), float(score)))
+        if score > self.best_score + self.tol:
+            self.no_improvement = 0
+        else:
+            self.no_improvement += 1
+        if score > self.best_score:
+            self.best_score = score
+            self.best_weights = (
+                [c.copy() for c in self.clf.coefs_],
+                [b.copy() for b in self.clf.intercepts_],
+            )
+
+    def restore_best(self) -> None:
+        if self.best_weights is not None:
+            self.clf.coefs_, self.clf.intercepts_ = self.best_weights
+
+
+def _supports_epochs(clf) -> bool:
+    return getattr(clf, "solver", None) in ("sgd", "adam")
+
+
+def train_epochs(
+    clfs: List[Any],
+    X,
+    y,
+    score_fn,
+    options: Dict[str, Any],
+) -> List[_EpochTrainer]:
+    """
+    Train `clfs` in lockstep on (X, y) minus a validation split, with early
+    stopping and (when options["prune_margin"] is set) pruning.
+    """
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X, y,
+        test_size=options["validation_fraction"],
+        stratify=y,
+        random_state=options["random_state"],
+    )
+    classes = np.unique(y)
+    trainers = [
+        _EpochTrainer(
+            clf, classes,
+            max_epochs=options["max_epochs"] or clf.max_iter,
+            patience=options["patience"],
+            tol=options["tol"],
+        )
+        for clf in clfs
+    ]
+
+    epoch = 0
+    while any(not t.done for t in trainers):
+        epoch += 1
+        for t in trainers:
+            if not t.done:
+                t.step(X_fit, y_fit, X_val, y_val, score_fn)
+
+        margin = options["prune_margin"]
+        check = epoch >= options["min_epochs"] and epoch % options["check_every"] == 0
+        if margin is not None and check:
+            leader = max(t.best_score for t in trainers)
+            for t in trainers:
+                if not t.done and t.best_score < leader - margin:
+                    t.pruned = True
+
+    for t in trainers:
+        t.restore_best()
+    return trainers
+
+
+def _fold_epochs(
+    estimator,
+    groups: List[Tuple[Dict[str, Any], List[int]]],
+    candidates: List[Dict[str, Any]],
+    fold_data: Tuple,
+    scorer,
+    score_fn,
+    return_train_score: bool,
+    options: Dict[str, Any],
+    return_outputs: bool = False,
+) -> Tuple[List[Tuple], List[Dict[str, Any]]]:
+    """
+    Train and score every candidate of one fold. Returns the
+    (candidate, test, train, fit_time, score_time, n_epochs, pruned, outputs)
+    records (outputs: fold_outputs when `return_outputs` is set, else None)
+    and the learning-curve rows.
+    """
+    records, curves = [], []
+    for base, members in groups:
+        transformer, _, prefix = split_pipeline(estimator, base)
+        X_tr, y_tr, X_te, y_te = transform_fold(transformer, fold_data)
+
+        clfs = []
+        for cand in members:
+            _, clf, _ = split_pipeline(estimator, candidates[cand])
+            if options["batch_size"] is not None and prefix + "batch_size" not in candidates[cand]:
+                clf.set_params(batch_size=options["batch_size"])
+            clfs.append(clf)
+
+        trainers = train_epochs(clfs, X_tr, y_tr, score_fn, options)
+        for cand, t in zip(members, trainers):
+            start = time.perf_counter()
+            test_score = scorer(t.clf, X_te, y_te)
+            score_time = time.perf_counter() - start
+            train_score = scorer(t.clf, X_tr, y_tr) if return_train_score else np.nan
+            outputs = fold_outputs(t.clf, X_te) if return_outputs else None
+
+            records.append(
+                (cand, test_score, train_score, t.fit_time, score_time, t.epoch, t.pruned, outputs)
+            )
+            curves.extend(
+                {"candidate": cand, "epoch": epoch, "train_loss": loss, "validation_score": score}
+                for epoch, loss, score in t.curve
+            )
+    return records, curves
+
+
+class EpochSearchCV(FoldSearchCV):
+    """
+    FoldSearchCV for `... -> MLPClassifier` pipelines with per-epoch early
+    stopping and pruning of the candidates that fall behind.
+
+    batch_size: mini-batch size used when the grid does not set one.
+    validation_fraction: share of each training part used for early stopping.
+    patience / tol: early stopping (epochs without an improvement > tol).
+    max_epochs: epoch cap (the estimator's max_iter when None).
+    prune_margin: pruning threshold on the validation score (None disables pruning).
+    min_epochs / check_every: when pruning is considered.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+        batch_size=None,
+        validation_fraction=0.1,
+        patience=10,
+        tol=1e-4,
+        max_epochs=None,
+        prune_margin=None,
+        min_epochs=10,
+        check_every=5,
+        random_state=None,
+    ) -> None:
+        super().__init__(
+            estimator=estimator,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=refit,
+            verbose=verbose,
+            return_train_score=return_train_score,
+            keep_outputs_mb=keep_outputs_mb,
+        )
+        self.batch_size = batch_size
+        self.validation_fraction = validation_fraction
+        self.patience = patience
+        self.tol = tol
+        self.max_epochs = max_epochs
+        self.prune_margin = prune_margin
+        self.min_epochs = min_epochs
+        self.check_every = check_every
+        self.random_state = random_state
+
+    def _options(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "validation_fraction": self.validation_fraction,
+            "patience": self.patience,
+            "tol": self.tol,
+            "max_epochs": self.max_epochs,
+            "prune_margin": self.prune_margin,
+            "min_epochs": self.min_epochs,
+            "check_every": self.check_every,
+            "random_state": self.random_state,
+        }
+
+    def _validation_score(self, clf, X, y) -> float:
+        # Called after every epoch: label-based metrics skip the scorer overhead.
+        if batch_scoring.supports(self.scoring, clf.classes_):
+            pred = clf.predict(X)[None, :]
+            return float(batch_scoring.batch_scores(self.scoring, clf.classes_, y, pred)[0])
+        return self.scorer_(clf, X, y)
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        _, _, prefix = split_pipeline(self.estimator, {})
+        transformer_keys = {k for params in candidates for k in params if not k.startswith(prefix)}
+
+        groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+        fallback = []
+        for cand, params in enumerate(candidates):
+            _, clf, _ = split_pipeline(self.estimator, params)
+            if not _supports_epochs(clf):
+                fallback.append(cand)
+                continue
+            # Candidates sharing the preprocessing parameters share the transformed fold.
+            base = {k: params[k] for k in transformer_keys if k in params}
+            groups.setdefault(repr(sorted(base.items())), (base, []))[1].append(cand)
+
+        self.n_epochs_ = np.full(results.test_scores.shape, np.nan)
+        self.pruned_ = np.zeros(results.test_scores.shape, dtype=bool)
+
+        out = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fold_epochs)(
+                self.estimator,
+                list(groups.values()),
+                candidates,
+                split_fold(X, y, train_idx, test_idx),
+                self.scorer_,
+                self._validation_score,
+                self.return_train_score,
+                self._options(),
+                self.keep_outputs_,
+            )
+            for train_idx, test_idx in splits
+        )
+
+        self.learning_curves_ = []
+        for fold, (records, curves) in enumerate(out):
+            for cand, test, train, fit_time, score_time, n_epochs, pruned, outputs in records:
+                results.record(cand, fold, test, train, fit_time, score_time, outputs)
+                self.n_epochs_[cand, fold] = n_epochs
+                self.pruned_[cand, fold] = pruned
+            for row in curves:
+                self.learning_curves_.append(
+                    {"fold": fold, **row, "params": candidates[row["candidate"]]}
+                )
+
+        for fold, (train_idx, test_idx) in enumerate(splits):
+            data = split_fold(X, y, train_idx, test_idx)
+            for cand in fallback:
+                results.record(
+                    cand, fold,
+                    *fit_and_score(
+                        self.estimator, candidates[cand], data, self.scorer_,
+                        self.return_train_score, return_outputs=self.keep_outputs_,
+                    ),
+                )
+
+        if self.verbose and groups:
+            logger.info(
+                "EpochSearchCV: %d / %d runs pruned, %.1f epochs per run on average.",
+                int(self.pruned_.sum()),
+                int(np.sum(~np.isnan(self.n_epochs_))),
+                float(np.nanmean(self.n_epochs_)),
+            )
+
+    def _format_results(self, candidates, results: FoldResults) -> Dict[str, Any]:
+        out = super()._format_results(candidates, results)
+        # Candidates fitted without partial_fit have no epoch count.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            out["mean_n_epochs"] = np.nanmean(self.n_epochs_, axis=1)
+        out["n_folds_pruned"] = self.pruned_.sum(axis=1)
+        return out
+
+    def _refit_best(self, X, y, params: Dict[str, Any]):
+        est = clone(self.estimator).set_params(**params)
+        steps = getattr(est, "steps", None)
+        clf = steps[-1][1] if steps else est
+        if not _supports_epochs(clf):
+            return est.fit(X, y)
+
+        prefix = f"{steps[-1][0]}__" if steps else ""
+        if self.batch_size is not None and prefix + "batch_size" not in params:
+            clf.set_params(batch_size=self.batch_size)
+
+        Xt = est[:-1].fit_transform(X, y) if steps and len(steps) > 1 else X
+        options = {**self._options(), "prune_margin": None}
+        train_epochs([clf], Xt, np.asarray(y), self._validation_score, options)
+        return est
@@ -0,0 +1,440 @@
+"""
+Base class for hyperparameter searches that drive the cross-validation
+loop themselves instead of delegating it to GridSearchCV.
+
+Subclasses only decide which (candidate, fold) pairs are evaluated and how;
+this class takes care of the folds, the scorer, the `cv_results_` table
+(same columns as GridSearchCV, so that reports and
+scripts/build_summary.py keep working) and the final refit.
+
+With `keep_outputs_mb` set, the engines also keep the test-fold outputs
+(predictions and scores, see fold_outputs) of every candidate while the
+estimated size fits in that budget, and `fold_outputs_` holds the
+out-of-fold predictions of the best candidate, so that the prediction
+store does not refit it on every fold.
+"""
+
+import time
+import traceback
+import warnings
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.exceptions import FitFailedWarning
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.utils import _safe_indexing
+
+from src.evaluation.prediction_store import model_scores
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class FoldResults:
+    """
+    Score and timing matrices of shape (n_candidates, n_splits).
+    Entries that were never evaluated stay NaN; a NaN test score recorded
+    for an evaluated entry is a failed fit (error_score, as in GridSearchCV).
+    `outputs` maps (candidate, fold) to the test-fold outputs kept by the engine.
+    """
+
+    def __init__(self, n_candidates: int, n_splits: int) -> None:
+        shape = (n_candidates, n_splits)
+        self.evaluated = np.zeros(shape, dtype=bool)
+        self.test_scores = np.full(shape, np.nan)
+        self.train_scores = np.full(shape, np.nan)
+        self.fit_times = np.full(shape, np.nan)
+        self.score_times = np.full(shape, np.nan)
+        self.outputs: Dict[Tuple[int, int], Tuple] = {}
+
+    def record(
+        self,
+        candidate: int,
+        fold: int,
+        test_score: float,
+        train_score: float = np.nan,
+        fit_time: float = np.nan,
+        score_time: float = np.nan,
+        outputs: Tuple | None = None,
+    ) -> None:
+        self.evaluated[candidate, fold] = True
+        self.test_scores[candidate, fold] = test_score
+        self.train_scores[candidate, fold] = train_score
+        self.fit_times[candidate, fold] = fit_time
+        self.score_times[candidate, fold] = score_time
+        if outputs is not None:
+            self.outputs[candidate, fold] = outputs
+        else:
+            self.outputs.pop((candidate, fold), None)
+
+    def n_evaluated(self) -> np.ndarray:
+        return np.sum(self.evaluated, axis=1)
+
+    def failed(self) -> np.ndarray:
+        """
+        Candidates with at least one failed fold.
+        """
+        return np.any(self.evaluated & np.isnan(self.test_scores), axis=1)
+
+    def mean_test_scores(self) -> np.ndarray:
+        """
+        Mean test score over the evaluated folds, NaN for the failed candidates.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            mean = np.nanmean(self.test_scores, axis=1)
+        mean[self.failed()] = np.nan
+        return mean
+
+
+def split_fold(X, y, train_idx: np.ndarray, test_idx: np.ndarray) -> Tuple:
+    """
+    Materialise one fold: (X_train, y_train, X_test, y_test).
+    """
+    return (
+        _safe_indexing(X, train_idx),
+        _safe_indexing(y, train_idx),
+        _safe_indexing(X, test_idx),
+        _safe_indexing(y, test_idx),
+    )
+
+
+def fold_outputs(clf, X_test) -> Tuple[np.ndarray, np.ndarray | None, List[str]]:
+    """
+    (predictions, float32 scores, score names) of a fitted classifier on the
+    test part of a fold, as stored by src/evaluation/prediction_store.py.
+    """
+    scores, names = model_scores(clf, X_test)
+    if scores is not None:
+        scores = np.asarray(scores, dtype=np.float32)
+    return clf.predict(X_test), scores, names
+
+
+def fit_and_score(
+    estimator,
+    params: Dict[str, Any],
+    fold: Tuple,
+    scorer,
+    return_train_score: bool,
+    error_score=np.nan,
+    return_outputs: bool = False,
+) -> Tuple:
+    """
+    Fit a clone of `estimator` with `params` on one fold (see split_fold) and score it.
+
+    Returns (test_score, train_score, fit_time, score_time), followed by the
+    fold_outputs of the test part when `return_outputs` is set (None for a
+    failed fit). As in GridSearchCV, a fit or a scoring that raises is
+    reported with a FitFailedWarning and scored `error_score` (re-raised
+    when error_score="raise").
+    """
+    X_train, y_train, X_test, y_test = fold
+    est = clone(estimator).set_params(**params)
+    fit_time = score_time = 0.0
+
+    try:
+        start = time.perf_counter()
+        est.fit(X_train, y_train)
+        fit_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        test_score = scorer(est, X_test, y_test)
+        score_time = time.perf_counter() - start
+
+        train_score = scorer(est, X_train, y_train) if return_train_score else np.nan
+        outputs = fold_outputs(est, X_test) if return_outputs else None
+    except Exception:
+        if error_score == "raise":
+            raise
+        warnings.warn(
+            f"Fit failed for {params}, score set to {error_score}:\n{traceback.format_exc()}",
+            FitFailedWarning,
+        )
+        test_score = train_score = error_score
+        outputs = None
+    if return_outputs:
+        return test_score, train_score, fit_time, score_time, outputs
+    return test_score, train_score, fit_time, score_time
+
+
+class PrecomputedPredictions(ClassifierMixin, BaseEstimator):
+    """
+    Stand-in classifier returning outputs computed elsewhere, so that the
+    regular sklearn scorers can score predictions produced by a search
+    engine without refitting an estimator. The X passed by the scorer is ignored.
+    """
+
+    def __init__(self, classes, predictions=None, proba=None, decision=None) -> None:
+        self.classes = classes
+        self.classes_ = np.asarray(classes)
+        self.predictions = predictions
+        self.proba = proba
+        self.decision = decision
+
+    def predict(self, X):
+        if self.predictions is not None:
+            return self.predictions
+        scores = self.proba if self.proba is not None else self.decision
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(np.intp)]
+        return self.classes_[np.argmax(scores, axis=1)]
+
+    def predict_proba(self, X):
+        if self.proba is None:
+            raise AttributeError("predict_proba is not available.")
+        return self.proba
+
+    def decision_function(self, X):
+        if self.decision is None:
+            raise AttributeError("decision_function is not available.")
+        return self.decision
+
+
+def split_pipeline(estimator, params: Dict[str, Any]) -> Tuple[Any, Any, str]:
+    """
+    Clone `estimator` with `params` and split it into (transformer, final
+    estimator, parameter prefix of the final step). `transformer` is None
+    for a bare estimator.
+    """
+    est = clone(estimator).set_params(**params)
+    steps = getattr(est, "steps", None)
+    if not steps:
+        return None, est, ""
+    transformer = est[:-1] if len(steps) > 1 else None
+    return transformer, steps[-1][1], f"{steps[-1][0]}__"
+
+
+def transform_fold(transformer, fold: Tuple) -> Tuple:
+    """
+    Fit `transformer` on the training part of a fold and transform both parts.
+    """
+    X_train, y_train, X_test, y_test = fold
+    if transformer is None:
+        return fold
+    X_train = transformer.fit_transform(X_train, y_train)
+    return X_train, y_train, transformer.transform(X_test), y_test
+
+
+class FoldSearchCV(BaseEstimator):
+    """
+    Exhaustive fold-by-fold search with the GridSearchCV interface
+    (`best_estimator_`, `best_params_`, `best_score_`, `cv_results_`).
+
+    keep_outputs_mb: budget of the test-fold outputs kept during the search
+        (0 disables it). When they fit, `fold_outputs_` is the (fold,
+        prediction, scores, score names) tuple of the best candidate for
+        every training row; it is None otherwise.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+    ) -> None:
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.verbose = verbose
+        self.return_train_score = return_train_score
+        self.keep_outputs_mb = keep_outputs_mb
+
+    # ------------------------------------------------------------------
+    # Hooks for subclasses
+    # ------------------------------------------------------------------
+    def _candidate_params(self) -> List[Dict[str, Any]]:
+        return list(ParameterGrid(self.param_grid))
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        for fold, (train_idx, test_idx) in enumerate(splits):
+            data = split_fold(X, y, train_idx, test_idx)
+            out = Parallel(n_jobs=self.n_jobs)(
+                delayed(fit_and_score)(
+                    self.estimator, params, data, self.scorer_, self.return_train_score,
+                    return_outputs=self.keep_outputs_,
+                )
+                for params in candidates
+            )
+            for cand, scores in enumerate(out):
+                results.record(cand, fold, *scores)
+
+    def _rank_keys(self, results: FoldResults) -> List[np.ndarray]:
+        """
+        Keys used to rank candidates, most significant first, all sorted in
+        decreasing order (default: mean test score only).
+        """
+        return [results.mean_test_scores()]
+
+    def _refit_best(self, X, y, params: Dict[str, Any]):
+        return clone(self.estimator).set_params(**params).fit(X, y)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def fit(self, X, y):
+        self.scorer_ = check_scoring(self.estimator, scoring=self.scoring)
+        cv = check_cv(self.cv, y, classifier=True)
+        splits = list(cv.split(X, y))
+        self.n_splits_ = len(splits)
+
+        candidates = self._candidate_params()
+        if self.verbose:
+            logger.info(
+                "%s: %d candidates x %d folds.",
+                type(self).__name__, len(candidates), self.n_splits_,
+            )
+
+        results = FoldResults(len(candidates), self.n_splits_)
+        self.keep_outputs_ = self._fits_outputs_budget(len(candidates), y)
+        self._run_search(X, y, candidates, splits, results)
+
+        self.cv_results_ = self._format_results(candidates, results)
+        self.best_index_ = int(np.argmin(self.cv_results_["rank_test_score"]))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(self.cv_results_["mean_test_score"][self.best_index_])
+        self.fold_outputs_ = best_fold_outputs(results, self.best_index_, splits, len(y))
+
+        if self.refit:
+            start = time.perf_counter()
+            self.best_estimator_ = self._refit_best(X, y, self.best_params_)
+            self.refit_time_ = time.perf_counter() - start
+        return self
+
+    def _fits_outputs_budget(self, n_candidates: int, y) -> bool:
+        # Every row is in one test part: one prediction and one float32 score per class.
+        n_values = n_candidates * len(y) * (len(np.unique(y)) + 1)
+        return bool(self.keep_outputs_mb) and n_values * 4 <= self.keep_outputs_mb * 1024**2
+
+    def _format_results(self, candidates, results: FoldResults) -> Dict[str, Any]:
+        return format_cv_results(
+            candidates, results, self._rank_keys(results), self.return_train_score
+        )
+
+    # Delegation to the refitted estimator, as GridSearchCV does.
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
+
+    def decision_function(self, X):
+        return self.best_estimator_.decision_function(X)
+
+    def score(self, X, y):
+        return self.scorer_(self.best_estimator_, X, y)
+
+    @property
+    def classes_(self):
+        return self.best_estimator_.classes_
+
+
+def best_fold_outputs(
+    results: FoldResults,
+    candidate: int,
+    splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+    n_rows: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray | None, List[str]] | None:
+    """
+    (fold, prediction, scores, score names) of every row for `candidate`,
+    assembled from the test-fold outputs kept in `results`; None when one
+    of its folds was not kept (budget exceeded, failed fit, fold skipped).
+    """
+    if any((candidate, fold) not in results.outputs for fold in range(len(splits))):
+        return None
+    folds = np.empty(n_rows, dtype=np.int8)
+    predictions = scores = None
+    for fold, (_, test_idx) in enumerate(splits):
+        fold_predictions, fold_scores, names = results.outputs[candidate, fold]
+        if predictions is None:
+            predictions = np.empty(n_rows, dtype=np.asarray(fold_predictions).dtype)
+            if fold_scores is not None:
+                scores = np.empty((n_rows, fold_scores.shape[1]), dtype=np.float32)
+        folds[test_idx] = fold
+        predictions[test_idx] = fold_predictions
+        if scores is not None:
+            scores[test_idx] = fold_scores
+    return folds, predictions, scores, names
+
+
+def format_cv_results(
+    candidates: List[Dict[str, Any]],
+    results: FoldResults,
+    rank_keys: List[np.ndarray],
+    return_train_score: bool,
+) -> Dict[str, Any]:
+    """
+    `cv_results_` table in the GridSearchCV layout, ranked by `rank_keys`
+    (see rank_descending).
+    """
+    # Candidates that were never evaluated produce "Mean of empty slice" warnings.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        out: Dict[str, Any] = {
+            "mean_fit_time": np.nanmean(results.fit_times, axis=1),
+            "std_fit_time": np.nanstd(results.fit_times, axis=1),
+            "mean_score_time": np.nanmean(results.score_times, axis=1),
+            "std_score_time": np.nanstd(results.score_times, axis=1),
+        }
+
+        param_names = sorted({k for params in candidates for k in params})
+        for name in param_names:
+            out[f"param_{name}"] = [params.get(name) for params in candidates]
+        out["params"] = candidates
+
+        for fold in range(results.test_scores.shape[1]):
+            out[f"split{fold}_test_score"] = results.test_scores[:, fold]
+        failed = results.failed()
+        out["mean_test_score"] = results.mean_test_scores()
+        out["std_test_score"] = np.where(failed, np.nan, np.nanstd(results.test_scores, axis=1))
+        out["rank_test_score"] = rank_descending(rank_keys)
+
+        if return_train_score:
+            for fold in range(results.train_scores.shape[1]):
+                out[f"split{fold}_train_score"] = results.train_scores[:, fold]
+            out["mean_train_score"] = np.where(
+                failed, np.nan, np.nanmean(results.train_scores, axis=1)
+            )
+            out["std_train_score"] = np.where(
+                failed, np.nan, np.nanstd(results.train_scores, axis=1)
+            )
+
+        out["n_folds_evaluated"] = results.n_evaluated()
+    return out
+
+
+def rank_descending(keys: List[np.ndarray]) -> np.ndarray:
+    """
+    Rank candidates by decreasing keys (1 = best, ties share the smallest rank).
+    NaN values are ranked last.
+    """
+    keys = [np.where(np.isnan(k), -np.inf, np.asarray(k, dtype=float)) for k in keys]
+    # np.lexsort uses the last key as the primary one.
+    order = np.lexsort([-k for k in reversed(keys)])
+    stacked = np.column_stack(keys)[order]
+
+    ranks = np.empty(len(order), dtype=np.int32)
+    current = 1
+    for pos, idx in enumerate(order):
+        if pos > 0 and not np.array_equal(stacked[pos], stacked[pos - 1]):
+            current = pos + 1
+        ranks[idx] = current
+    return ranks
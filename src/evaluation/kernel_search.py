@@ -0,0 +1,242 @@
+"""
+Precomputed-kernel search for SVC pipelines.
+
+SVC recomputes kernel rows inside every fit and only keeps a small LRU
+cache (`cache_size`) between iterations of one fit. Here, for every fold
+and group of candidates sharing the kernel parameters (everything except
+C), the train/train and test/train Gram matrices are built once, by row
+blocks, and every C is fitted with `kernel="precomputed"` on them.
+
+Gram matrices larger than `memmap_mb` are written to a memory-mapped file
+in `cache_dir` (removed at the end of the fold) instead of being held in
+memory. They are float64 and C-contiguous, the layout SVC.fit and predict
+validate against, so every fit reads the same buffer without copying it
+(a float32 matrix would be converted to a float64 copy by every call).
+The refit on the whole training set uses the regular kernel, so the saved
+pipeline keeps its support vectors and only evaluates the kernel against
+them at prediction time.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.metrics.pairwise import pairwise_kernels
+
+from src.evaluation.fold_search import (
+    FoldResults,
+    FoldSearchCV,
+    fit_and_score,
+    fold_outputs,
+    split_fold,
+    split_pipeline,
+    transform_fold,
+)
+
+KERNELS = ("rbf", "linear", "poly", "sigmoid")
+
+
+def kernel_params(svc, X: np.ndarray) -> Dict[str, Any]:
+    """
+    Keyword arguments of pairwise_kernels equivalent to the kernel of `svc`
+    fitted on X (gamma="scale" / "auto" resolved as SVC does).
+    """
+    gamma = svc.gamma
+    if gamma == "scale":
+        X_var = X.var()
+        gamma = 1.0 / (X.shape[1] * X_var) if X_var != 0 else 1.0
+    elif gamma == "auto":
+        gamma = 1.0 / X.shape[1]
+
+    if svc.kernel == "linear":
+        return {}
+    if svc.kernel == "rbf":
+        return {"gamma": gamma}
+    if svc.kernel == "poly":
+        return {"gamma": gamma, "degree": svc.degree, "coef0": svc.coef0}
+    return {"gamma": gamma, "coef0": svc.coef0}
+
+
+def gram_matrix(
+    X: np.ndarray,
+    Y: np.ndarray,
+    kernel: str,
+    params: Dict[str, Any],
+    block_rows: int = 2048,
+    memmap_path: Path | None = None,
+) -> np.ndarray:
+    """
+    Kernel matrix K[i, j] = k(X[i], Y[j]) (float64, C order) computed by blocks
+    of `block_rows` rows, in memory or in a memory-mapped .npy file when
+    `memmap_path` is given.
+    """
+    shape = (X.shape[0], Y.shape[0])
+    if memmap_path is not None:
+        K = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=np.float64, shape=shape)
+    else:
+        K = np.empty(shape, dtype=np.float64)
+
+    for start in range(0, shape[0], block_rows):
+        stop = min(start + block_rows, shape[0])
+        K[start:stop] = pairwise_kernels(X[start:stop], Y, metric=kernel, **params)
+    return K
+
+
+def _fold_kernels(
+    estimator,
+    groups: List[Tuple[Dict[str, Any], List[Tuple[int, Any]]]],
+    fold_data: Tuple,
+    scorer,
+    return_train_score: bool,
+    options: Dict[str, Any],
+) -> List[Tuple]:
+    """
+    Score every C of every kernel group of one fold. Returns (candidate,
+    test_score, train_score, fit_time, score_time, outputs) tuples (see
+    fold_outputs; outputs is None unless options["keep_outputs"] is set).
+    """
+    records = []
+    with tempfile.TemporaryDirectory(dir=options["cache_dir"], prefix="svm_kernels_") as tmp:
+        for g, (base, path) in enumerate(groups):
+            start = time.perf_counter()
+            transformer, svc, _ = split_pipeline(estimator, base)
+            X_tr, y_tr, X_te, y_te = transform_fold(transformer, fold_data)
+            X_tr, X_te = np.asarray(X_tr, dtype=np.float64), np.asarray(X_te, dtype=np.float64)
+            kernel, params = svc.kernel, kernel_params(svc, X_tr)
+
+            itemsize = np.dtype(np.float64).itemsize
+            gram_bytes = len(X_tr) * (len(X_tr) + len(X_te)) * itemsize
+            on_disk = gram_bytes > options["memmap_mb"] * 1024**2
+            K_train, K_test = (
+                gram_matrix(
+                    A, X_tr, kernel, params,
+                    block_rows=options["block_rows"],
+                    memmap_path=Path(tmp) / f"group{g}_{name}.npy" if on_disk else None,
+                )
+                for name, A in (("train", X_tr), ("test", X_te))
+            )
+            kernel_time = (time.perf_counter() - start) / len(path)
+
+            svc.set_params(kernel="precomputed")
+            for cand, C in path:
+                start = time.perf_counter()
+                svc.set_params(C=C).fit(K_train, y_tr)
+                fit_time = kernel_time + time.perf_counter() - start
+
+                start = time.perf_counter()
+                test_score = scorer(svc, K_test, y_te)
+                score_time = time.perf_counter() - start
+
+                train_score = scorer(svc, K_train, y_tr) if return_train_score else np.nan
+                outputs = fold_outputs(svc, K_test) if options["keep_outputs"] else None
+                records.append((cand, test_score, train_score, fit_time, score_time, outputs))
+
+            del K_train, K_test
+    return records
+
+
+class KernelSearchCV(FoldSearchCV):
+    """
+    FoldSearchCV for `... -> SVC` pipelines: one Gram matrix per fold and
+    kernel configuration, shared by every value of C.
+
+    block_rows: rows of the Gram matrix computed at once.
+    memmap_mb: Gram matrices of a fold larger than this are memory-mapped.
+    cache_dir: directory of the memory-mapped files (system temp by default).
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+        block_rows=2048,
+        memmap_mb=256,
+        cache_dir=None,
+    ) -> None:
+        super().__init__(
+            estimator=estimator,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=refit,
+            verbose=verbose,
+            return_train_score=return_train_score,
+            keep_outputs_mb=keep_outputs_mb,
+        )
+        self.block_rows = block_rows
+        self.memmap_mb = memmap_mb
+        self.cache_dir = cache_dir
+
+    def _kernel_groups(
+        self, candidates: List[Dict[str, Any]], prefix: str, default_C: float, default_kernel: str
+    ) -> Tuple[List[Tuple[Dict[str, Any], List[Tuple[int, Any]]]], List[int]]:
+        """
+        Group the candidates by everything except C. Candidates whose kernel
+        cannot be precomputed here (callable, "precomputed") are returned
+        separately and fitted normally.
+        """
+        key = prefix + "C"
+        groups: Dict[str, Tuple[Dict[str, Any], List[Tuple[int, Any]]]] = {}
+        fallback = []
+        for cand, params in enumerate(candidates):
+            if params.get(prefix + "kernel", default_kernel) not in KERNELS:
+                fallback.append(cand)
+                continue
+            base = {k: v for k, v in params.items() if k != key}
+            group = groups.setdefault(repr(sorted(base.items())), (base, []))
+            group[1].append((cand, params.get(key, default_C)))
+        return list(groups.values()), fallback
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        _, svc, prefix = split_pipeline(self.estimator, {})
+        groups, fallback = self._kernel_groups(candidates, prefix, svc.C, svc.kernel)
+        options = {
+            "block_rows": self.block_rows,
+            "memmap_mb": self.memmap_mb,
+            "cache_dir": self.cache_dir,
+            "keep_outputs": self.keep_outputs_,
+        }
+
+        out = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fold_kernels)(
+                self.estimator,
+                groups,
+                split_fold(X, y, train_idx, test_idx),
+                self.scorer_,
+                self.return_train_score,
+                options,
+            )
+            for train_idx, test_idx in splits
+        )
+        for fold, records in enumerate(out):
+            for cand, *scores in records:
+                results.record(cand, fold, *scores)
+
+        for fold, (train_idx, test_idx) in enumerate(splits):
+            data = split_fold(X, y, train_idx, test_idx)
+            for cand in fallback:
+                results.record(
+                    cand, fold,
+                    *fit_and_score(
+                        self.estimator, candidates[cand], data, self.scorer_,
+                        self.return_train_score, return_outputs=self.keep_outputs_,
+                    ),
+                )
@@ -1,11 +1,41 @@
-from typing import Dict
+"""
+Test-set metrics derived from a single confusion matrix.
 
-from sklearn.metrics import (
-    accuracy_score,
-    f1_score,
-    precision_score,
-    recall_score,
-)
+The labels are the sorted union of y_true and y_pred (as in sklearn), the
+matrix is built with one bincount (batch_scoring.confusion_matrices) and
+accuracy, the macro metrics and the classification report are read from
+it, with the sklearn conventions (zero_division=0).
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.evaluation import batch_scoring
+
+REPORTED_METRICS = ("accuracy", "f1_macro", "precision_macro", "recall_macro")
+
+
+def confusion_counts(y_true, y_pred) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (labels, confusion matrix) with rows = true label, columns = predicted label.
+    """
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    labels = np.union1d(y_true, y_pred)
+    cm = batch_scoring.confusion_matrices(
+        np.searchsorted(labels, y_true), np.searchsorted(labels, y_pred)[None, :], len(labels)
+    )[0]
+    return labels, cm
+
+
+def metrics_from_confusion(cm: np.ndarray) -> Dict[str, float]:
+    """
+    Standard metrics of one confusion matrix.
+    """
+    return {
+        name: float(batch_scoring.BATCH_METRICS[name](cm[None], -1)[0])
+        for name in REPORTED_METRICS
+    }
 
 
 def compute_classification_metrics(
@@ -15,13 +45,41 @@ def compute_classification_metrics(
     """
     Compute standard metrics for binary classification.
     """
-    return {
-        "accuracy": accuracy_score(y_true, y_pred),
-        "f1_macro": f1_score(y_true, y_pred, average="macro"),
-        "precision_macro": precision_score(
-            y_true, y_pred, average="macro", zero_division=0
-        ),
-        "recall_macro": recall_score(
-            y_true, y_pred, average="macro", zero_division=0
-        ),
-    }
+    return metrics_from_confusion(confusion_counts(y_true, y_pred)[1])
+
+
+def classification_report_from_confusion(
+    cm: np.ndarray, target_names: List[str], digits: int = 2
+) -> str:
+    """
+    Text of sklearn's classification_report, computed from the confusion matrix.
+    """
+    precision, recall, f1 = (m[0] for m in batch_scoring.per_class_scores(cm[None]))
+    support = cm.sum(axis=1)
+    total = int(support.sum())
+
+    headers = ["precision", "recall", "f1-score", "support"]
+    width = max(max(len(name) for name in target_names), len("weighted avg"), digits)
+    row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+
+    report = ("{:>{width}s} " + " {:>9}" * len(headers)).format("", *headers, width=width) + "\n\n"
+    for i, name in enumerate(target_names):
+        report += row_fmt.format(
+            name, precision[i], recall[i], f1[i], int(support[i]), width=width, digits=digits
+        )
+    report += "\n"
+
+    accuracy = np.trace(cm) / total if total else 0.0
+    report += ("{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f}" + " {:>9}\n").format(
+        "accuracy", "", "", accuracy, total, width=width, digits=digits
+    )
+
+    def weighted(values: np.ndarray) -> float:
+        return float(np.average(values, weights=support)) if total else 0.0
+
+    for heading, average in (("macro avg", np.mean), ("weighted avg", weighted)):
+        report += row_fmt.format(
+            heading, average(precision), average(recall), average(f1), total,
+            width=width, digits=digits,
+        )
+    return report
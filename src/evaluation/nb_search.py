@@ -0,0 +1,172 @@
+"""
+Closed-form `var_smoothing` search for GaussianNB pipelines.
+
+The per-class means and variances of GaussianNB do not depend on
+`var_smoothing`: it only adds `var_smoothing * max(feature variance)` to every
+variance. For every fold, the class moments are computed once and the joint
+log-likelihood of all the smoothing values is evaluated in one vectorised
+pass (by blocks of `chunk_size` values to bound memory), so a sweep over
+thousands of values costs about one fit per fold.
+"""
+
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy.special import logsumexp
+
+from src.evaluation import batch_scoring
+from src.evaluation.fold_search import (
+    FoldResults,
+    FoldSearchCV,
+    PrecomputedPredictions,
+    fold_outputs,
+    split_fold,
+    split_pipeline,
+    transform_fold,
+)
+
+
+class ClassMoments:
+    """
+    Sufficient statistics of GaussianNB on one training set, computed as
+    GaussianNB.fit does (unweighted samples).
+    """
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, priors=None) -> None:
+        self.classes, y_codes = np.unique(y, return_inverse=True)
+        n_classes = len(self.classes)
+
+        self.theta = np.empty((n_classes, X.shape[1]))
+        self.var = np.empty((n_classes, X.shape[1]))
+        counts = np.bincount(y_codes, minlength=n_classes)
+        for c in range(n_classes):
+            X_c = X[y_codes == c]
+            self.theta[c] = np.average(X_c, axis=0)
+            self.var[c] = np.average((X_c - self.theta[c]) ** 2, axis=0)
+
+        self.max_feature_var = np.var(X, axis=0).max()
+        prior = np.asarray(priors) if priors is not None else counts / counts.sum()
+        self.log_prior = np.log(prior)
+
+    def joint_log_likelihood(self, X: np.ndarray, smoothings: np.ndarray) -> np.ndarray:
+        """
+        Joint log-likelihood of shape (n_smoothings, n_samples, n_classes).
+        """
+        var = self.var[None, :, :] + (smoothings * self.max_feature_var)[:, None, None]
+        sq = (X[:, None, :] - self.theta[None, :, :]) ** 2
+        log_det = -0.5 * np.sum(np.log(2.0 * np.pi * var), axis=2)
+        mahalanobis = np.einsum("ncd,scd->snc", sq, 1.0 / var)
+        return self.log_prior + log_det[:, None, :] - 0.5 * mahalanobis
+
+
+class SmoothingSearchCV(FoldSearchCV):
+    """
+    FoldSearchCV for `... -> GaussianNB` pipelines: class moments once per
+    fold and group of candidates, every `var_smoothing` from them.
+
+    chunk_size: number of smoothing values evaluated in one vectorised block.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+        chunk_size=256,
+    ) -> None:
+        super().__init__(
+            estimator=estimator,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=refit,
+            verbose=verbose,
+            return_train_score=return_train_score,
+            keep_outputs_mb=keep_outputs_mb,
+        )
+        self.chunk_size = chunk_size
+
+    def _score_sweep(
+        self, moments: ClassMoments, X: np.ndarray, y, smoothings: np.ndarray, keep_outputs=False
+    ) -> Tuple[np.ndarray, float, List]:
+        """
+        Score every smoothing value on (X, y). Returns the scores, the total
+        scoring time and the fold_outputs of every value (None unless
+        `keep_outputs` is set). Label-based metrics are computed for a whole
+        block at once (see batch_scoring), the others with the sklearn scorer.
+        """
+        start = time.perf_counter()
+        scores = np.empty(len(smoothings))
+        outputs = [None] * len(smoothings)
+        label_only = batch_scoring.supports(self.scoring, moments.classes)
+        for begin in range(0, len(smoothings), self.chunk_size):
+            jll = moments.joint_log_likelihood(X, smoothings[begin:begin + self.chunk_size])
+            predictions = moments.classes[np.argmax(jll, axis=2)]
+            if label_only:
+                scores[begin:begin + len(jll)] = batch_scoring.batch_scores(
+                    self.scoring, moments.classes, y, predictions
+                )
+                if not keep_outputs:
+                    continue
+            proba = np.exp(jll - logsumexp(jll, axis=2, keepdims=True))
+            for s in range(len(jll)):
+                clf = PrecomputedPredictions(
+                    moments.classes, predictions=predictions[s], proba=proba[s]
+                )
+                if not label_only:
+                    scores[begin + s] = self.scorer_(clf, X, y)
+                if keep_outputs:
+                    outputs[begin + s] = fold_outputs(clf, X)
+        return scores, time.perf_counter() - start, outputs
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        _, nb, prefix = split_pipeline(self.estimator, {})
+        key = prefix + "var_smoothing"
+
+        groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+        for cand, params in enumerate(candidates):
+            base = {k: v for k, v in params.items() if k != key}
+            groups.setdefault(repr(sorted(base.items())), (base, []))[1].append(cand)
+
+        for fold, (train_idx, test_idx) in enumerate(splits):
+            data = split_fold(X, y, train_idx, test_idx)
+
+            for base, members in groups.values():
+                start = time.perf_counter()
+                transformer, nb, _ = split_pipeline(self.estimator, base)
+                X_tr, y_tr, X_te, y_te = transform_fold(transformer, data)
+                X_tr, X_te = np.asarray(X_tr, dtype=np.float64), np.asarray(X_te, dtype=np.float64)
+                moments = ClassMoments(X_tr, np.asarray(y_tr), priors=nb.priors)
+                fit_time = (time.perf_counter() - start) / len(members)
+
+                smoothings = np.array(
+                    [candidates[cand].get(key, nb.var_smoothing) for cand in members], dtype=float
+                )
+                test_scores, score_time, outputs = self._score_sweep(
+                    moments, X_te, y_te, smoothings, keep_outputs=self.keep_outputs_
+                )
+                train_scores = (
+                    self._score_sweep(moments, X_tr, y_tr, smoothings)[0]
+                    if self.return_train_score else np.full(len(members), np.nan)
+                )
+
+                for i, cand in enumerate(members):
+                    results.record(
+                        cand, fold, test_scores[i], train_scores[i], fit_time,
+                        score_time / len(members), outputs[i],
+                    )
@@ -0,0 +1,293 @@
+"""
+Hyperparameter search for k-nearest-neighbour pipelines that computes the
+neighbours once per fold and metric instead of once per candidate.
+
+For every fold, the candidates are grouped by everything except
+`n_neighbors` and `weights` (i.e. by preprocessing and metric). Each group
+builds one table of the `k_max` nearest training rows of every test row,
+sorted by distance, and all the (k, weights) candidates of the group are
+scored from prefix sums over that table. Up to ties between equidistant
+neighbours, the votes are the ones KNeighborsClassifier would produce.
+"""
+
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from sklearn.metrics import pairwise_distances_chunked
+from sklearn.neighbors import NearestNeighbors
+
+from src.evaluation.fold_search import (
+    FoldResults,
+    FoldSearchCV,
+    PrecomputedPredictions,
+    fit_and_score,
+    fold_outputs,
+    split_fold,
+    split_pipeline,
+    transform_fold,
+)
+
+# Parameters scored from the neighbour table; all the others define a group.
+TABLE_PARAMS = ("n_neighbors", "weights")
+
+# Metrics accepted by KDTree / BallTree.
+TREE_METRICS = ("euclidean", "manhattan", "chebyshev", "minkowski")
+
+
+def _resolve_metric(knn) -> Tuple[str, Dict[str, Any]]:
+    """
+    Translate the metric of a KNeighborsClassifier into pairwise_distances
+    arguments (minkowski with p=1 / p=2 uses the dedicated fast kernels).
+    """
+    metric = knn.metric
+    kwargs = dict(knn.metric_params or {})
+    if metric == "minkowski":
+        p = kwargs.pop("p", knn.p)
+        if p == 1:
+            return "manhattan", kwargs
+        if p == 2:
+            return "euclidean", kwargs
+        if np.isinf(p):
+            return "chebyshev", kwargs
+        kwargs["p"] = p
+    return metric, kwargs
+
+
+def neighbor_table(
+    X_query,
+    X_ref,
+    k: int,
+    metric: str = "euclidean",
+    metric_kwargs: Dict[str, Any] | None = None,
+    index: str = "brute",
+    working_memory: int | None = None,
+    n_jobs: int | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distances and indices of the `k` nearest rows of `X_ref` for every row of
+    `X_query`, sorted by increasing distance.
+
+    index="brute" computes the distance matrix by row blocks bounded by
+    `working_memory` (MiB, sklearn's default when None) and keeps only the
+    k smallest entries of each block; "kd_tree" / "ball_tree" query a tree
+    built on `X_ref`.
+    """
+    metric_kwargs = metric_kwargs or {}
+
+    if index != "brute":
+        params = dict(metric_kwargs)
+        nn = NearestNeighbors(
+            n_neighbors=k,
+            algorithm=index,
+            metric=metric,
+            p=params.pop("p", 2),
+            metric_params=params or None,
+            n_jobs=n_jobs,
+        ).fit(X_ref)
+        return nn.kneighbors(X_query)
+
+    def _k_smallest(D: np.ndarray, start: int):
+        idx = np.argpartition(D, k - 1, axis=1)[:, :k]
+        dist = np.take_along_axis(D, idx, axis=1)
+        order = np.argsort(dist, axis=1, kind="stable")
+        return np.take_along_axis(dist, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+    blocks = list(
+        pairwise_distances_chunked(
+            X_query,
+            X_ref,
+            reduce_func=_k_smallest,
+            metric=metric,
+            n_jobs=n_jobs,
+            working_memory=working_memory,
+            **metric_kwargs,
+        )
+    )
+    return np.vstack([b[0] for b in blocks]), np.vstack([b[1] for b in blocks])
+
+
+class NeighborVotes:
+    """
+    Class votes of every k <= k_max from one neighbour table.
+
+    Prefix sums over the sorted neighbours are computed once per weighting
+    scheme, after which each k costs a slice. Distance weights follow
+    KNeighborsClassifier: when some of the k neighbours are at distance 0,
+    only those neighbours vote.
+    """
+
+    def __init__(
+        self, dist: np.ndarray, idx: np.ndarray, y_codes: np.ndarray, n_classes: int
+    ) -> None:
+        self.dist = dist
+        self.onehot = np.eye(n_classes)[y_codes[idx]]
+        self._cumsums: Dict[str, Tuple[np.ndarray, ...]] = {}
+
+    def _cumsum(self, weights: str) -> Tuple[np.ndarray, ...]:
+        if weights not in self._cumsums:
+            if weights == "uniform":
+                self._cumsums[weights] = (np.cumsum(self.onehot, axis=1),)
+            else:
+                zero = self.dist == 0
+                with np.errstate(divide="ignore"):
+                    inv = np.where(zero, 0.0, 1.0 / self.dist)
+                self._cumsums[weights] = (
+                    np.cumsum(self.onehot * inv[:, :, None], axis=1),
+                    np.cumsum(self.onehot * zero[:, :, None], axis=1),
+                    np.cumsum(zero, axis=1) > 0,
+                )
+        return self._cumsums[weights]
+
+    def proba(self, k: int, weights: str) -> np.ndarray:
+        if weights == "uniform":
+            (counts,) = self._cumsum(weights)
+            return counts[:, k - 1] / k
+
+        weighted, zero_counts, has_zero = self._cumsum(weights)
+        votes = np.where(has_zero[:, k - 1, None], zero_counts[:, k - 1], weighted[:, k - 1])
+        return votes / votes.sum(axis=1, keepdims=True)
+
+
+class NeighborsSearchCV(FoldSearchCV):
+    """
+    FoldSearchCV for `... -> KNeighborsClassifier` pipelines: one neighbour
+    table per (fold, group of candidates sharing preprocessing and metric).
+
+    index: "brute" (blocked distance matrix), "kd_tree", "ball_tree" or
+    "auto" (a tree index once the training part of a fold has at least
+    `tree_min_samples` rows and the metric supports it).
+    working_memory: memory bound (MiB) of one block of the distance matrix.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+        index="auto",
+        working_memory=None,
+        tree_min_samples=20_000,
+    ) -> None:
+        super().__init__(
+            estimator=estimator,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=refit,
+            verbose=verbose,
+            return_train_score=return_train_score,
+            keep_outputs_mb=keep_outputs_mb,
+        )
+        self.index = index
+        self.working_memory = working_memory
+        self.tree_min_samples = tree_min_samples
+
+    def _group_candidates(
+        self, candidates: List[Dict[str, Any]], prefix: str
+    ) -> Tuple[List[Tuple[Dict[str, Any], List[int]]], List[int]]:
+        """
+        Group the candidates by their non-table parameters. Candidates with
+        a callable `weights` cannot be scored from the table and are
+        returned separately.
+        """
+        table_keys = {prefix + name for name in TABLE_PARAMS}
+        groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+        fallback = []
+        for cand, params in enumerate(candidates):
+            if callable(params.get(prefix + "weights")):
+                fallback.append(cand)
+                continue
+            base = {k: v for k, v in params.items() if k not in table_keys}
+            key = repr(sorted(base.items()))
+            groups.setdefault(key, (base, []))[1].append(cand)
+        return list(groups.values()), fallback
+
+    def _index_for(self, n_ref: int, metric: str) -> str:
+        if self.index != "auto":
+            return self.index
+        if n_ref >= self.tree_min_samples and metric in TREE_METRICS:
+            return "kd_tree"
+        return "brute"
+
+    def _votes(self, X_query, X_ref, y_codes, n_classes, k_max, knn) -> NeighborVotes:
+        metric, kwargs = _resolve_metric(knn)
+        dist, idx = neighbor_table(
+            X_query, X_ref, k_max,
+            metric=metric,
+            metric_kwargs=kwargs,
+            index=self._index_for(X_ref.shape[0], metric),
+            working_memory=self.working_memory,
+            n_jobs=self.n_jobs,
+        )
+        return NeighborVotes(dist, idx, y_codes, n_classes)
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        _, _, prefix = split_pipeline(self.estimator, {})
+        groups, fallback = self._group_candidates(candidates, prefix)
+
+        for fold, (train_idx, test_idx) in enumerate(splits):
+            data = split_fold(X, y, train_idx, test_idx)
+
+            for cand in fallback:
+                results.record(
+                    cand, fold,
+                    *fit_and_score(
+                        self.estimator, candidates[cand], data, self.scorer_,
+                        self.return_train_score, return_outputs=self.keep_outputs_,
+                    ),
+                )
+
+            for base, members in groups:
+                start = time.perf_counter()
+                transformer, knn, _ = split_pipeline(self.estimator, base)
+                X_tr, y_tr, X_te, y_te = transform_fold(transformer, data)
+                classes, y_codes = np.unique(y_tr, return_inverse=True)
+
+                ks = {
+                    cand: candidates[cand].get(prefix + "n_neighbors", knn.n_neighbors)
+                    for cand in members
+                }
+                k_max = min(max(ks.values()), len(y_codes))
+
+                test_votes = self._votes(X_te, X_tr, y_codes, len(classes), k_max, knn)
+                train_votes = (
+                    self._votes(X_tr, X_tr, y_codes, len(classes), k_max, knn)
+                    if self.return_train_score else None
+                )
+                table_time = (time.perf_counter() - start) / len(members)
+
+                for cand in members:
+                    k = ks[cand]
+                    if k > k_max:
+                        continue  # more neighbours than training rows: left unevaluated
+                    weights = candidates[cand].get(prefix + "weights", knn.weights)
+
+                    start = time.perf_counter()
+                    clf = PrecomputedPredictions(classes, proba=test_votes.proba(k, weights))
+                    test_score = self.scorer_(clf, X_te, y_te)
+                    score_time = time.perf_counter() - start
+                    outputs = fold_outputs(clf, X_te) if self.keep_outputs_ else None
+
+                    train_score = np.nan
+                    if train_votes is not None:
+                        clf = PrecomputedPredictions(classes, proba=train_votes.proba(k, weights))
+                        train_score = self.scorer_(clf, X_tr, y_tr)
+
+                    results.record(
+                        cand, fold, test_score, train_score, table_time, score_time, outputs
+                    )
@@ -0,0 +1,94 @@
+"""
+Nested cross-validation (scripts/train.py --nested).
+
+A hyperparameter search picks its best candidate on the folds it reports,
+so its best_score_ is optimistic. Nested CV runs the whole search again on
+the training part of every outer fold (build_outer_splits) and scores the
+chosen model on the held-out part, which the search never saw: the mean of
+these outer scores estimates the performance of the full procedure (search
++ refit) without that bias. Every outer fold is an independent job, run by
+the scheduler of scripts/train.py.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.evaluation.crossval import build_outer_splits
+from src.evaluation.metrics import REPORTED_METRICS, compute_classification_metrics
+from src.utils.lazy import lazy_import
+
+pd = lazy_import("pandas")
+metrics = lazy_import("sklearn.metrics")
+
+
+@dataclass
+class OuterFold:
+    repeat: int
+    fold: int
+    train_rows: np.ndarray
+    test_rows: np.ndarray
+
+    @property
+    def name(self) -> str:
+        return f"r{self.repeat}f{self.fold}"
+
+
+def outer_folds(nested_cfg: Dict[str, Any], y) -> List[OuterFold]:
+    """
+    Outer folds over the rows of y (row positions), repeat by repeat.
+    """
+    splitter = build_outer_splits(nested_cfg)
+    n_splits = splitter.get_n_splits() // splitter.n_repeats
+    return [
+        OuterFold(i // n_splits, i % n_splits, train_rows, test_rows)
+        for i, (train_rows, test_rows) in enumerate(splitter.split(np.zeros(len(y)), y))
+    ]
+
+
+def score_outer_fold(search, X_test, y_test, scoring: str) -> Dict[str, Any]:
+    """
+    Scores of the model chosen by a fitted search on the held-out rows of
+    its outer fold, next to the inner CV score it was chosen with.
+    """
+    estimator = search.best_estimator_
+    scores = compute_classification_metrics(y_test, estimator.predict(X_test))
+    if scoring in scores:
+        outer = scores[scoring]
+    else:
+        outer = metrics.get_scorer(scoring)(estimator, X_test, y_test)
+    return {
+        "inner_score": float(search.best_score_),
+        "outer_score": float(outer),
+        **scores,
+        "params": json.dumps(search.best_params_, sort_keys=True, default=str),
+    }
+
+
+def summarise(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per model: mean and standard deviation of the outer scores, mean
+    inner score and its optimism (inner - outer), mean test metrics, and the
+    parameters chosen most often with the share of outer folds choosing them.
+    """
+    rows = []
+    for name, df in results.groupby("model", sort=False):
+        counts = df["params"].value_counts()
+        row = {
+            "model": name,
+            "n_outer_folds": len(df),
+            "outer_score_mean": df["outer_score"].mean(),
+            "outer_score_std": df["outer_score"].std(ddof=1),
+            "inner_score_mean": df["inner_score"].mean(),
+        }
+        row["optimism"] = row["inner_score_mean"] - row["outer_score_mean"]
+        for metric in REPORTED_METRICS:
+            row[f"{metric}_mean"] = df[metric].mean()
+        row["params_mode"] = counts.index[0]
+        row["params_stability"] = counts.iloc[0] / len(df)
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values("outer_score_mean", ascending=False, ignore_index=True)
@@ -0,0 +1,143 @@
+"""
+Regularization-path search: instead of solving every value of the
+regularization parameter from scratch, each fold walks the values in
+increasing order and warm-starts every solve from the coefficients of the
+previous one (`warm_start=True`).
+
+Candidates are grouped by all their other parameters; a group is one path
+per fold. Folds are independent and run in parallel with `n_jobs`. The
+optimum of every solve is unchanged, so the scores match a cold
+GridSearchCV up to the solver tolerance: the solver stops anywhere within
+`tol` of the optimum, and a different starting point stops at a different
+place. With a tight `tol` the scores are identical; with the default one
+(1e-4) the weakly regularised, ill-conditioned end of the path can flip a
+few held-out predictions. On the breast-cancer split with the logistic grid
+of configs/models.yaml, mean_test_score moves by up to 2.3e-3 at C=100 and
+the selected candidate is unchanged.
+"""
+
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.evaluation.fold_search import (
+    FoldResults,
+    FoldSearchCV,
+    fold_outputs,
+    split_fold,
+    split_pipeline,
+    transform_fold,
+)
+
+
+def _fold_path(
+    estimator,
+    groups: List[Tuple[Dict[str, Any], List[Tuple[int, Any]]]],
+    path_param: str,
+    fold_data: Tuple,
+    scorer,
+    return_train_score: bool,
+    return_outputs: bool = False,
+) -> List[Tuple]:
+    """
+    Walk every path of one fold. Returns (candidate, test_score,
+    train_score, fit_time, score_time, outputs) tuples (see fold_outputs;
+    outputs is None unless `return_outputs` is set).
+    """
+    records = []
+    for base, path in groups:
+        transformer, clf, _ = split_pipeline(estimator, base)
+        X_tr, y_tr, X_te, y_te = transform_fold(transformer, fold_data)
+        clf.set_params(warm_start=True)
+
+        for cand, value in path:
+            start = time.perf_counter()
+            clf.set_params(**{path_param: value}).fit(X_tr, y_tr)
+            fit_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            test_score = scorer(clf, X_te, y_te)
+            score_time = time.perf_counter() - start
+
+            train_score = scorer(clf, X_tr, y_tr) if return_train_score else np.nan
+            outputs = fold_outputs(clf, X_te) if return_outputs else None
+            records.append((cand, test_score, train_score, fit_time, score_time, outputs))
+    return records
+
+
+class RegularizationPathSearchCV(FoldSearchCV):
+    """
+    FoldSearchCV for estimators supporting `warm_start` (LogisticRegression
+    with the lbfgs / newton-cg / sag / saga solvers, ...): one warm-started
+    path over `path_param` per fold and group of candidates.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+        path_param="C",
+    ) -> None:
+        super().__init__(
+            estimator=estimator,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=refit,
+            verbose=verbose,
+            return_train_score=return_train_score,
+            keep_outputs_mb=keep_outputs_mb,
+        )
+        self.path_param = path_param
+
+    def _paths(
+        self, candidates: List[Dict[str, Any]], key: str, default: Any
+    ) -> List[Tuple[Dict[str, Any], List[Tuple[int, Any]]]]:
+        """
+        Group the candidates by their other parameters and sort each group
+        by increasing value of the path parameter (`default` when the grid
+        does not set it).
+        """
+        groups: Dict[str, Tuple[Dict[str, Any], List[Tuple[int, Any]]]] = {}
+        for cand, params in enumerate(candidates):
+            base = {k: v for k, v in params.items() if k != key}
+            group = groups.setdefault(repr(sorted(base.items())), (base, []))
+            group[1].append((cand, params.get(key, default)))
+        return [(base, sorted(path, key=lambda item: item[1])) for base, path in groups.values()]
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        _, clf, prefix = split_pipeline(self.estimator, {})
+        paths = self._paths(candidates, prefix + self.path_param, clf.get_params()[self.path_param])
+
+        out = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fold_path)(
+                self.estimator,
+                paths,
+                self.path_param,
+                split_fold(X, y, train_idx, test_idx),
+                self.scorer_,
+                self.return_train_score,
+                self.keep_outputs_,
+            )
+            for train_idx, test_idx in splits
+        )
+        for fold, records in enumerate(out):
+            for cand, *scores in records:
+                results.record(cand, fold, *scores)
@@ -0,0 +1,141 @@
+"""
+Prediction store: the row-level predictions of every model, one npy table
+per model and part in models/predictions/<model>/<part>/ (see
+src/utils/io.py), with the columns
+
+- row: position of the row in the interim dataset table (src/data/split.py);
+- fold: CV fold of the out-of-fold predictions written by scripts/train.py
+  (kept by the search engines, see FoldSearchCV.fold_outputs_, or out_of_fold),
+  TEST_FOLD (-1) for the test predictions written by scripts/evaluate.py;
+- label and prediction;
+- score_<class>: predict_proba of every class (float32), or the
+  decision_function of models without predict_proba ("score" alone for
+  binary problems).
+
+The "oof" table is a training artifact (recorded in the training manifest)
+and is never rewritten by scripts/evaluate.py, which only replaces "test".
+Tables are memory-mapped when read, so metrics, bootstrap intervals and
+figures are recomputed from them in milliseconds, without loading any model.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from src.utils.io import load_table, save_table
+from src.utils.lazy import lazy_import
+from src.utils.paths import MODELS_PREDICTIONS_DIR
+
+base = lazy_import("sklearn.base")
+pd = lazy_import("pandas")
+
+TEST_FOLD = -1
+PARTS = ("oof", "test")
+
+
+def store_path(model_name: str, part: str) -> Path:
+    if part not in PARTS:
+        raise ValueError(f"Unknown prediction part '{part}'. Available: {', '.join(PARTS)}")
+    return MODELS_PREDICTIONS_DIR / model_name / part
+
+
+def stored_models() -> List[str]:
+    if not MODELS_PREDICTIONS_DIR.exists():
+        return []
+    return sorted(
+        p.name for p in MODELS_PREDICTIONS_DIR.iterdir()
+        if p.is_dir() and not p.name.endswith(".tmp")
+    )
+
+
+def model_scores(model, X) -> Tuple[np.ndarray | None, List[str]]:
+    """
+    (scores, column names) of a fitted classifier: predict_proba when
+    available, else decision_function, else (None, []).
+    """
+    classes = [str(c) for c in getattr(model, "classes_", [])]
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(X), [f"score_{c}" for c in classes]
+    if hasattr(model, "decision_function"):
+        scores = model.decision_function(X)
+        if scores.ndim == 1:
+            return scores[:, None], ["score"]
+        return scores, [f"score_{c}" for c in classes]
+    return None, []
+
+
+def out_of_fold(estimator, X, y, cv) -> Tuple[np.ndarray, np.ndarray, np.ndarray | None, List[str]]:
+    """
+    (fold, prediction, scores, score names) of every row of X, predicted by
+    a clone of `estimator` fitted on the other folds of the splitter `cv`.
+    For searches that did not keep the outputs of their candidates: with
+    the search's own splitter, the cached preprocessing of its folds is reused.
+    """
+    y = np.asarray(y)
+    folds = np.empty(len(X), dtype=np.int8)
+    predictions = np.empty(len(X), dtype=y.dtype)
+    scores, names = None, []
+    for k, (train_idx, test_idx) in enumerate(cv.split(X, y)):
+        model = base.clone(estimator).fit(X.iloc[train_idx], y[train_idx])
+        X_k = X.iloc[test_idx]
+        folds[test_idx] = k
+        predictions[test_idx] = model.predict(X_k)
+        fold_scores, names = model_scores(model, X_k)
+        if fold_scores is not None:
+            if scores is None:
+                scores = np.empty((len(X), fold_scores.shape[1]))
+            scores[test_idx] = fold_scores
+    return folds, predictions, scores, names
+
+
+def write_predictions(
+    model_name: str,
+    part: str,
+    rows: np.ndarray,
+    labels: np.ndarray,
+    predictions: np.ndarray,
+    scores: np.ndarray | None = None,
+    score_names: List[str] | None = None,
+    folds: np.ndarray | None = None,
+) -> Path:
+    """
+    Replace the `part` ("oof" or "test") of the predictions stored for
+    `model_name`, and return the path of its table.
+    """
+    path = store_path(model_name, part)
+    n_rows = len(rows)
+    if folds is None:
+        folds = np.full(n_rows, TEST_FOLD)
+    columns = {
+        "row": np.asarray(rows, dtype=np.int64),
+        "fold": np.asarray(folds, dtype=np.int8),
+        "label": np.asarray(labels),
+        "prediction": np.asarray(predictions),
+    }
+    if scores is not None:
+        for j, name in enumerate(score_names):
+            columns[name] = np.asarray(scores[:, j], dtype=np.float32)
+    frame = pd.DataFrame(columns).sort_values(["fold", "row"], kind="stable", ignore_index=True)
+    return save_table(frame, path.parent, path.name, "npy")
+
+
+def load_predictions(model_name: str, part: str | None = None) -> pd.DataFrame:
+    """
+    Stored predictions of `model_name`: the "oof" or "test" part
+    (memory-mapped, empty when it was not written), or both parts, test
+    rows first.
+    """
+    if not (MODELS_PREDICTIONS_DIR / model_name).is_dir():
+        raise FileNotFoundError(
+            f"No stored predictions for {model_name}. Run `make train` and `make evaluate` first."
+        )
+    if part is None:
+        parts = [load_predictions(model_name, name) for name in ("test", "oof")]
+        return pd.concat(parts, ignore_index=True)
+    path = store_path(model_name, part)
+    if not path.exists():
+        return pd.DataFrame({"row": [], "fold": [], "label": [], "prediction": []})
+    return load_table(path, mmap=True)
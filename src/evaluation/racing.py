@@ -0,0 +1,117 @@
+"""
+Early-stopping racing search.
+
+All candidates start on the first fold; after `min_folds` folds, each
+candidate is compared to the current leader on the folds seen so far and
+is dropped as soon as it is significantly worse (paired differences).
+Only the surviving candidates are evaluated on the remaining folds.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.evaluation.fold_search import FoldResults, FoldSearchCV, fit_and_score, split_fold
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RacingSearchCV(FoldSearchCV):
+    """
+    Parameters (in addition to FoldSearchCV)
+    ----------
+    min_folds : int
+        Number of folds every candidate is evaluated on before elimination starts.
+    z : float
+        A candidate is dropped when the mean of its paired score differences
+        with the leader exceeds `tolerance + z * standard error`.
+    tolerance : float
+        Score difference below which two candidates are considered equivalent.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+        min_folds=2,
+        z=1.0,
+        tolerance=0.0,
+    ) -> None:
+        super().__init__(
+            estimator=estimator,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=refit,
+            verbose=verbose,
+            return_train_score=return_train_score,
+            keep_outputs_mb=keep_outputs_mb,
+        )
+        self.min_folds = min_folds
+        self.z = z
+        self.tolerance = tolerance
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        alive = np.arange(len(candidates))
+
+        for fold, (train_idx, test_idx) in enumerate(splits):
+            data = split_fold(X, y, train_idx, test_idx)
+            out = Parallel(n_jobs=self.n_jobs)(
+                delayed(fit_and_score)(
+                    self.estimator, candidates[cand], data, self.scorer_, self.return_train_score,
+                    return_outputs=self.keep_outputs_,
+                )
+                for cand in alive
+            )
+            for cand, scores in zip(alive, out):
+                results.record(cand, fold, *scores)
+
+            if fold + 1 >= self.min_folds and fold + 1 < len(splits):
+                alive = self._eliminate(results.test_scores[alive, : fold + 1], alive)
+
+            if self.verbose:
+                logger.info(
+                    "Racing fold %d/%d: %d/%d candidates still running.",
+                    fold + 1, len(splits), len(alive), len(candidates),
+                )
+
+    def _eliminate(self, scores: np.ndarray, alive: np.ndarray) -> np.ndarray:
+        """
+        Keep the candidates that are not significantly worse than the leader.
+        `scores` has shape (n_alive, n_folds_seen); candidates with a failed
+        fold (NaN score) are dropped.
+        """
+        failed = np.isnan(scores).any(axis=1)
+        if failed.all():
+            return alive[:0]
+        alive, scores = alive[~failed], scores[~failed]
+        leader = int(np.argmax(scores.mean(axis=1)))
+        diffs = scores[leader] - scores
+        n_folds = scores.shape[1]
+
+        mean_diff = diffs.mean(axis=1)
+        std_err = diffs.std(axis=1, ddof=1) / np.sqrt(n_folds) if n_folds > 1 else 0.0
+        worse = mean_diff > self.tolerance + self.z * std_err
+        worse[leader] = False
+        return alive[~worse]
+
+    def _rank_keys(self, results: FoldResults) -> List[np.ndarray]:
+        # Survivors (evaluated on every fold) are ranked before eliminated candidates.
+        return [results.n_evaluated().astype(float), results.mean_test_scores()]
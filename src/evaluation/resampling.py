@@ -0,0 +1,143 @@
+"""
+Vectorised bootstrap and paired tests over stored predictions.
+
+A bootstrap resample of the n (label, prediction) rows of a test set only
+changes how many rows fall in each confusion cell, so its confusion matrix
+is one draw of a multinomial over the K x K cells with the observed cell
+frequencies: all the resamples come from a single rng.multinomial call, as
+an (n_resamples, K, K) array scored by batch_scoring. Two models are
+compared on the same resampled rows by drawing over the joint (label,
+prediction A, prediction B) cells. No model is run and there is no Python
+loop over resamples.
+
+CV fold scores are resampled with one integer array of fold indices, and
+two models are compared fold by fold with the corrected resampled t-test of
+Nadeau & Bengio (2003), which accounts for the overlap of the training
+parts of the folds (a plain paired t-test is far too optimistic there).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.evaluation import batch_scoring
+from src.utils.lazy import lazy_import
+
+stats = lazy_import("scipy.stats")
+
+
+def _encode(y_true, *predictions) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+    y_true = np.asarray(y_true)
+    predictions = [np.asarray(p) for p in predictions]
+    labels = np.unique(np.concatenate([y_true, *predictions]))
+    codes = [np.searchsorted(labels, p) for p in predictions]
+    return labels, np.searchsorted(labels, y_true), codes
+
+
+def _check_scoring(scoring: str, labels: np.ndarray) -> None:
+    if not batch_scoring.supports(scoring, labels):
+        raise ValueError(
+            "Bootstrap needs a label-based metric among "
+            f"{', '.join(batch_scoring.BATCH_METRICS)}, got {scoring!r}."
+        )
+
+
+def percentile_interval(values: np.ndarray, confidence: float) -> Tuple[float, float]:
+    """
+    Percentile interval of the bootstrap distribution `values`.
+    """
+    low, high = np.quantile(values, [(1 - confidence) / 2, (1 + confidence) / 2])
+    return float(low), float(high)
+
+
+def bootstrap_scores(
+    y_true, y_pred, scoring: str, n_resamples: int = 10_000, random_state: int | None = None
+) -> Tuple[float, np.ndarray]:
+    """
+    (score on the test set, scores of `n_resamples` bootstrap resamples of its rows).
+    """
+    labels, y_codes, (pred_codes,) = _encode(y_true, y_pred)
+    _check_scoring(scoring, labels)
+    n_labels = len(labels)
+    cm = batch_scoring.confusion_matrices(y_codes, pred_codes[None, :], n_labels)
+    rng = np.random.default_rng(random_state)
+    draws = rng.multinomial(len(y_codes), cm.ravel() / len(y_codes), size=n_resamples)
+    resampled = draws.reshape(n_resamples, n_labels, n_labels)
+    score = batch_scoring.scores_from_confusion(scoring, labels, cm)[0]
+    return float(score), batch_scoring.scores_from_confusion(scoring, labels, resampled)
+
+
+def bootstrap_metric(
+    y_true, y_pred, scoring: str, n_resamples: int = 10_000, confidence: float = 0.95,
+    random_state: int | None = None,
+) -> Dict[str, float]:
+    """
+    Test score with its bootstrap confidence interval.
+    """
+    score, resampled = bootstrap_scores(y_true, y_pred, scoring, n_resamples, random_state)
+    low, high = percentile_interval(resampled, confidence)
+    return {"score": score, "ci_low": low, "ci_high": high}
+
+
+def paired_bootstrap(
+    y_true, pred_a, pred_b, scoring: str, n_resamples: int = 10_000, confidence: float = 0.95,
+    random_state: int | None = None,
+) -> Dict[str, float]:
+    """
+    Difference of test score between two models (a - b) on the same rows,
+    with its bootstrap confidence interval and the two-sided bootstrap
+    p-value of "no difference".
+    """
+    labels, y_codes, (a_codes, b_codes) = _encode(y_true, pred_a, pred_b)
+    _check_scoring(scoring, labels)
+    n_labels, n_rows = len(labels), len(y_codes)
+    joint = np.bincount(
+        (y_codes * n_labels + a_codes) * n_labels + b_codes, minlength=n_labels**3
+    ).reshape(n_labels, n_labels, n_labels)
+
+    rng = np.random.default_rng(random_state)
+    draws = rng.multinomial(n_rows, joint.ravel() / n_rows, size=n_resamples)
+    draws = draws.reshape(n_resamples, n_labels, n_labels, n_labels)
+    # joint[label, pred_a, pred_b]: each model's confusion matrix is a marginal.
+    diffs = (
+        batch_scoring.scores_from_confusion(scoring, labels, draws.sum(axis=3))
+        - batch_scoring.scores_from_confusion(scoring, labels, draws.sum(axis=2))
+    )
+    diff = (
+        batch_scoring.scores_from_confusion(scoring, labels, joint.sum(axis=2)[None])[0]
+        - batch_scoring.scores_from_confusion(scoring, labels, joint.sum(axis=1)[None])[0]
+    )
+    low, high = percentile_interval(diffs, confidence)
+    p_value = min(1.0, 2 * min(np.mean(diffs <= 0), np.mean(diffs >= 0)))
+    return {"diff": float(diff), "ci_low": low, "ci_high": high, "p_value": float(p_value)}
+
+
+def bootstrap_mean(
+    scores, n_resamples: int = 10_000, confidence: float = 0.95, random_state: int | None = None
+) -> Dict[str, float]:
+    """
+    Mean of CV fold scores with the bootstrap confidence interval of the
+    mean (folds drawn with replacement).
+    """
+    scores = np.asarray(scores, dtype=float)
+    rng = np.random.default_rng(random_state)
+    means = scores[rng.integers(0, len(scores), size=(n_resamples, len(scores)))].mean(axis=1)
+    low, high = percentile_interval(means, confidence)
+    return {"score": float(scores.mean()), "ci_low": low, "ci_high": high}
+
+
+def corrected_ttest(scores_a, scores_b, test_train_ratio: float) -> Dict[str, float]:
+    """
+    Corrected resampled t-test on paired fold scores (same folds for both
+    models). `test_train_ratio` is n_test / n_train of a fold, i.e.
+    1 / (n_splits - 1) for a K-fold.
+    """
+    diffs = np.asarray(scores_a, dtype=float) - np.asarray(scores_b, dtype=float)
+    k = len(diffs)
+    mean, var = diffs.mean(), diffs.var(ddof=1) if k > 1 else 0.0
+    if var == 0:
+        return {"diff": float(mean), "t": float("nan"), "p_value": 1.0 if mean == 0 else 0.0}
+    t = mean / np.sqrt((1 / k + test_train_ratio) * var)
+    return {"diff": float(mean), "t": float(t), "p_value": float(2 * stats.t.sf(abs(t), k - 1))}
@@ -0,0 +1,373 @@
+"""
+Decision-tree search that screens the `max_depth` / `min_samples_split` /
+`min_samples_leaf` candidates by pruning one fully grown tree, and only
+fits the most promising ones.
+
+For every fold, candidates are grouped by all their other parameters; each
+group grows one maximal tree and every (max_depth, min_samples_split,
+min_samples_leaf) setting is scored by stopping the decision paths of the
+samples early: at the depth limit, at the nodes with fewer than
+`min_samples_split` samples and at the splits leaving a child with fewer
+than `min_samples_leaf` samples.
+
+These pruning scores are estimates, not what a fit with the setting gives:
+
+- `min_samples_leaf` changes which split a node chooses (a split is only
+  allowed when both children keep that many samples), so the constrained
+  tree is not a pruned maximal tree;
+- scikit-learn draws the feature order of each node (and the thresholds of
+  splitter="random") from a random state shared by the whole tree, so
+  cutting a subtree shifts the draws of the nodes built after it: ties are
+  broken differently, and a pruned random tree is not the tree a separate
+  fit would grow.
+
+They are therefore only used to decide which candidates to fit: the best
+derived candidates are fitted on every fold, by batches of `verify_top`,
+until the leading candidate is one whose scores come from real fits. Only
+fitted candidates get test scores and ranks in `cv_results_`, exactly the
+ones GridSearchCV reports for them; the others (`derived_by_pruning`) have
+NaN scores, are ranked last, and keep their estimate in
+`pruned_mean_test_score`. The selection is GridSearchCV's among the fitted
+candidates: a candidate underrated by its estimate can be missed, mostly
+in randomized groups, whose scores depend on the random draws anyway. On
+the configured decision_tree grid (1620 candidates) this grows 36 trees
+per fold instead of 1620. With `verify_top=None` nothing is derived and
+every candidate is fitted.
+
+Groups with best-first growth (max_leaf_nodes) or cost-complexity pruning
+are always fitted, as are randomized groups (splitter="random",
+max_features set) when `derive_randomized` is False. All fits of a fold
+share one float32 copy of the transformed data, which the tree builder
+would otherwise recreate for every fit.
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from src.evaluation import batch_scoring
+from src.evaluation.fold_search import (
+    FoldResults,
+    FoldSearchCV,
+    PrecomputedPredictions,
+    fold_outputs,
+    split_fold,
+    split_pipeline,
+    transform_fold,
+)
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Parameters screened by pruning the maximal tree of a group.
+PRUNABLE = ("max_depth", "min_samples_split", "min_samples_leaf")
+
+
+def node_paths(tree, X: np.ndarray) -> np.ndarray:
+    """
+    Node reached by every sample at every depth of a fitted sklearn Tree,
+    shape (n_samples, max_depth + 1), -1 once the sample is in a leaf.
+    """
+    left, right = tree.children_left, tree.children_right
+    feature, threshold = tree.feature, tree.threshold
+
+    paths = np.full((X.shape[0], tree.max_depth + 1), -1, dtype=np.intp)
+    node = np.zeros(X.shape[0], dtype=np.intp)
+    rows = np.arange(X.shape[0])
+    paths[:, 0] = 0
+    for depth in range(1, tree.max_depth + 1):
+        internal = left[node] != -1
+        rows, node = rows[internal], node[internal]
+        if len(rows) == 0:
+            break
+        go_left = X[rows, feature[node]] <= threshold[node]
+        node = np.where(go_left, left[node], right[node])
+        paths[rows, depth] = node
+    return paths
+
+
+def pruned_leaves(
+    tree,
+    paths: np.ndarray,
+    max_depth: int | None,
+    min_samples_split: int,
+    min_samples_leaf: int = 1,
+) -> np.ndarray:
+    """
+    Leaf reached by every sample in the maximal tree cut at `max_depth`, at
+    the nodes with fewer than `min_samples_split` samples and at the splits
+    leaving a child with fewer than `min_samples_leaf` samples.
+    """
+    left, right, n_samples = tree.children_left, tree.children_right, tree.n_node_samples
+    smallest_child = np.where(left == -1, 0, np.minimum(n_samples[left], n_samples[right]))
+    stop_node = (left == -1) | (n_samples < min_samples_split) | (smallest_child < min_samples_leaf)
+
+    valid = paths >= 0
+    stop = stop_node[np.where(valid, paths, 0)]
+    if max_depth is not None and max_depth < paths.shape[1]:
+        stop[:, max_depth:] = True
+    first = np.argmax(stop & valid | ~valid, axis=1)
+    return paths[np.arange(len(paths)), first]
+
+
+def _resolve_min_samples_split(value, n_samples: int) -> int:
+    if isinstance(value, float):
+        return max(2, math.ceil(value * n_samples))
+    return value
+
+
+def _resolve_min_samples_leaf(value, n_samples: int) -> int:
+    if isinstance(value, float):
+        return max(1, math.ceil(value * n_samples))
+    return value
+
+
+def _is_deterministic(clf) -> bool:
+    return clf.splitter == "best" and clf.max_features in (None, 1.0)
+
+
+def _is_prunable(clf) -> bool:
+    # Best-first growth (max_leaf_nodes) and cost-complexity pruning change the tree globally.
+    return clf.max_leaf_nodes is None and clf.ccp_alpha == 0.0
+
+
+def _score_settings(scorer, scoring, classes, X, y, proba_list: List[np.ndarray]) -> List[float]:
+    if batch_scoring.supports(scoring, classes):
+        predictions = np.stack([classes[np.argmax(p, axis=1)] for p in proba_list])
+        return list(batch_scoring.batch_scores(scoring, classes, y, predictions))
+    return [scorer(PrecomputedPredictions(classes, proba=p), X, y) for p in proba_list]
+
+
+def _fold_trees(
+    estimator,
+    groups: List[Tuple[Dict[str, Any], List[int], bool]],
+    candidates: List[Dict[str, Any]],
+    prefix: str,
+    fold_data: Tuple,
+    scorer,
+    scoring,
+    return_train_score: bool,
+    return_outputs: bool = False,
+) -> List[Tuple]:
+    """
+    Score every candidate of one fold. `groups` holds (base parameters,
+    candidates, derive) triples: derived groups grow one maximal tree,
+    the others fit each candidate. Returns (candidate, test_score,
+    train_score, fit_time, score_time, outputs) tuples, with the
+    fold_outputs of the fitted candidates when `return_outputs` is set.
+    """
+    records = []
+    _, defaults, _ = split_pipeline(estimator, {})
+    prepared: Dict[str, Tuple] = {}
+    for base, members, derive in groups:
+        transformer, clf, _ = split_pipeline(estimator, base)
+        transformer_params = {k: v for k, v in base.items() if not k.startswith(prefix)}
+        key = repr(sorted(transformer_params.items()))
+        if key not in prepared:
+            X_tr, y_tr, X_te, y_te = transform_fold(transformer, fold_data)
+            prepared[key] = (
+                np.asfortranarray(X_tr, dtype=np.float32), np.asarray(y_tr),
+                np.asarray(X_te, dtype=np.float32), np.asarray(y_te),
+            )
+        X_tr, y_tr, X_te, y_te = prepared[key]
+
+        if not derive:
+            for cand in members:
+                _, clf, _ = split_pipeline(estimator, candidates[cand])
+                start = time.perf_counter()
+                clf.fit(X_tr, y_tr)
+                fit_time = time.perf_counter() - start
+                start = time.perf_counter()
+                test_score = scorer(clf, X_te, y_te)
+                score_time = time.perf_counter() - start
+                train_score = scorer(clf, X_tr, y_tr) if return_train_score else np.nan
+                outputs = fold_outputs(clf, X_te) if return_outputs else None
+                records.append((cand, test_score, train_score, fit_time, score_time, outputs))
+            continue
+
+        start = time.perf_counter()
+        clf.set_params(max_depth=None, min_samples_split=2, min_samples_leaf=1).fit(X_tr, y_tr)
+        fit_time = (time.perf_counter() - start) / len(members)
+
+        tree, classes = clf.tree_, clf.classes_
+        fractions = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+        settings = [
+            (
+                candidates[cand].get(prefix + "max_depth", defaults.max_depth),
+                _resolve_min_samples_split(
+                    candidates[cand].get(prefix + "min_samples_split", defaults.min_samples_split),
+                    len(y_tr),
+                ),
+                _resolve_min_samples_leaf(
+                    candidates[cand].get(prefix + "min_samples_leaf", defaults.min_samples_leaf),
+                    len(y_tr),
+                ),
+            )
+            for cand in members
+        ]
+
+        start = time.perf_counter()
+        test_paths = node_paths(tree, X_te)
+        test_scores = _score_settings(
+            scorer, scoring, classes, X_te, y_te,
+            [fractions[pruned_leaves(tree, test_paths, *setting)] for setting in settings],
+        )
+        score_time = (time.perf_counter() - start) / len(members)
+
+        train_scores = [np.nan] * len(members)
+        if return_train_score:
+            train_paths = node_paths(tree, X_tr)
+            train_scores = _score_settings(
+                scorer, scoring, classes, X_tr, y_tr,
+                [fractions[pruned_leaves(tree, train_paths, *setting)] for setting in settings],
+            )
+
+        for i, cand in enumerate(members):
+            records.append((cand, test_scores[i], train_scores[i], fit_time, score_time, None))
+    return records
+
+
+class TreeSearchCV(FoldSearchCV):
+    """
+    FoldSearchCV for `... -> DecisionTreeClassifier` pipelines: one maximal
+    tree per fold and group of candidates, whose pruning screens the
+    `max_depth` / `min_samples_split` / `min_samples_leaf` candidates.
+
+    derive_randomized: also screen the candidates of randomized groups
+        (splitter="random" or max_features set) by pruning instead of fitting them.
+    verify_top: size of the batches of best derived candidates fitted on every
+        fold (must be positive). None fits every candidate instead of
+        deriving any.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        scoring=None,
+        cv=None,
+        n_jobs=None,
+        refit=True,
+        verbose=0,
+        return_train_score=False,
+        keep_outputs_mb=0,
+        derive_randomized=True,
+        verify_top=10,
+    ) -> None:
+        super().__init__(
+            estimator=estimator,
+            param_grid=param_grid,
+            scoring=scoring,
+            cv=cv,
+            n_jobs=n_jobs,
+            refit=refit,
+            verbose=verbose,
+            return_train_score=return_train_score,
+            keep_outputs_mb=keep_outputs_mb,
+        )
+        self.derive_randomized = derive_randomized
+        self.verify_top = verify_top
+
+    def _tree_groups(
+        self, candidates: List[Dict[str, Any]], prefix: str
+    ) -> List[Tuple[Dict[str, Any], List[int], bool]]:
+        prunable = {prefix + name for name in PRUNABLE}
+        groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+        for cand, params in enumerate(candidates):
+            base = {k: v for k, v in params.items() if k not in prunable}
+            groups.setdefault(repr(sorted(base.items())), (base, []))[1].append(cand)
+
+        out = []
+        for base, members in groups.values():
+            _, clf, _ = split_pipeline(self.estimator, base)
+            derive = (
+                self.verify_top is not None
+                and _is_prunable(clf)
+                and (self.derive_randomized or _is_deterministic(clf))
+            )
+            out.append((base, members, derive))
+        return out
+
+    def _run_search(
+        self,
+        X,
+        y,
+        candidates: List[Dict[str, Any]],
+        splits: Sequence[Tuple[np.ndarray, np.ndarray]],
+        results: FoldResults,
+    ) -> None:
+        if self.verify_top is not None and self.verify_top < 1:
+            raise ValueError(f"verify_top must be positive or None, got {self.verify_top}.")
+        _, _, prefix = split_pipeline(self.estimator, {})
+        groups = self._tree_groups(candidates, prefix)
+
+        if self.verbose:
+            logger.info(
+                "TreeSearchCV: %d trees per fold for %d candidates (%d derived by pruning).",
+                sum(1 if derive else len(members) for _, members, derive in groups),
+                len(candidates),
+                sum(len(members) for _, members, derive in groups if derive),
+            )
+
+        self.derived_ = np.zeros(len(candidates), dtype=bool)
+        for _, members, derive in groups:
+            self.derived_[members] = derive
+        self._score_folds(X, y, groups, candidates, prefix, splits, results)
+
+        # Verify by batches until the leading candidate has been fitted for real.
+        n_verified = 0
+        while self.derived_.any():
+            # Failed fits (NaN) never lead.
+            mean = np.nan_to_num(results.mean_test_scores(), nan=-np.inf)
+            derived = np.flatnonzero(self.derived_)
+            top = derived[np.argsort(-mean[derived], kind="stable")[: self.verify_top]]
+            self._score_folds(
+                X, y,
+                [(candidates[cand], [int(cand)], False) for cand in top],
+                candidates, prefix, splits, results,
+            )
+            self.derived_[top] = False
+            n_verified += len(top)
+            mean = np.nan_to_num(results.mean_test_scores(), nan=-np.inf)
+            if not self.derived_[np.argmax(mean)]:
+                break
+
+        if self.verbose and n_verified:
+            logger.info("TreeSearchCV: %d best derived candidates fitted.", n_verified)
+
+    def _score_folds(self, X, y, groups, candidates, prefix, splits, results: FoldResults) -> None:
+        out = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fold_trees)(
+                self.estimator,
+                groups,
+                candidates,
+                prefix,
+                split_fold(X, y, train_idx, test_idx),
+                self.scorer_,
+                self.scoring,
+                self.return_train_score,
+                self.keep_outputs_,
+            )
+            for train_idx, test_idx in splits
+        )
+        for fold, records in enumerate(out):
+            for cand, *scores in records:
+                results.record(cand, fold, *scores)
+
+    def _rank_keys(self, results: FoldResults) -> List[np.ndarray]:
+        # Pruning estimates are not scores: the derived candidates are ranked last.
+        return [np.where(self.derived_, np.nan, results.mean_test_scores())]
+
+    def _format_results(self, candidates, results: FoldResults) -> Dict[str, Any]:
+        out = super()._format_results(candidates, results)
+        derived = self.derived_.copy()
+        estimates = out["mean_test_score"]
+        for key in out:
+            if key.endswith(("_test_score", "_train_score")) and key != "rank_test_score":
+                out[key] = np.where(derived, np.nan, out[key])
+        out["pruned_mean_test_score"] = np.where(derived, estimates, np.nan)
+        out["derived_by_pruning"] = derived
+        return out
@@ -1,30 +1,255 @@
-from typing import Dict
+from typing import Any, Callable, Dict
 
-from sklearn.model_selection import GridSearchCV
+import numpy as np
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    GridSearchCV,
+    HalvingGridSearchCV,
+    HalvingRandomSearchCV,
+    RandomizedSearchCV,
+)
 
 from src.evaluation.crossval import build_cv_splits
+from src.evaluation.epoch_search import EpochSearchCV
+from src.evaluation.fold_search import rank_descending
+from src.evaluation.kernel_search import KernelSearchCV
+from src.evaluation.nb_search import SmoothingSearchCV
+from src.evaluation.neighbors_search import NeighborsSearchCV
+from src.evaluation.path_search import RegularizationPathSearchCV
+from src.evaluation.racing import RacingSearchCV
+from src.evaluation.tree_search import TreeSearchCV
+from src.training.scheduler import count_candidates
+from src.utils import profiling
+
+
+class _LastIterationRanking:
+    """
+    Successive-halving searches rank every row of cv_results_ together, so a
+    candidate scored on a tiny first-round sample can get rank 1. Re-rank the
+    rows so that the candidates of the last iteration come first, which keeps
+    `rank_test_score` consistent with `best_index_` for the reports.
+    """
+
+    def fit(self, X, y=None, **params):
+        super().fit(X, y, **params)
+        results = self.cv_results_
+        results["rank_test_score"] = rank_descending(
+            [np.asarray(results["iter"], dtype=float), results["mean_test_score"]]
+        )
+        return self
+
+
+class _HalvingGridSearchCV(_LastIterationRanking, HalvingGridSearchCV):
+    pass
+
+
+class _HalvingRandomSearchCV(_LastIterationRanking, HalvingRandomSearchCV):
+    pass
+
+
+def _build_grid(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return GridSearchCV(estimator=pipeline, param_grid=param_grid, **common)
+
+
+def _build_random(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    n_iter = min(int(options.get("n_iter", 50)), count_candidates(param_grid))
+    return RandomizedSearchCV(
+        estimator=pipeline,
+        param_distributions=param_grid,
+        n_iter=n_iter,
+        random_state=options.get("random_state"),
+        **common,
+    )
+
+
+def _build_halving(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    halving = {
+        "factor": options.get("factor", 3),
+        "min_resources": options.get("min_resources", "smallest"),
+        "aggressive_elimination": options.get("aggressive_elimination", False),
+        "random_state": options.get("random_state"),
+    }
+
+    # With a candidate budget smaller than the grid, sample the first round.
+    n_candidates = options.get("n_candidates")
+    if n_candidates is not None and n_candidates < count_candidates(param_grid):
+        return _HalvingRandomSearchCV(
+            estimator=pipeline,
+            param_distributions=param_grid,
+            n_candidates=n_candidates,
+            **halving,
+            **common,
+        )
+    return _HalvingGridSearchCV(estimator=pipeline, param_grid=param_grid, **halving, **common)
+
+
+def _build_racing(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return RacingSearchCV(
+        estimator=pipeline,
+        param_grid=param_grid,
+        min_folds=options.get("min_folds", 2),
+        z=options.get("z", 1.0),
+        tolerance=options.get("tolerance", 0.0),
+        **common,
+    )
+
+
+def _build_neighbors(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return NeighborsSearchCV(
+        estimator=pipeline,
+        param_grid=param_grid,
+        index=options.get("index", "auto"),
+        working_memory=options.get("working_memory"),
+        tree_min_samples=options.get("tree_min_samples", 20_000),
+        **common,
+    )
+
+
+def _build_path(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return RegularizationPathSearchCV(
+        estimator=pipeline,
+        param_grid=param_grid,
+        path_param=options.get("path_param", "C"),
+        **common,
+    )
+
+
+def _build_kernel(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return KernelSearchCV(
+        estimator=pipeline,
+        param_grid=param_grid,
+        block_rows=options.get("block_rows", 2048),
+        memmap_mb=options.get("memmap_mb", 256),
+        cache_dir=options.get("cache_dir"),
+        **common,
+    )
+
+
+def _build_smoothing(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return SmoothingSearchCV(
+        estimator=pipeline,
+        param_grid=param_grid,
+        chunk_size=options.get("chunk_size", 256),
+        **common,
+    )
+
+
+def _build_epochs(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return EpochSearchCV(
+        estimator=pipeline,
+        param_grid=param_grid,
+        batch_size=options.get("batch_size"),
+        validation_fraction=options.get("validation_fraction", 0.1),
+        patience=options.get("patience", 10),
+        tol=options.get("tol", 1e-4),
+        max_epochs=options.get("max_epochs"),
+        prune_margin=options.get("prune_margin"),
+        min_epochs=options.get("min_epochs", 10),
+        check_every=options.get("check_every", 5),
+        random_state=options.get("random_state"),
+        **common,
+    )
+
+
+def _build_trees(pipeline, param_grid: Dict, common: Dict[str, Any], options: Dict):
+    return TreeSearchCV(
+        estimator=pipeline,
+        param_grid=param_grid,
+        derive_randomized=options.get("derive_randomized", True),
+        verify_top=options.get("verify_top", 10),
+        **common,
+    )
+
+
+SearchBuilder = Callable[[Any, Dict, Dict[str, Any], Dict], Any]
+
+SEARCH_BUILDERS: Dict[str, SearchBuilder] = {
+    "grid": _build_grid,
+    "random": _build_random,
+    "halving": _build_halving,
+    "racing": _build_racing,
+    "neighbors": _build_neighbors,
+    "path": _build_path,
+    "kernel": _build_kernel,
+    "smoothing": _build_smoothing,
+    "epochs": _build_epochs,
+    "trees": _build_trees,
+}
 
 
 def build_grid_search(
     pipeline,
     param_grid: Dict,
     training_cfg,
-) -> GridSearchCV:
+    search_cfg: Dict | None = None,
+):
     """
-    Build a GridSearchCV instance consistent with the training configuration.
+    Build the hyperparameter search consistent with the training configuration.
+
+    The strategy comes from the `search` section of training.yaml, optionally
+    overridden by `search_cfg` (per-model options). All strategies expose the
+    GridSearchCV interface (best_estimator_, best_params_, cv_results_...).
     """
     cv = build_cv_splits(training_cfg.cv)
 
     verbose = getattr(training_cfg, "verbose", 1)
 
-    grid = GridSearchCV(
-        estimator=pipeline,
-        param_grid=param_grid,
-        scoring=training_cfg.scoring,
-        cv=cv,
-        n_jobs=training_cfg.n_jobs,
-        verbose=verbose,
-        refit=training_cfg.refit_metric,
-        return_train_score=True,
-    )
-    return grid
+    options = {**getattr(training_cfg, "search", {}), **(search_cfg or {})}
+    options.setdefault("random_state", training_cfg.random_state)
+    strategy = options.get("strategy", "grid")
+
+    if strategy not in SEARCH_BUILDERS:
+        raise ValueError(
+            f"Unknown search strategy '{strategy}'. "
+            f"Available strategies: {', '.join(sorted(SEARCH_BUILDERS))}"
+        )
+
+    common = {
+        "scoring": training_cfg.scoring,
+        "cv": cv,
+        "n_jobs": training_cfg.n_jobs,
+        "verbose": verbose,
+        "refit": training_cfg.refit_metric,
+        "return_train_score": True,
+    }
+    return SEARCH_BUILDERS[strategy](pipeline, param_grid, common, options)
+
+
+def fit_search(search, X, y, model_name: str):
+    """
+    Fit a search built by build_grid_search inside a profiling span, then add
+    the per-candidate fit / score times of cv_results_ to the trace, one track
+    per model, laid out one after the other from the start of the search.
+    """
+    start_us = profiling.now_us()
+    strategy = type(search).__name__
+    with profiling.span("search.fit", profile=True, model=model_name, strategy=strategy):
+        search.fit(X, y)
+
+    if not profiling.profiling_enabled():
+        return search
+    results = search.cv_results_
+    ts_us = start_us
+    track = f"cv_results:{model_name}"
+    for i, params in enumerate(results["params"]):
+        fit_time = float(np.nan_to_num(results["mean_fit_time"][i]))
+        score_time = float(np.nan_to_num(results["mean_score_time"][i]))
+        attrs = {
+            "model": model_name,
+            "candidate": i,
+            "params": {k: repr(v) for k, v in params.items()},
+            "rank": int(results["rank_test_score"][i]),
+            "mean_test_score": float(results["mean_test_score"][i]),
+        }
+        fit_std = float(results["std_fit_time"][i])
+        profiling.record(
+            "candidate.fit", fit_time, ts_us=ts_us, track=track, std=fit_std, **attrs
+        )
+        ts_us += int(fit_time * 1e6)
+        score_std = float(results["std_score_time"][i])
+        profiling.record(
+            "candidate.score", score_time, ts_us=ts_us, track=track, std=score_std, **attrs
+        )
+        ts_us += int(score_time * 1e6)
+    profiling.count("candidates", len(results["params"]), model=model_name)
+    return search
@@ -0,0 +1,284 @@
+"""
+Fold-keyed cache of fitted preprocessors and transformed matrices.
+
+During a hyperparameter search the same preprocessor (e.g. StandardScaler)
+is refit on the same CV fold for every candidate, and again for every model
+that uses it. FoldCachedPreprocessor wraps the ColumnTransformer built by
+build_preprocessor and looks the fold up in a process-wide LRU cache keyed by:
+
+- the fingerprint of the training dataset,
+- the digest of the fold rows (the DataFrame index, which identifies the
+  fold of a given CV split seed without hashing the feature values),
+- the preprocessor configuration.
+
+Cached matrices are read-only and the in-memory cache is bounded in bytes.
+
+Models trained by the scheduler run in separate processes, and the
+candidates of a search in separate joblib workers, so the in-memory cache
+alone is only shared within one of them. With a `directory`, every entry is
+also written there (one joblib file per key, under a subdirectory per
+dataset fingerprint) and read back memory-mapped by the processes that miss
+it in memory: a fold is then preprocessed once per training run, whichever
+process needs it first. The store only lives for one run: scripts/train.py
+clears it when the run starts and when it ends (clear_shared_cache).
+"""
+
+import copy
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.pipeline import Pipeline
+
+
+class FoldCache:
+    """
+    Least-recently-used cache bounded by the total size of the stored arrays,
+    backed by an on-disk store shared between processes when `directory` is set.
+    Keys are tuples of strings whose second item is the dataset fingerprint.
+    """
+
+    def __init__(self, max_bytes: int, directory: str | Path | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        self.nbytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+        value = self._load(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.shared_hits += 1
+        self._remember(key, value, _value_nbytes(value))
+        return value
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        self._store(key, value)
+        self._remember(key, value, nbytes)
+
+    def _remember(self, key: Hashable, value: Any, nbytes: int) -> None:
+        if nbytes > self.max_bytes:
+            return
+        if key in self._items:
+            self.nbytes -= self._items.pop(key)[1]
+        self._items[key] = (value, nbytes)
+        self.nbytes += nbytes
+        self._evict()
+
+    def resize(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def set_directory(self, directory: str | Path | None) -> None:
+        self.directory = Path(directory) if directory is not None else None
+
+    def _path(self, key: Hashable) -> Path:
+        kind, dataset_key, *rest = key
+        name = "\x1f".join([kind, *rest]).encode("utf-8")
+        digest = hashlib.blake2b(name, digest_size=16).hexdigest()
+        return self.directory / dataset_key / f"{kind}-{digest}.joblib"
+
+    def _load(self, key: Hashable) -> Any:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return joblib.load(path, mmap_mode="r")
+        except Exception:
+            # Unreadable entry: recompute it (put() rewrites it).
+            return None
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a private name and renamed: readers never see a partial file.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        joblib.dump(value, tmp)
+        os.replace(tmp, path)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.nbytes = 0
+
+    def _evict(self) -> None:
+        while self.nbytes > self.max_bytes and self._items:
+            _, (_, nbytes) = self._items.popitem(last=False)
+            self.nbytes -= nbytes
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._items),
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+
+
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+# One cache per process: shared by every model and candidate trained in it.
+_FOLD_CACHE = FoldCache(DEFAULT_MAX_BYTES)
+
+
+def get_fold_cache() -> FoldCache:
+    return _FOLD_CACHE
+
+
+def clear_shared_cache(directory: str | Path) -> None:
+    """
+    Remove every entry of the shared cache `directory`.
+    """
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame (values, index and column names).
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _rows_digest(X: pd.DataFrame) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(X.index.to_numpy()).tobytes())
+    h.update("\x1f".join(map(str, X.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _read_only(Xt):
+    if isinstance(Xt, np.ndarray):
+        Xt.setflags(write=False)
+    return Xt
+
+
+def _nbytes(Xt) -> int:
+    return int(getattr(Xt, "nbytes", 0))
+
+
+def _value_nbytes(value) -> int:
+    # Fit entries are (fitted preprocessor, Xt), transform entries Xt alone.
+    return _nbytes(value[1] if isinstance(value, tuple) else value)
+
+
+class FoldCachedPreprocessor(TransformerMixin, BaseEstimator):
+    """
+    Transparent wrapper around a preprocessor that reuses fits and transforms
+    already computed for the same rows of the same dataset.
+
+    Caching is only active when `dataset_key` is set and X is a DataFrame;
+    otherwise the wrapper simply delegates to the inner preprocessor.
+    `directory` is the shared on-disk store (None: in-memory only).
+    """
+
+    def __init__(self, preprocessor, dataset_key: str | None = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, directory: str | None = None) -> None:
+        self.preprocessor = preprocessor
+        self.dataset_key = dataset_key
+        self.max_bytes = max_bytes
+        self.directory = directory
+
+    def _cache_enabled(self, X) -> bool:
+        return self.dataset_key is not None and isinstance(X, pd.DataFrame)
+
+    def _config_digest(self) -> str:
+        return joblib.hash(self.preprocessor)
+
+    def fit(self, X, y=None):
+        self.fit_transform(X, y)
+        return self
+
+    def fit_transform(self, X, y=None, **fit_params):
+        if not self._cache_enabled(X):
+            self.preprocessor_ = clone(self.preprocessor)
+            self.fitted_rows_ = None
+            return self.preprocessor_.fit_transform(X, y)
+
+        cache = get_fold_cache()
+        cache.resize(self.max_bytes)
+        cache.set_directory(self.directory)
+
+        self.config_digest_ = self._config_digest()
+        self.fitted_rows_ = _rows_digest(X)
+        key = ("fit", self.dataset_key, self.config_digest_, self.fitted_rows_)
+
+        cached = cache.get(key)
+        if cached is None:
+            fitted = clone(self.preprocessor)
+            Xt = _read_only(fitted.fit_transform(X, y))
+            cached = (fitted, Xt)
+            cache.put(key, cached, _nbytes(Xt))
+
+        self.preprocessor_, Xt = cached
+        return Xt
+
+    def transform(self, X):
+        if not self._cache_enabled(X) or self.fitted_rows_ is None:
+            return self.preprocessor_.transform(X)
+
+        cache = get_fold_cache()
+        rows = _rows_digest(X)
+        if rows == self.fitted_rows_:
+            # The training rows (train scores): Xt of the fit entry, when still cached.
+            cached = cache.get(("fit", self.dataset_key, self.config_digest_, rows))
+            if cached is not None:
+                return cached[1]
+        key = (
+            "transform", self.dataset_key, self.config_digest_,
+            self.fitted_rows_, rows,
+        )
+        Xt = cache.get(key)
+        if Xt is None:
+            Xt = _read_only(self.preprocessor_.transform(X))
+            cache.put(key, Xt, _nbytes(Xt))
+        return Xt
+
+    def get_feature_names_out(self, input_features=None):
+        return self.preprocessor_.get_feature_names_out(input_features)
+
+    @property
+    def n_features_in_(self):
+        return self.preprocessor_.n_features_in_
+
+    @property
+    def feature_names_in_(self):
+        return self.preprocessor_.feature_names_in_
+
+
+def unwrap_cached_preprocessor(pipeline: Pipeline) -> Pipeline:
+    """
+    Copy of a fitted pipeline whose FoldCachedPreprocessor steps are replaced
+    by the preprocessors they wrap, so that saved artifacts do not depend on
+    the training-time cache. The pipeline itself is left unchanged.
+    """
+    unwrapped = copy.copy(pipeline)
+    unwrapped.steps = [
+        (name, step.preprocessor_ if isinstance(step, FoldCachedPreprocessor) else step)
+        for name, step in pipeline.steps
+    ]
+    return unwrapped
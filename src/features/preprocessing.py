@@ -1,25 +1,193 @@
-from typing import List
+from typing import Any, Dict, List
 
+import numpy as np
+from sklearn.base import BaseEstimator, OneToOneFeatureMixin, TransformerMixin
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
+from sklearn.utils.validation import check_array, check_is_fitted
 
 from src.config.config import DatasetConfig
+from src.features.cache import DEFAULT_MAX_BYTES, FoldCachedPreprocessor
+
+# Number of bins of the binned representation (codes fit in uint8).
+DEFAULT_N_BINS = 256
+
+
+class QuantileBinner(OneToOneFeatureMixin, TransformerMixin, BaseEstimator):
+    """
+    Replace every feature by the index of its quantile bin: uint8 codes for
+    up to 256 bins, uint16 up to 65536.
+
+    Edges are the n_bins - 1 inner quantiles of each feature (computed on at
+    most `subsample` rows), duplicates removed, so a feature with few
+    distinct values gets one bin per value. Code k holds the values in
+    (edges[k - 1], edges[k]]; NaN goes to the last bin.
+    """
+
+    def __init__(self, n_bins: int = DEFAULT_N_BINS, subsample: int | None = 200_000,
+                 random_state: int | None = 0) -> None:
+        self.n_bins = n_bins
+        self.subsample = subsample
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        if not 2 <= self.n_bins <= 65536:
+            raise ValueError(f"n_bins must be between 2 and 65536, got {self.n_bins}.")
+        X = check_array(X, dtype=np.float64, ensure_all_finite="allow-nan")
+        self.n_features_in_ = X.shape[1]
+        if self.subsample is not None and X.shape[0] > self.subsample:
+            rng = np.random.default_rng(self.random_state)
+            X = X[rng.choice(X.shape[0], self.subsample, replace=False)]
+
+        quantiles = np.linspace(0.0, 1.0, self.n_bins + 1)[1:-1]
+        edges = np.nanquantile(X, quantiles, axis=0)
+        self.bin_edges_ = [
+            np.unique(edges[:, j][~np.isnan(edges[:, j])]) for j in range(X.shape[1])
+        ]
+        self.dtype_ = np.uint8 if self.n_bins <= 256 else np.uint16
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        check_is_fitted(self, "bin_edges_")
+        X = check_array(X, dtype=np.float64, ensure_all_finite="allow-nan")
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, the binner was fitted on {self.n_features_in_}."
+            )
+        codes = np.empty(X.shape, dtype=self.dtype_)
+        for j, edges in enumerate(self.bin_edges_):
+            codes[:, j] = np.searchsorted(edges, X[:, j], side="left")
+        return codes
+
+
+class StreamingScaler(TransformerMixin, BaseEstimator):
+    """
+    Column selection and standardisation fitted chunk by chunk: `partial_fit`
+    updates running means and variances (Chan et al. pairwise update), so
+    the statistics of a table are obtained without loading it. Streaming
+    counterpart of build_preprocessor: `columns` are standardised (passed
+    through when `with_scaling=False`), then `passthrough` columns follow.
+    """
+
+    def __init__(
+        self, columns: List[str], with_scaling: bool = True, passthrough: List[str] = ()
+    ) -> None:
+        self.columns = columns
+        self.with_scaling = with_scaling
+        self.passthrough = passthrough
+
+    def _values(self, X) -> np.ndarray:
+        return np.asarray(X[list(self.columns)], dtype=np.float64)
+
+    def partial_fit(self, X, y=None):
+        values = self._values(X)
+        if not hasattr(self, "n_samples_seen_"):
+            self.n_samples_seen_ = 0
+            self.mean_ = np.zeros(values.shape[1])
+            self.var_ = np.zeros(values.shape[1])
+            self.feature_names_in_ = np.asarray([*self.columns, *self.passthrough], dtype=object)
+            self.n_features_in_ = len(self.feature_names_in_)
+        n = values.shape[0]
+        if n == 0:
+            return self
+
+        total = self.n_samples_seen_ + n
+        mean = values.mean(axis=0)
+        delta = mean - self.mean_
+        m2 = (
+            self.var_ * self.n_samples_seen_
+            + values.var(axis=0) * n
+            + delta**2 * self.n_samples_seen_ * n / total
+        )
+        self.mean_ = self.mean_ + delta * n / total
+        self.var_ = m2 / total
+        self.n_samples_seen_ = total
+        self.scale_ = np.where(self.var_ > 0, np.sqrt(self.var_), 1.0)
+        return self
+
+    def fit(self, X, y=None):
+        for attr in ("n_samples_seen_", "mean_", "var_", "scale_"):
+            self.__dict__.pop(attr, None)
+        return self.partial_fit(X, y)
+
+    def transform(self, X) -> np.ndarray:
+        check_is_fitted(self, "n_samples_seen_")
+        values = self._values(X)
+        if self.with_scaling:
+            values = (values - self.mean_) / self.scale_
+        if self.passthrough:
+            values = np.hstack([values, np.asarray(X[list(self.passthrough)], dtype=np.float64)])
+        return values
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        return np.asarray([*self.columns, *self.passthrough], dtype=object)
+
+
+def check_bin_codes(X) -> np.ndarray:
+    """
+    Validate the input of a binned estimator: an integer code matrix.
+    """
+    X = check_array(X, dtype=None)
+    if not np.issubdtype(X.dtype, np.integer):
+        raise ValueError(
+            f"Expected integer bin codes, got {X.dtype}: enable `binning` for this model "
+            "so that a QuantileBinner feeds it."
+        )
+    return X
+
+
+def binned_class_counts(codes: np.ndarray, y_codes: np.ndarray, n_bins: int, n_classes: int,
+                        chunk_rows: int = 65_536) -> np.ndarray:
+    """
+    Per-feature histograms of the class labels, shape
+    (n_features, n_bins, n_classes), from bin codes: the sufficient
+    statistics of the binned estimators, in one bincount per row chunk.
+    """
+    n_features = codes.shape[1]
+    offsets = (np.arange(n_features, dtype=np.intp) * n_bins)[None, :]
+    counts = np.zeros(n_features * n_bins * n_classes, dtype=np.int64)
+    for start in range(0, codes.shape[0], chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        flat = (offsets + codes[rows]) * n_classes + y_codes[rows, None]
+        counts += np.bincount(flat.ravel(), minlength=counts.size)
+    return counts.reshape(n_features, n_bins, n_classes)
 
 
 def build_preprocessor(
     dataset_cfg: DatasetConfig,
     use_scaler: bool,
+    cache_key: str | None = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    binning: Dict[str, Any] | None = None,
+    cache_dir: str | None = None,
 ) -> ColumnTransformer:
     """
     Build a ColumnTransformer that applies preprocessing to the features.
+
+    When `binning` is enabled (`{"enabled": true, "n_bins": ...}`), every
+    feature is replaced by its QuantileBinner code instead, for the binned
+    estimators; the scaler setting is then ignored.
+
+    When `cache_key` (the fingerprint of the training data) is given, the
+    transformer is wrapped in a FoldCachedPreprocessor so that its fits and
+    transforms are shared by every candidate and model of the training run:
+    within a process, and across processes through `cache_dir` when given.
     """
     numeric_features: List[str] = dataset_cfg.numerical_features
     categorical_features: List[str] = dataset_cfg.categorical_features
 
+    use_binning = bool(binning and binning.get("enabled", False))
     transformers = []
 
-    if numeric_features:
+    if use_binning:
+        transformers.append(
+            ("bin", QuantileBinner(
+                n_bins=binning.get("n_bins", DEFAULT_N_BINS),
+                subsample=binning.get("subsample", 200_000),
+            ), numeric_features + categorical_features)
+        )
+    elif numeric_features:
         if use_scaler:
             transformers.append(
                 ("num", StandardScaler(), numeric_features)
@@ -29,13 +197,18 @@ def build_preprocessor(
                 ("num", "passthrough", numeric_features)
             )
 
-    if categorical_features:
+    if categorical_features and not use_binning:
         transformers.append(
             ("cat", "passthrough", categorical_features)
         )
 
     preprocessor = ColumnTransformer(transformers=transformers)
 
+    if cache_key is not None:
+        return FoldCachedPreprocessor(
+            preprocessor, dataset_key=cache_key, max_bytes=cache_max_bytes, directory=cache_dir
+        )
+
     return preprocessor
 
 
@@ -0,0 +1,80 @@
+"""
+Array fast path shared by the scoring server (server.py) and the NumPy
+export (export.py): a fitted `ColumnTransformer(StandardScaler /
+passthrough) -> classifier` pipeline applied to plain 2D arrays whose
+columns follow the input feature names of the pipeline.
+"""
+
+from typing import List
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+
+def _is_passthrough(transformer) -> bool:
+    # A fitted ColumnTransformer stores "passthrough" as an identity FunctionTransformer.
+    if isinstance(transformer, str):
+        return transformer == "passthrough"
+    return type(transformer) is FunctionTransformer and transformer.func is None
+
+
+class ArrayPipeline:
+    """
+    Fast path for `preprocessor -> classifier` pipelines whose ColumnTransformer
+    only uses StandardScaler / passthrough: rows are turned into one NumPy
+    array in input-feature order and scaled directly, which avoids the
+    per-call DataFrame column matching of the ColumnTransformer.
+    """
+
+    def __init__(self, pipeline: Pipeline, feature_names: List[str]) -> None:
+        preprocessor, self.classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+        position = {name: i for i, name in enumerate(feature_names)}
+
+        self.blocks = []
+        for _, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            idx = np.array([position[c] if isinstance(c, str) else c for c in columns])
+            if _is_passthrough(transformer):
+                self.blocks.append((idx, None, None))
+            else:
+                mean = transformer.mean_ if transformer.with_mean else None
+                scale = transformer.scale_ if transformer.with_std else None
+                self.blocks.append((idx, mean, scale))
+
+    @staticmethod
+    def supports(pipeline) -> bool:
+        if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+            return False
+        preprocessor = pipeline.steps[0][1]
+        if not isinstance(preprocessor, ColumnTransformer):
+            return False
+        return all(
+            t == "drop" or _is_passthrough(t) or type(t) is StandardScaler
+            for _, t, _ in preprocessor.transformers_
+        )
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        parts = []
+        for idx, mean, scale in self.blocks:
+            block = X[:, idx]
+            if mean is not None:
+                block = block - mean
+            if scale is not None:
+                block = block / scale
+            parts.append(block)
+        return self.classifier.predict(np.hstack(parts) if len(parts) > 1 else parts[0])
+
+
+def input_feature_names(model) -> List[str]:
+    """
+    Names of the input columns a fitted pipeline was trained on.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is None and hasattr(model, "steps"):
+        names = getattr(model.steps[0][1], "feature_names_in_", None)
+    if names is None:
+        raise ValueError("The pipeline does not record its input feature names.")
+    return [str(n) for n in names]
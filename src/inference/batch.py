@@ -0,0 +1,211 @@
+"""
+Chunked batch inference for trained pipelines (*_best.joblib).
+
+Input tables are streamed in fixed-size chunks, scored by a pool of worker
+processes that each load the pipeline once, and written to the output CSV in
+input order as soon as they are ready. At most `2 * n_workers` chunks are in
+flight, so memory stays bounded whatever the size of the input.
+
+The output always has a header, even for an empty input, and carries the
+id column of the input through when there is one.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.io import iter_table, load_table, table_columns
+from src.utils.lazy import lazy_import
+
+joblib = lazy_import("joblib")
+pd = lazy_import("pandas")
+
+OUTPUTS = ("predict", "predict_proba", "decision_function")
+
+
+@dataclass
+class BatchReport:
+    n_rows: int
+    n_chunks: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.n_rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+def iter_chunks(
+    path: Path, chunk_size: int, rows: slice | None = None
+) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """
+    Yield (row_offset, chunk) pairs from a CSV file, a Parquet file or an npy table,
+    restricted to the range `rows` when given (offsets are relative to its start).
+    npy tables are memory-mapped, so only the rows of the current chunk are read.
+    """
+    if path.is_dir():
+        df = load_table(path, mmap=True)
+        if rows is not None:
+            df = df.iloc[rows]
+        for start in range(0, len(df), chunk_size):
+            yield start, df.iloc[start:start + chunk_size]
+    else:
+        first = (rows.start or 0) if rows is not None else 0
+        for chunk in iter_table(path, chunk_size, rows):
+            yield int(chunk.index[0]) - first, chunk
+
+
+def score_chunk(
+    model,
+    offset: int,
+    chunk: pd.DataFrame,
+    outputs: Sequence[str],
+    drop_columns: Sequence[str] = (),
+    id_column: str | None = None,
+) -> pd.DataFrame:
+    """
+    Score one chunk and return a frame with the global row number, the
+    `id_column` of the chunk (when given) and the requested outputs (one
+    column per class for predict_proba).
+    """
+    X = chunk.drop(columns=[c for c in (*drop_columns, id_column) if c and c in chunk.columns])
+    result = {"row": np.arange(offset, offset + len(chunk))}
+    if id_column is not None:
+        result[id_column] = chunk[id_column].to_numpy()
+
+    for output in outputs:
+        values = getattr(model, output)(X)
+        if output == "predict":
+            result["prediction"] = values
+        elif values.ndim == 1:
+            result[output] = values
+        else:
+            for k, label in enumerate(getattr(model, "classes_", range(values.shape[1]))):
+                result[f"{output}_{label}"] = values[:, k]
+
+    return pd.DataFrame(result)
+
+
+# Pipeline loaded once per worker process by _init_worker.
+_WORKER_MODEL = None
+
+
+def _init_worker(model_path: str) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = joblib.load(model_path)
+
+
+def _score_in_worker(offset, chunk, outputs, drop_columns, id_column) -> pd.DataFrame:
+    return score_chunk(_WORKER_MODEL, offset, chunk, outputs, drop_columns, id_column)
+
+
+def output_columns(model, outputs: Sequence[str], id_column: str | None = None) -> List[str]:
+    """
+    Columns of the frames returned by score_chunk.
+    """
+    classes = list(getattr(model, "classes_", []))
+    columns = ["row"] + ([id_column] if id_column is not None else [])
+    for output in outputs:
+        if output == "predict":
+            columns.append("prediction")
+        elif output == "decision_function" and len(classes) <= 2:
+            columns.append(output)
+        else:
+            columns += [f"{output}_{label}" for label in classes]
+    return columns
+
+
+class _ChunkWriter:
+    """Append scored chunks to a CSV file, writing the header once."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.n_rows = 0
+        self.n_chunks = 0
+
+    def write(self, result: pd.DataFrame) -> None:
+        first = self.n_chunks == 0
+        result.to_csv(self.path, mode="w" if first else "a", header=first, index=False)
+        self.n_rows += len(result)
+        self.n_chunks += 1
+
+    def write_header(self, columns: Sequence[str]) -> None:
+        """Header-only output of an empty input."""
+        pd.DataFrame(columns=list(columns)).to_csv(self.path, index=False)
+
+
+def predict_file(
+    model_path: Path,
+    input_path: Path,
+    output_path: Path,
+    chunk_size: int = 50_000,
+    n_workers: int = 1,
+    outputs: Sequence[str] = ("predict",),
+    drop_columns: Sequence[str] = (),
+    rows: slice | None = None,
+    id_column: str | None = None,
+) -> BatchReport:
+    """
+    Stream `input_path` (or its range of `rows`) through the pipeline stored
+    at `model_path` and write the predictions incrementally to `output_path` (CSV).
+    `id_column` is copied to the output when the input has it.
+    """
+    unknown = [o for o in outputs if o not in OUTPUTS]
+    if unknown:
+        raise ValueError(f"Unknown outputs {unknown}. Available: {', '.join(OUTPUTS)}")
+    if id_column is not None and id_column not in table_columns(input_path):
+        id_column = None
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = _ChunkWriter(output_path)
+    start_time = time.perf_counter()
+
+    if n_workers <= 1:
+        model = joblib.load(model_path)
+        for offset, chunk in iter_chunks(input_path, chunk_size, rows):
+            writer.write(score_chunk(model, offset, chunk, outputs, drop_columns, id_column))
+    else:
+        pending: deque = deque()
+        max_in_flight = 2 * n_workers
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(str(model_path),),
+        ) as executor:
+            for offset, chunk in iter_chunks(input_path, chunk_size, rows):
+                pending.append(
+                    executor.submit(
+                        _score_in_worker,
+                        offset, chunk, list(outputs), list(drop_columns), id_column,
+                    )
+                )
+                # Write finished chunks in input order and bound the number in flight.
+                while pending and (len(pending) >= max_in_flight or pending[0].done()):
+                    writer.write(pending.popleft().result())
+
+            while pending:
+                writer.write(pending.popleft().result())
+
+    if writer.n_chunks == 0:
+        writer.write_header(output_columns(joblib.load(model_path), outputs, id_column))
+
+    return BatchReport(
+        n_rows=writer.n_rows,
+        n_chunks=writer.n_chunks,
+        seconds=time.perf_counter() - start_time,
+    )
+
+
+def requested_outputs(proba: bool, decision: bool) -> List[str]:
+    outputs = ["predict"]
+    if proba:
+        outputs.append("predict_proba")
+    if decision:
+        outputs.append("decision_function")
+    return outputs
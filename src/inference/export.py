@@ -0,0 +1,149 @@
+"""
+Export fitted `preprocessor -> classifier` pipelines to the array format read
+by src/inference/npy_predictor.py.
+
+Only StandardScaler / passthrough ColumnTransformers are supported for the
+preprocessing step; the final estimator must be one of LogisticRegression,
+LinearSVC, GaussianNB, binary SVC, DecisionTreeClassifier or MLPClassifier.
+"""
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.svm import SVC, LinearSVC
+from sklearn.tree import DecisionTreeClassifier
+
+from src.inference.array_pipeline import ArrayPipeline, input_feature_names
+from src.inference.npy_predictor import CompiledPredictor
+
+
+def _preprocessor_arrays(pipeline: Pipeline, feature_names) -> Dict[str, np.ndarray]:
+    """
+    Flatten the ColumnTransformer into one (index, mean, scale) triple in
+    output-column order.
+    """
+    index, mean, scale = [], [], []
+    for idx, block_mean, block_scale in ArrayPipeline(pipeline, feature_names).blocks:
+        index.append(idx)
+        mean.append(block_mean if block_mean is not None else np.zeros(len(idx)))
+        scale.append(block_scale if block_scale is not None else np.ones(len(idx)))
+    return {
+        "pre_index": np.concatenate(index).astype(np.intp),
+        "pre_mean": np.concatenate(mean).astype(np.float64),
+        "pre_scale": np.concatenate(scale).astype(np.float64),
+    }
+
+
+def _estimator_arrays(clf) -> Dict[str, np.ndarray]:
+    if isinstance(clf, (LogisticRegression, LinearSVC)):
+        return {"kind": np.array("linear"), "coef": clf.coef_, "intercept": clf.intercept_}
+
+    if isinstance(clf, SVC):
+        if len(clf.classes_) != 2:
+            raise NotImplementedError("Only binary SVC models can be exported.")
+        return {
+            "kind": np.array("svc"),
+            "kernel": np.array(clf.kernel),
+            "gamma": np.array(clf._gamma),
+            "coef0": np.array(clf.coef0),
+            "degree": np.array(clf.degree),
+            "support_vectors": clf.support_vectors_,
+            "dual_coef": clf.dual_coef_,
+            "intercept": clf.intercept_,
+        }
+
+    if isinstance(clf, GaussianNB):
+        return {
+            "kind": np.array("gaussian_nb"),
+            "theta": clf.theta_,
+            "var": clf.var_,
+            "class_prior": clf.class_prior_,
+        }
+
+    if isinstance(clf, DecisionTreeClassifier):
+        tree = clf.tree_
+        if tree.n_outputs != 1:
+            raise NotImplementedError("Multi-output trees cannot be exported.")
+        return {
+            "kind": np.array("tree"),
+            "children_left": tree.children_left,
+            "children_right": tree.children_right,
+            "feature": tree.feature,
+            "threshold": tree.threshold,
+            "value": tree.value[:, 0, :],
+        }
+
+    if isinstance(clf, MLPClassifier):
+        arrays = {
+            "kind": np.array("mlp"),
+            "activation": np.array(clf.activation),
+            "out_activation": np.array(clf.out_activation_),
+            "n_layers": np.array(len(clf.coefs_)),
+        }
+        for i, (coef, intercept) in enumerate(zip(clf.coefs_, clf.intercepts_)):
+            arrays[f"coef_{i}"] = coef
+            arrays[f"intercept_{i}"] = intercept
+        return arrays
+
+    raise NotImplementedError(f"{type(clf).__name__} cannot be exported to the NumPy predictor.")
+
+
+def compile_pipeline(pipeline: Pipeline) -> Dict[str, np.ndarray]:
+    """
+    Return the arrays describing a fitted pipeline (see CompiledPredictor).
+    """
+    if not ArrayPipeline.supports(pipeline):
+        raise NotImplementedError(
+            "Only `ColumnTransformer(StandardScaler / passthrough) -> classifier` pipelines "
+            "can be exported."
+        )
+    feature_names = input_feature_names(pipeline)
+    clf = pipeline.steps[-1][1]
+
+    arrays = _preprocessor_arrays(pipeline, feature_names)
+    arrays.update(_estimator_arrays(clf))
+    arrays["classes"] = clf.classes_
+    arrays["feature_names"] = np.array(feature_names)
+    return arrays
+
+
+def save_compiled(arrays: Dict[str, np.ndarray], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(path, **arrays)
+
+
+def check_parity(pipeline: Pipeline, compiled: CompiledPredictor, X: pd.DataFrame,
+                 rtol: float = 1e-7, atol: float = 1e-9) -> Dict[str, float]:
+    """
+    Compare the compiled predictor with the sklearn pipeline on `X`.
+
+    Returns the number of prediction mismatches and the largest absolute
+    difference of the continuous outputs (decision_function / predict_proba).
+    Raises AssertionError when predictions differ or the outputs are not close.
+    """
+    X_array = X[compiled.feature_names].to_numpy(dtype=np.float64)
+
+    mismatches = int(np.sum(pipeline.predict(X) != compiled.predict(X_array)))
+    report = {"prediction_mismatches": mismatches}
+
+    for output in ("decision_function", "predict_proba"):
+        if not hasattr(pipeline, output):
+            continue
+        try:
+            expected = getattr(pipeline, output)(X)
+            actual = getattr(compiled, output)(X_array)
+        except (AttributeError, ValueError):
+            continue
+        report[f"{output}_max_abs_diff"] = float(np.max(np.abs(expected - actual)))
+        if not np.allclose(expected, actual, rtol=rtol, atol=atol):
+            raise AssertionError(f"{output} differs from the sklearn pipeline: {report}")
+
+    if mismatches:
+        raise AssertionError(f"{mismatches} predictions differ from the sklearn pipeline.")
+    return report
@@ -0,0 +1,161 @@
+"""
+NumPy-only evaluator for pipelines exported by src/inference/export.py.
+
+This module must only import NumPy: loading a compiled predictor does not
+pull in pandas or scikit-learn, and `predict` works on a plain 2D array whose
+columns follow `feature_names` (no DataFrame column matching per call).
+
+Supported estimators (binary or multiclass unless stated otherwise):
+logistic regression, GaussianNB, SVC (binary; linear / rbf / poly / sigmoid
+kernels), decision tree and MLP.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+_ACTIVATIONS = {
+    "identity": lambda z: z,
+    "relu": lambda z: np.maximum(z, 0.0),
+    "tanh": np.tanh,
+    "logistic": _sigmoid,
+}
+
+
+class CompiledPredictor:
+    """
+    Array-backed predictor: scaler statistics followed by the fitted math of
+    the final estimator.
+    """
+
+    def __init__(self, arrays) -> None:
+        if hasattr(arrays, "files"):
+            self.arrays = {k: arrays[k] for k in arrays.files}
+        else:
+            self.arrays = dict(arrays)
+        a = self.arrays
+        self.kind = str(a["kind"])
+        self.classes = a["classes"]
+        self.feature_names = [str(f) for f in a["feature_names"]]
+        self._index = a["pre_index"]
+        self._mean = a["pre_mean"]
+        self._scale = a["pre_scale"]
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledPredictor":
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(arrays)
+
+    # ------------------------------------------------------------------
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return (X[:, self._index] - self._mean) / self._scale
+
+    def _scores(self, Z: np.ndarray) -> np.ndarray:
+        """
+        Raw scores: decision values (linear / SVC), joint log-likelihoods (NB),
+        class fractions (tree) or output activations (MLP).
+        """
+        a = self.arrays
+        if self.kind == "linear":
+            return Z @ a["coef"].T + a["intercept"]
+
+        if self.kind == "svc":
+            K = self._kernel(Z, a["support_vectors"])
+            return K @ a["dual_coef"].T + a["intercept"]
+
+        if self.kind == "gaussian_nb":
+            var = a["var"]
+            jll = -0.5 * np.sum(np.log(2.0 * np.pi * var), axis=1)
+            sq = ((Z[:, None, :] - a["theta"][None, :, :]) ** 2 / var[None, :, :]).sum(axis=2)
+            return np.log(a["class_prior"]) + jll - 0.5 * sq
+
+        if self.kind == "tree":
+            leaves = self._tree_leaves(Z)
+            values = a["value"][leaves]
+            return values / values.sum(axis=1, keepdims=True)
+
+        if self.kind == "mlp":
+            hidden = _ACTIVATIONS[str(a["activation"])]
+            n_layers = int(a["n_layers"])
+            out = Z
+            for i in range(n_layers):
+                out = out @ a[f"coef_{i}"] + a[f"intercept_{i}"]
+                if i < n_layers - 1:
+                    out = hidden(out)
+            if str(a["out_activation"]) == "softmax":
+                return _softmax(out)
+            return _ACTIVATIONS[str(a["out_activation"])](out)
+
+        raise ValueError(f"Unknown compiled estimator kind '{self.kind}'.")
+
+    def _kernel(self, Z: np.ndarray, SV: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        kernel = str(a["kernel"])
+        gamma, coef0, degree = float(a["gamma"]), float(a["coef0"]), int(a["degree"])
+        if kernel == "linear":
+            return Z @ SV.T
+        if kernel == "rbf":
+            sq = (Z**2).sum(axis=1)[:, None] + (SV**2).sum(axis=1)[None, :] - 2.0 * Z @ SV.T
+            return np.exp(-gamma * np.maximum(sq, 0.0))
+        if kernel == "poly":
+            return (gamma * Z @ SV.T + coef0) ** degree
+        if kernel == "sigmoid":
+            return np.tanh(gamma * Z @ SV.T + coef0)
+        raise ValueError(f"Unsupported kernel '{kernel}'.")
+
+    def _tree_leaves(self, Z: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        left, right = a["children_left"], a["children_right"]
+        feature, threshold = a["feature"], a["threshold"]
+        # Trees compare float32 inputs, like scikit-learn.
+        Z = Z.astype(np.float32)
+        rows = np.arange(len(Z))
+        node = np.zeros(len(Z), dtype=np.intp)
+        active = left[node] != -1
+        while active.any():
+            r, n = rows[active], node[active]
+            go_left = Z[r, feature[n]] <= threshold[n]
+            node[r] = np.where(go_left, left[n], right[n])
+            active = left[node] != -1
+        return node
+
+    # ------------------------------------------------------------------
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        scores = self._scores(self.transform(X))
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        scores = self._scores(self.transform(X))
+        if self.kind == "linear":
+            if scores.shape[1] == 1:
+                p = _sigmoid(scores[:, 0])
+                return np.column_stack([1.0 - p, p])
+            return _softmax(scores)
+        if self.kind == "gaussian_nb":
+            return _softmax(scores)
+        if self.kind == "tree":
+            return scores
+        if self.kind == "mlp":
+            if scores.shape[1] == 1:
+                return np.column_stack([1.0 - scores[:, 0], scores[:, 0]])
+            return scores
+        raise ValueError(f"predict_proba is not available for '{self.kind}'.")
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        scores = self._scores(self.transform(X))
+        if scores.shape[1] == 1:
+            threshold = 0.5 if self.kind == "mlp" else 0.0
+            return self.classes[(scores[:, 0] > threshold).astype(np.intp)]
+        return self.classes[np.argmax(scores, axis=1)]
@@ -0,0 +1,319 @@
+"""
+Low-latency local scoring service for the trained pipelines.
+
+- Every *_best.joblib in models/artifacts/ is loaded once at startup and
+  warmed up with a dummy prediction.
+- Each request is validated and turned into its feature rows by the
+  handler thread (400 on an empty request or missing features).
+- Requests for the same model are queued and a background thread scores
+  them together: it takes the first waiting request, collects the ones that
+  arrive within `max_wait_ms` (up to `max_batch` rows) and issues a single
+  `predict` call for the whole batch. The window is only waited for when
+  other requests are already in flight, so an isolated request is scored
+  immediately. If the batch fails, its requests are scored one by one, so
+  an error only reaches the request that caused it (500).
+- Per-model latency counters (p50 / p99, batch sizes) are exposed on GET /metrics.
+
+Endpoints (JSON):
+    POST /predict/<model>   {"features": {...}} or {"rows": [{...}, ...]}
+    GET  /models
+    GET  /metrics
+    GET  /health
+"""
+
+import json
+import queue
+import socketserver
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.inference.array_pipeline import ArrayPipeline, input_feature_names
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LatencyStats:
+    """
+    Thread-safe rolling window of request latencies and batch sizes.
+    """
+
+    def __init__(self, window: int = 10_000) -> None:
+        self._latencies: deque = deque(maxlen=window)
+        self._batch_sizes: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.n_requests = 0
+        self.n_batches = 0
+
+    def record_batch(self, latencies: List[float], batch_size: int) -> None:
+        with self._lock:
+            self._latencies.extend(latencies)
+            self._batch_sizes.append(batch_size)
+            self.n_requests += len(latencies)
+            self.n_batches += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = np.asarray(self._latencies, dtype=float)
+            batch_sizes = np.asarray(self._batch_sizes, dtype=float)
+            n_requests, n_batches = self.n_requests, self.n_batches
+
+        if latencies.size == 0:
+            return {"requests": n_requests, "batches": n_batches}
+
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+        return {
+            "requests": n_requests,
+            "batches": n_batches,
+            "p50_ms": round(float(p50), 4),
+            "p99_ms": round(float(p99), 4),
+            "mean_batch_size": round(float(batch_sizes.mean()), 2),
+        }
+
+
+class _Pending:
+    """A queued request: its feature rows, arrival time and a slot for the result."""
+
+    __slots__ = ("rows", "arrival", "done", "result", "error")
+
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.arrival = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Groups concurrent requests for one model into a single predict call.
+    """
+
+    def __init__(self, model, feature_names: List[str], max_batch: int = 256,
+                 max_wait_ms: float = 0.5) -> None:
+        self.model = model
+        self.feature_names = feature_names
+        self.array_model = (
+            ArrayPipeline(model, feature_names) if ArrayPipeline.supports(model) else None
+        )
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+        self.stats = LatencyStats()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def prepare(self, rows: List[Dict[str, Any]]):
+        """
+        Validate the rows of one request and build its feature rows (NumPy
+        array on the array path, DataFrame otherwise). Raises ValueError or
+        TypeError for an invalid request.
+        """
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("expected a non-empty list of rows")
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise TypeError(f"row {i} is not a JSON object")
+            missing = [f for f in self.feature_names if f not in row]
+            if missing:
+                raise ValueError(f"row {i} is missing features: {', '.join(missing)}")
+        if self.array_model is not None:
+            return np.array([[row[f] for f in self.feature_names] for row in rows], dtype=float)
+        return pd.DataFrame.from_records(rows, columns=self.feature_names)
+
+    def predict(self, rows) -> List[Any]:
+        """
+        Predictions for the feature rows built by prepare().
+        """
+        pending = _Pending(rows)
+        with self._in_flight_lock:
+            self._in_flight += 1
+        self._queue.put(pending)
+        pending.done.wait()
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self) -> List[_Pending]:
+        batch = [self._queue.get()]
+        n_rows = len(batch[0].rows)
+        deadline = time.perf_counter() + self.max_wait
+
+        while n_rows < self.max_batch:
+            if self._queue.empty() and self._in_flight <= len(batch):
+                break  # nobody else is waiting: do not delay this batch
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            n_rows += len(item.rows)
+        return batch
+
+    def _predict_rows(self, X) -> List[Any]:
+        if self.array_model is not None:
+            return self.array_model.predict(X).tolist()
+        return self.model.predict(X).tolist()
+
+    def _stack(self, blocks: list):
+        if len(blocks) == 1:
+            return blocks[0]
+        if self.array_model is not None:
+            return np.vstack(blocks)
+        return pd.concat(blocks, ignore_index=True)
+
+    def _score(self, batch: List[_Pending]) -> None:
+        try:
+            predictions = self._predict_rows(self._stack([item.rows for item in batch]))
+        except Exception:
+            predictions = None
+        if predictions is None:
+            # Score the requests one by one: only the failing ones get an error.
+            for item in batch:
+                try:
+                    item.result = self._predict_rows(item.rows)
+                except Exception as exc:
+                    item.error = exc
+            return
+        start = 0
+        for item in batch:
+            item.result = predictions[start:start + len(item.rows)]
+            start += len(item.rows)
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            self._score(batch)
+            now = time.perf_counter()
+            for item in batch:
+                item.done.set()
+            scored = [item for item in batch if item.error is None]
+            if scored:
+                self.stats.record_batch(
+                    [now - item.arrival for item in scored], sum(len(i.rows) for i in scored)
+                )
+
+
+def load_models(artifacts_dir: Path, names: List[str] | None = None,
+                max_batch: int = 256, max_wait_ms: float = 0.5) -> Dict[str, MicroBatcher]:
+    """
+    Load every *_best.joblib (or only `names`), warm each pipeline up with a
+    dummy prediction and wrap it in a MicroBatcher.
+    """
+    batchers: Dict[str, MicroBatcher] = {}
+    for path in sorted(artifacts_dir.glob("*_best.joblib")):
+        name = path.name[: -len("_best.joblib")]
+        if names and name not in names:
+            continue
+
+        model = joblib.load(path)
+        features = input_feature_names(model)
+        batcher = MicroBatcher(model, features, max_batch=max_batch, max_wait_ms=max_wait_ms)
+        batcher.predict(batcher.prepare([dict.fromkeys(features, 0.0)]))
+
+        batchers[name] = batcher
+        logger.info(
+            "Loaded and warmed up %s (%d features, %s path)", name, len(features),
+            "array" if batcher.array_model is not None else "DataFrame",
+        )
+
+    return batchers
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    server_version = "ScoringServer/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        batchers = self.server.batchers
+        if self.path == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path == "/models":
+            self._send(200, {name: b.feature_names for name, b in batchers.items()})
+        elif self.path == "/metrics":
+            self._send(200, {name: b.stats.snapshot() for name, b in batchers.items()})
+        else:
+            self._send(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        prefix = "/predict/"
+        if not self.path.startswith(prefix):
+            self._send(404, {"error": f"unknown path {self.path}"})
+            return
+
+        name = self.path[len(prefix):]
+        batcher = self.server.batchers.get(name)
+        if batcher is None:
+            self._send(404, {"error": f"unknown model {name}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(payload, dict):
+                raise TypeError("expected a JSON object")
+            single = "features" in payload
+            if not single and "rows" not in payload:
+                raise ValueError("expected 'features' or 'rows'")
+            rows = batcher.prepare([payload["features"]] if single else payload["rows"])
+        except (KeyError, ValueError, TypeError) as exc:
+            self._send(400, {"error": str(exc)})
+            return
+
+        try:
+            predictions = batcher.predict(rows)
+        except Exception as exc:
+            logger.exception("Prediction failed for model %s", name)
+            self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+            return
+
+        self._send(200, {"prediction": predictions[0]} if single else {"predictions": predictions})
+
+    def log_message(self, format: str, *args) -> None:
+        # Per-request access logs would dominate the latency.
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects an (host, port) client address.
+        return request, ("unix", 0)
+
+
+def build_server(batchers: Dict[str, MicroBatcher], host: str = "127.0.0.1", port: int = 8080,
+                 unix_socket: str | None = None):
+    """
+    HTTP server over TCP, or over a Unix socket when `unix_socket` is given.
+    """
+    if unix_socket:
+        Path(unix_socket).unlink(missing_ok=True)
+        server = _UnixHTTPServer(unix_socket, ScoringHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ScoringHandler)
+        server.daemon_threads = True
+    server.batchers = batchers
+    return server
@@ -0,0 +1,87 @@
+from typing import Any, Dict
+
+import numpy as np
+from scipy.special import logsumexp
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.utils.validation import check_is_fitted
+
+from src.features.preprocessing import binned_class_counts, check_bin_codes
+from src.models.base_model import BaseClassifier
+
+
+class BinnedNB(ClassifierMixin, BaseEstimator):
+    """
+    Naive Bayes on QuantileBinner codes: one categorical distribution per
+    feature and class (additive smoothing `alpha`), estimated from the
+    class histograms of the codes without converting them to float.
+
+    Codes above the largest one seen in training get the probability of an
+    empty bin.
+    """
+
+    def __init__(
+        self, alpha: float = 1.0, fit_prior: bool = True, chunk_rows: int = 65_536
+    ) -> None:
+        self.alpha = alpha
+        self.fit_prior = fit_prior
+        self.chunk_rows = chunk_rows
+
+    def fit(self, X, y):
+        X = check_bin_codes(X)
+        self.classes_, y_codes = np.unique(y, return_inverse=True)
+        n_classes = len(self.classes_)
+        self.n_features_in_ = X.shape[1]
+        self.n_bins_ = int(X.max()) + 1 if X.size else 1
+
+        counts = binned_class_counts(X, y_codes, self.n_bins_, n_classes, self.chunk_rows)
+        self.class_count_ = counts[0].sum(axis=0).astype(float)
+        # The extra last bin stands for the codes never seen in training.
+        unseen = np.zeros((X.shape[1], 1, n_classes))
+        smoothed = np.concatenate([counts, unseen], axis=1) + self.alpha
+        totals = self.class_count_ + self.alpha * (self.n_bins_ + 1)
+        self.feature_log_prob_ = np.log(smoothed) - np.log(totals)
+        self.class_log_prior_ = (
+            np.log(self.class_count_ / self.class_count_.sum())
+            if self.fit_prior else np.full(n_classes, -np.log(n_classes))
+        )
+        return self
+
+    def _joint_log_likelihood(self, X) -> np.ndarray:
+        check_is_fitted(self, "feature_log_prob_")
+        X = check_bin_codes(X)
+        features = np.arange(X.shape[1])[None, :]
+        jll = np.empty((X.shape[0], len(self.classes_)))
+        for start in range(0, X.shape[0], self.chunk_rows):
+            codes = np.minimum(X[start:start + self.chunk_rows].astype(np.intp), self.n_bins_)
+            jll[start:start + len(codes)] = self.feature_log_prob_[features, codes].sum(axis=1)
+        return jll + self.class_log_prior_
+
+    def predict_log_proba(self, X) -> np.ndarray:
+        jll = self._joint_log_likelihood(X)
+        return jll - logsumexp(jll, axis=1, keepdims=True)
+
+    def predict_proba(self, X) -> np.ndarray:
+        return np.exp(self.predict_log_proba(X))
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self._joint_log_likelihood(X), axis=1)]
+
+
+class BinnedNaiveBayesClassifier(BaseClassifier):
+    """
+    Wrapper around BinnedNB; the model must be configured with `binning`
+    so that it receives bin codes.
+    """
+
+    name = "binned_nb"
+
+    def __init__(self, hyperparameters: Dict[str, Any] | None = None) -> None:
+        self._hyperparameters = hyperparameters or {}
+
+    def build_estimator(self) -> BinnedNB:
+        return BinnedNB()
+
+    def hyperparam_grid(self) -> Dict[str, Any]:
+        return {
+            "classifier__alpha": self._hyperparameters.get("alpha", [1.0]),
+        }
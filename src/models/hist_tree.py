@@ -0,0 +1,165 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.utils.class_weight import compute_class_weight
+from sklearn.utils.validation import check_is_fitted
+
+from src.features.preprocessing import binned_class_counts, check_bin_codes
+from src.models.base_model import BaseClassifier
+
+
+def _xlogx(a: np.ndarray) -> np.ndarray:
+    return a * np.log(np.where(a > 0, a, 1.0))
+
+
+def _weighted_impurity(counts: np.ndarray, criterion: str) -> np.ndarray:
+    """
+    Impurity times node weight, for class counts on the last axis.
+    """
+    total = counts.sum(axis=-1)
+    if criterion == "gini":
+        squares = (counts**2).sum(axis=-1)
+        return total - np.divide(squares, total, out=np.zeros_like(total), where=total > 0)
+    # entropy: n log n - sum(c log c)
+    return _xlogx(total) - _xlogx(counts).sum(axis=-1)
+
+
+class HistogramTreeClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Decision tree trained on QuantileBinner codes.
+
+    The split of a node is found from its per-feature class histograms
+    (bins x classes): cumulative sums give the class counts on the left of
+    every candidate threshold at once, so a node costs one pass over its
+    samples instead of a sort per feature. The histogram of the larger child
+    is the parent's minus the smaller child's. Samples with code <= threshold
+    go left.
+    """
+
+    def __init__(self, criterion: str = "gini", max_depth: int | None = None,
+                 min_samples_split: int = 2, min_samples_leaf: int = 1,
+                 class_weight=None) -> None:
+        self.criterion = criterion
+        self.max_depth = max_depth
+        self.min_samples_split = min_samples_split
+        self.min_samples_leaf = min_samples_leaf
+        self.class_weight = class_weight
+
+    def _best_split(self, hist: np.ndarray, weights: np.ndarray) -> Tuple[int, int] | None:
+        left = np.cumsum(hist, axis=1)[:, :-1, :]
+        right = hist.sum(axis=1, keepdims=True) - left
+        n_left, n_right = left.sum(axis=2), right.sum(axis=2)
+        valid = (n_left >= self.min_samples_leaf) & (n_right >= self.min_samples_leaf)
+        if not valid.any():
+            return None
+
+        # Like sklearn (min_impurity_decrease=0), an impure node is split even without a gain.
+        children = (
+            _weighted_impurity(left * weights, self.criterion)
+            + _weighted_impurity(right * weights, self.criterion)
+        )
+        children = np.where(valid, children, np.inf)
+        feature, threshold = np.unravel_index(np.argmin(children), children.shape)
+        return int(feature), int(threshold)
+
+    def fit(self, X, y):
+        X = check_bin_codes(X)
+        self.classes_, y_codes = np.unique(y, return_inverse=True)
+        n_classes = len(self.classes_)
+        self.n_features_in_ = X.shape[1]
+        self.n_bins_ = int(X.max()) + 1 if X.size else 1
+        weights = (
+            compute_class_weight(self.class_weight, classes=self.classes_, y=y)
+            if self.class_weight is not None else np.ones(n_classes)
+        )
+
+        feature: List[int] = []
+        threshold: List[int] = []
+        children: List[List[int]] = []
+        value: List[np.ndarray] = []
+
+        def add_node(hist: np.ndarray) -> int:
+            feature.append(-1)
+            threshold.append(-1)
+            children.append([-1, -1])
+            value.append(hist[0].sum(axis=0) * weights)
+            return len(value) - 1
+
+        root_hist = binned_class_counts(X, y_codes, self.n_bins_, n_classes)
+        stack = [(np.arange(X.shape[0]), root_hist, 0, add_node(root_hist))]
+        while stack:
+            idx, hist, depth, node = stack.pop()
+            class_counts = hist[0].sum(axis=0)
+            if (
+                (self.max_depth is not None and depth >= self.max_depth)
+                or len(idx) < max(self.min_samples_split, 2 * self.min_samples_leaf)
+                or np.count_nonzero(class_counts) <= 1
+            ):
+                continue
+            split = self._best_split(hist, weights)
+            if split is None:
+                continue
+
+            f, t = split
+            go_left = X[idx, f] <= t
+            idx_left, idx_right = idx[go_left], idx[~go_left]
+            small = idx_left if len(idx_left) <= len(idx_right) else idx_right
+            hist_small = binned_class_counts(X[small], y_codes[small], self.n_bins_, n_classes)
+            hist_large = hist - hist_small
+            if small is idx_left:
+                hist_left, hist_right = hist_small, hist_large
+            else:
+                hist_left, hist_right = hist_large, hist_small
+
+            feature[node], threshold[node] = f, t
+            children[node] = [add_node(hist_left), add_node(hist_right)]
+            stack.append((idx_right, hist_right, depth + 1, children[node][1]))
+            stack.append((idx_left, hist_left, depth + 1, children[node][0]))
+
+        self.feature_ = np.asarray(feature, dtype=np.intp)
+        self.threshold_ = np.asarray(threshold, dtype=np.int64)
+        self.children_ = np.asarray(children, dtype=np.intp).reshape(-1, 2)
+        value_arr = np.asarray(value, dtype=float)
+        self.value_ = value_arr / value_arr.sum(axis=1, keepdims=True)
+        return self
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Leaf index of every sample.
+        """
+        check_is_fitted(self, "feature_")
+        X = check_bin_codes(X)
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        rows = np.arange(X.shape[0])
+        while len(rows):
+            internal = self.feature_[node[rows]] >= 0
+            rows = rows[internal]
+            current = node[rows]
+            go_right = X[rows, self.feature_[current]] > self.threshold_[current]
+            node[rows] = self.children_[current, go_right.astype(np.intp)]
+        return node
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self.value_[self.apply(X)]
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class HistogramTreeWrapper(BaseClassifier):
+    """
+    Wrapper around HistogramTreeClassifier; the model must be configured
+    with `binning` so that it receives bin codes.
+    """
+
+    name = "hist_tree"
+
+    def __init__(self, hyperparameters: Dict[str, Any] | None = None) -> None:
+        self._hyperparameters = hyperparameters or {}
+
+    def build_estimator(self) -> HistogramTreeClassifier:
+        return HistogramTreeClassifier()
+
+    def hyperparam_grid(self) -> Dict[str, Any]:
+        return self._hyperparameters
@@ -29,8 +29,7 @@ class LogisticRegressionModel(BaseClassifier):
         Les hyperparamètres seront ajustés par GridSearchCV via hyperparam_grid().
         """
         return LogisticRegression(
-            max_iter=1000,  
-            multi_class="auto"
+            max_iter=1000,
         )
 
     def hyperparam_grid(self) -> Dict[str, Any]:
@@ -0,0 +1,33 @@
+from typing import Any, Dict
+
+from sklearn.linear_model import SGDClassifier
+
+from src.models.base_model import BaseClassifier
+
+
+class SGDLinearModel(BaseClassifier):
+    """
+    Wrapper around sklearn's SGDClassifier: logistic regression
+    (loss="log_loss") or linear SVM (loss="hinge") trained by stochastic
+    gradient descent, which supports `partial_fit` for streaming training.
+    """
+
+    name = "sgd_linear"
+
+    def __init__(self, hyperparameters: Dict[str, Any] | None = None) -> None:
+        self._hyperparameters = hyperparameters or {}
+
+    def build_estimator(self) -> SGDClassifier:
+        """
+        Build the underlying sklearn SGDClassifier estimator.
+        """
+        return SGDClassifier(random_state=42)
+
+    def hyperparam_grid(self) -> Dict[str, Any]:
+        """
+        Return the hyperparameter grid, keys prefixed with "classifier__".
+        """
+        return {
+            f"classifier__{param}": values
+            for param, values in self._hyperparameters.items()
+        }
@@ -0,0 +1,162 @@
+"""
+Content-addressed training manifest used by the incremental mode of
+scripts/train.py.
+
+For each model we hash everything that determines the trained artifact:
+the training data bytes, the resolved parameter grid, the CV / search
+configuration, the source of the wrapper class and of the pipeline
+modules, and the library versions. When the hash recorded in the manifest
+matches and the stored artifacts are intact, the model is not retrained.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from src.config.config import Config, ModelConfig
+from src.utils.paths import PROJECT_ROOT
+
+# Modules whose code shapes every trained pipeline.
+PIPELINE_MODULES = (
+    "src.data.data_loader",
+    "src.features.cache",
+    "src.features.preprocessing",
+    "src.evaluation.crossval",
+    "src.evaluation.tuning",
+    "src.evaluation.fold_search",
+    "src.evaluation.racing",
+    "src.evaluation.neighbors_search",
+    "src.evaluation.path_search",
+    "src.evaluation.kernel_search",
+    "src.evaluation.nb_search",
+    "src.evaluation.batch_scoring",
+    "src.evaluation.epoch_search",
+    "src.evaluation.tree_search",
+    "src.evaluation.prediction_store",
+)
+
+LIBRARIES = ("sklearn", "numpy", "pandas", "joblib")
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of a file, read in chunks. For a directory (npy table), the
+    names and contents of all its files are hashed in sorted order.
+    """
+    is_dir = Path(path).is_dir()
+    files = sorted(p for p in Path(path).rglob("*") if p.is_file()) if is_dir else [path]
+    h = hashlib.sha256()
+    for file in files:
+        if is_dir:
+            h.update(Path(file).relative_to(path).as_posix().encode("utf-8"))
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _source_digest(module_names: Iterable[str]) -> str:
+    h = hashlib.sha256()
+    for name in module_names:
+        h.update(name.encode("utf-8"))
+        h.update(inspect.getsource(import_module(name)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def library_versions() -> Dict[str, str]:
+    versions = {"python": platform.python_version()}
+    for name in LIBRARIES:
+        module = sys.modules.get(name) or import_module(name)
+        versions[name] = getattr(module, "__version__", "unknown")
+    return versions
+
+
+def model_fingerprint(
+    config: Config,
+    model_cfg: ModelConfig,
+    model_class: type,
+    param_grid: Dict[str, Any],
+    data_digest: str,
+) -> str:
+    """
+    Hash of every input that determines the artifacts of one model.
+    """
+    training = config.training
+    payload = {
+        "data": data_digest,
+        "dataset": {
+            "target_column": config.dataset.target_column,
+            "id_column": config.dataset.id_column,
+        },
+        "model": {
+            "class_path": model_cfg.class_path,
+            "use_scaler": model_cfg.use_scaler,
+            "binning": model_cfg.binning,
+            "param_grid": param_grid,
+            "search": model_cfg.search,
+        },
+        "training": {
+            "cv": training.cv,
+            "scoring": training.scoring,
+            "refit_metric": training.refit_metric,
+            "random_state": training.random_state,
+            "search": training.search,
+            "prediction_store": training.prediction_store,
+        },
+        "code": _source_digest((model_class.__module__, *PIPELINE_MODULES)),
+        "libraries": library_versions(),
+    }
+    blob = json.dumps(payload, sort_keys=True, default=repr)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class TrainingManifest:
+    """
+    JSON manifest: model name -> fingerprint and digests of its artifacts.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("models", {})
+
+    def is_up_to_date(self, model_name: str, fingerprint: str) -> bool:
+        """
+        True if the model was trained with this fingerprint and its artifacts
+        are still on disk, unchanged.
+        """
+        entry = self.entries.get(model_name)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return False
+        for rel_path, digest in entry.get("artifacts", {}).items():
+            path = PROJECT_ROOT / rel_path
+            if not path.exists() or file_digest(path) != digest:
+                return False
+        return True
+
+    def record(self, model_name: str, fingerprint: str, artifacts: Iterable[Path]) -> None:
+        self.entries[model_name] = {
+            "fingerprint": fingerprint,
+            "artifacts": {
+                Path(p).resolve().relative_to(PROJECT_ROOT).as_posix(): file_digest(Path(p))
+                for p in artifacts
+            },
+            "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump({"models": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,172 @@
+"""
+Model-level scheduling helpers used by scripts/train.py.
+
+Several models are trained at the same time in a process pool, and the
+global core budget is split between model-level workers and the
+fold-level parallelism (n_jobs) of each hyperparameter search.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def available_cores() -> int:
+    """
+    Return the number of cores usable by the current process.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def resolve_core_budget(n_cores: int | None) -> int:
+    """
+    Translate a joblib-style core count (-1 = all cores, -2 = all but one...)
+    into a positive number of cores.
+    """
+    total = available_cores()
+    if n_cores is None or n_cores == 0:
+        return total
+    if n_cores < 0:
+        return max(1, total + 1 + n_cores)
+    return min(n_cores, total)
+
+
+def count_candidates(param_grid: Dict[str, Any] | Sequence[Dict[str, Any]]) -> int:
+    """
+    Number of candidates a GridSearchCV would evaluate for this grid.
+    """
+    grids = [param_grid] if isinstance(param_grid, dict) else list(param_grid)
+    total = 0
+    for grid in grids:
+        size = 1
+        for values in grid.values():
+            size *= len(values) if isinstance(values, (list, tuple)) else 1
+        total += size
+    return max(total, 1)
+
+
+def plan_core_split(n_models: int, n_cores: int, max_parallel_models: int) -> Tuple[int, int]:
+    """
+    Split a core budget between model-level workers and per-model n_jobs.
+
+    Returns (n_model_workers, n_jobs_per_model). n_jobs_per_model is the
+    even share; run_jobs(n_cores=...) hands the remainder to the longest jobs.
+    """
+    if n_models <= 0:
+        return 1, n_cores
+
+    limit = max_parallel_models if max_parallel_models and max_parallel_models > 0 else n_cores
+    n_workers = max(1, min(n_models, limit, n_cores))
+    n_jobs = max(1, n_cores // n_workers)
+    return n_workers, n_jobs
+
+
+def order_longest_first(jobs: Iterable[Tuple[str, int]]) -> List[str]:
+    """
+    Order job names by decreasing estimated cost (longest processing time first),
+    so that the largest grids never end up running alone at the end.
+    """
+    return [name for name, _ in sorted(jobs, key=lambda item: item[1], reverse=True)]
+
+
+def _job_cores(free: int, n_slots: int) -> int:
+    """
+    Cores of the next job when `free` cores are shared by `n_slots` jobs
+    started now, longest first: the remainder goes to the first (longest) ones.
+    """
+    return max(1, -(-free // max(n_slots, 1)))
+
+
+def run_jobs(
+    fn: Callable[..., Any],
+    jobs: Dict[str, Tuple],
+    order: List[str],
+    n_workers: int,
+    on_result: Callable[[str, Any], None] | None = None,
+    n_cores: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Run fn(*jobs[name]) for every name in `order`.
+
+    With a single worker the jobs run in-process, one after the other.
+    Otherwise at most `n_workers` jobs run at a time in a process pool, started
+    in the given order, and results are collected as soon as each job
+    finishes. `on_result(name, result)` is called in the calling process after
+    each job.
+
+    When `n_cores` is given, each job is called with an n_jobs=<cores> keyword:
+    the cores not used by running jobs are shared by the jobs started, the
+    longest ones getting the remainder, and the cores of a finished job go to
+    the jobs started after it.
+
+    A failing job is logged and left out of the returned results (name ->
+    result); the other jobs still run.
+    """
+    results: Dict[str, Any] = {}
+
+    def call_kwargs(n_jobs: int) -> Dict[str, int]:
+        return {} if n_cores is None else {"n_jobs": n_jobs}
+
+    def collect(name: str, result: Any) -> None:
+        results[name] = result
+        if on_result is not None:
+            on_result(name, result)
+
+    if n_workers <= 1:
+        for name in order:
+            try:
+                result = fn(*jobs[name], **call_kwargs(n_cores or 1))
+            except Exception:
+                logger.exception("Job %s failed.", name)
+                continue
+            collect(name, result)
+        _log_failures(order, results)
+        return results
+
+    budget = n_cores or n_workers
+    pending = list(order)
+    running: Dict[Future, Tuple[str, int]] = {}
+    n_done = 0
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        while pending or running:
+            while pending and len(running) < n_workers:
+                free = budget - sum(cores for _, cores in running.values())
+                cores = _job_cores(free, min(n_workers - len(running), len(pending)))
+                name = pending.pop(0)
+                running[executor.submit(fn, *jobs[name], **call_kwargs(cores))] = (name, cores)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, _ = running.pop(future)
+                n_done += 1
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception("Job %s failed (%d/%d).", name, n_done, len(order))
+                    continue
+                logger.info("Job %s finished (%d/%d).", name, n_done, len(order))
+                collect(name, result)
+
+    _log_failures(order, results)
+    return results
+
+
+def _log_failures(order: List[str], results: Dict[str, Any]) -> None:
+    failed = [name for name in order if name not in results]
+    if failed:
+        logger.error("%d of %d jobs failed: %s", len(failed), len(order), ", ".join(failed))
+
+
+def grid_cost(param_grid: Dict[str, Any], n_splits: int) -> int:
+    """
+    Estimated cost of a search: number of candidates times number of folds.
+    """
+    return count_candidates(param_grid) * max(int(n_splits), 1)
+
@@ -0,0 +1,192 @@
+"""
+Out-of-core training for estimators that support `partial_fit`.
+
+The training table is read by chunks (iter_table) and never loaded whole:
+
+1. a first pass collects the classes and fits one StreamingScaler per CV
+   fold, on the rows outside the fold, plus one on all the rows;
+2. `n_epochs` passes feed every chunk (rows shuffled) to the `partial_fit`
+   of every candidate, for every fold and for all the rows;
+3. a last pass predicts the held-out rows of each fold and accumulates one
+   confusion matrix per candidate and fold, from which the label-based
+   scoring metric is computed (see batch_scoring).
+
+Folds come from hash_folds on the id column (or the row position), so every
+pass assigns a row to the same fold without keeping an index in memory. The
+best candidate is taken from the models trained on all the rows, so there is
+no separate refit pass. Memory use does not grow with the number of rows: one
+chunk plus (n_splits + 1) x n_candidates models.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid
+
+from src.evaluation import batch_scoring
+from src.evaluation.crossval import hash_fold_scheme, hash_folds
+from src.evaluation.fold_search import FoldResults, format_cv_results
+from src.features.preprocessing import StreamingScaler, build_pipeline
+from src.utils.io import iter_table
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CLASSIFIER_PREFIX = "classifier__"
+
+
+def supports_streaming(estimator) -> bool:
+    return hasattr(estimator, "partial_fit")
+
+
+class StreamingSearch:
+    """
+    Grid search trained and cross-validated chunk by chunk, with the
+    GridSearchCV result attributes (`best_estimator_`, `best_params_`,
+    `best_score_`, `cv_results_`). `best_estimator_` is a
+    StreamingScaler -> classifier Pipeline that takes the table columns.
+
+    Only classifier parameters (`classifier__*`) can be tuned and the
+    scoring must be a label-based metric of batch_scoring.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        param_grid: Dict[str, Any],
+        numerical_features: List[str],
+        categorical_features: List[str],
+        target_column: str,
+        key_column: str | None = None,
+        use_scaler: bool = True,
+        scoring: str = "accuracy",
+        n_splits: int = 5,
+        chunk_rows: int = 100_000,
+        n_epochs: int = 5,
+        random_state: int | None = None,
+    ) -> None:
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.numerical_features = numerical_features
+        self.categorical_features = categorical_features
+        self.target_column = target_column
+        self.key_column = key_column
+        self.use_scaler = use_scaler
+        self.scoring = scoring
+        self.n_splits = n_splits
+        self.chunk_rows = chunk_rows
+        self.n_epochs = n_epochs
+        self.random_state = random_state
+
+    def _chunks(
+        self, path: Path, window: slice | None, rng: np.random.Generator | None = None
+    ) -> Iterator[Tuple[pd.DataFrame, np.ndarray, np.ndarray]]:
+        """
+        (chunk, target, fold of every row) for every chunk of the `window` of
+        the table, rows shuffled within the chunk when `rng` is given.
+        """
+        for chunk in iter_table(path, self.chunk_rows, window):
+            if rng is not None:
+                chunk = chunk.iloc[rng.permutation(len(chunk))]
+            keys = chunk[self.key_column] if self.key_column in chunk.columns else chunk.index
+            folds = hash_folds(keys, self.n_splits, self.random_state)
+            yield chunk, chunk[self.target_column].to_numpy(), folds
+
+    def _models(self, candidates: List[Dict[str, Any]]) -> List[Any]:
+        models = []
+        for params in candidates:
+            model = clone(self.estimator).set_params(
+                **{k[len(CLASSIFIER_PREFIX):]: v for k, v in params.items()}
+            )
+            if not supports_streaming(model):
+                raise ValueError(f"{type(model).__name__} has no partial_fit with {params}.")
+            models.append(model)
+        return models
+
+    def fit(self, path: Path, window: slice | None = None):
+        candidates = list(ParameterGrid(self.param_grid))
+        for name in {k for params in candidates for k in params}:
+            if not name.startswith(CLASSIFIER_PREFIX):
+                raise ValueError(
+                    f"Streaming training only tunes classifier parameters, got '{name}'."
+                )
+        n_folds = self.n_splits
+
+        # Pass 1: classes and scalers (index n_folds = all the rows).
+        scalers = [
+            StreamingScaler(
+                self.numerical_features, self.use_scaler, passthrough=self.categorical_features
+            )
+            for _ in range(n_folds + 1)
+        ]
+        classes = set()
+        for chunk, y, folds in self._chunks(path, window):
+            classes.update(np.unique(y).tolist())
+            for k in range(n_folds):
+                scalers[k].partial_fit(chunk[folds != k])
+            scalers[n_folds].partial_fit(chunk)
+        self.classes_ = np.array(sorted(classes))
+        if not batch_scoring.supports(self.scoring, self.classes_):
+            raise ValueError(
+                f"Streaming training needs a label-based scoring among "
+                f"{', '.join(batch_scoring.BATCH_METRICS)}, got {self.scoring!r}."
+            )
+
+        # Passes 2 .. n_epochs + 1: partial_fit on every chunk.
+        models = [self._models(candidates) for _ in range(n_folds + 1)]
+        fit_times = np.zeros((len(candidates), n_folds + 1))
+        rng = np.random.default_rng(self.random_state)
+        for epoch in range(self.n_epochs):
+            for chunk, y, folds in self._chunks(path, window, rng):
+                for k in range(n_folds + 1):
+                    rows = folds != k if k < n_folds else np.ones(len(y), dtype=bool)
+                    if not rows.any():
+                        continue
+                    X_k = scalers[k].transform(chunk[rows])
+                    for c, model in enumerate(models[k]):
+                        start = time.perf_counter()
+                        model.partial_fit(X_k, y[rows], classes=self.classes_)
+                        fit_times[c, k] += time.perf_counter() - start
+            logger.info("Streaming epoch %d/%d done.", epoch + 1, self.n_epochs)
+
+        # Last pass: confusion matrices of the held-out rows.
+        n_classes = len(self.classes_)
+        cm = np.zeros((len(candidates), n_folds, n_classes, n_classes), dtype=np.int64)
+        score_times = np.zeros((len(candidates), n_folds))
+        for chunk, y, folds in self._chunks(path, window):
+            y_codes = np.searchsorted(self.classes_, y)
+            for k in range(n_folds):
+                rows = folds == k
+                if not rows.any():
+                    continue
+                X_k = scalers[k].transform(chunk[rows])
+                for c, model in enumerate(models[k]):
+                    start = time.perf_counter()
+                    pred_codes = np.searchsorted(self.classes_, model.predict(X_k))
+                    cm[c, k] += batch_scoring.confusion_matrices(
+                        y_codes[rows], pred_codes[None, :], n_classes
+                    )[0]
+                    score_times[c, k] += time.perf_counter() - start
+
+        scores = batch_scoring.scores_from_confusion(
+            self.scoring, self.classes_, cm.reshape(-1, n_classes, n_classes)
+        ).reshape(len(candidates), n_folds)
+        results = FoldResults(len(candidates), n_folds)
+        for c in range(len(candidates)):
+            for k in range(n_folds):
+                results.record(c, k, scores[c, k], np.nan, fit_times[c, k], score_times[c, k])
+
+        self.cv_results_ = format_cv_results(
+            candidates, results, [np.nanmean(results.test_scores, axis=1)], return_train_score=False
+        )
+        self.best_index_ = int(np.argmin(self.cv_results_["rank_test_score"]))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = float(self.cv_results_["mean_test_score"][self.best_index_])
+        self.best_estimator_ = build_pipeline(scalers[n_folds], models[n_folds][self.best_index_])
+        self.n_samples_ = scalers[n_folds].n_samples_seen_
+        self.cv_scheme_ = hash_fold_scheme(self.n_splits, self.random_state, self.key_column)
+        return self
@@ -1,10 +1,35 @@
 """
-Utility functions for saving data (CSV, text) in a consistent way.
+Utility functions for saving data (CSV, text, binary tables) in a consistent way.
+
+Tables can be stored in three formats:
+
+- "npy": a directory holding one 2D .npy file per dtype (column-major, so each
+  column is contiguous) plus a meta.json describing the columns. Dtypes are
+  preserved exactly and the arrays are read back through memory maps, so
+  several processes loading the same table share one physical copy, and row
+  ranges or column subsets of the loaded DataFrame are views of the files.
+- "parquet": a single Parquet file (requires pyarrow).
+- "csv": plain text, kept as an optional, human-readable side output.
 """
 
+from __future__ import annotations
+
+import json
+import os
+import shutil
 from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from src.utils.lazy import lazy_import
+from src.utils.profiling import timed
+
+pd = lazy_import("pandas")
+
+TABLE_FORMATS = ("npy", "parquet", "csv")
 
-import pandas as pd
+_META_FILENAME = "meta.json"
 
 
 def save_csv(df: pd.DataFrame, path: Path) -> None:
@@ -22,3 +47,231 @@ def save_text(text: str, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         f.write(text)
+
+
+def table_path(directory: Path, name: str, fmt: str) -> Path:
+    """
+    Location of table `name` stored in `directory` with format `fmt`
+    (a directory for "npy", a file otherwise).
+    """
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format '{fmt}'. Available: {', '.join(TABLE_FORMATS)}")
+    return directory / name if fmt == "npy" else directory / f"{name}.{fmt}"
+
+
+@timed()
+def save_table(
+    df: pd.DataFrame, directory: Path, name: str, fmt: str = "npy", rows: np.ndarray | None = None
+) -> Path:
+    """
+    Save a DataFrame as table `name` in `directory` and return its path.
+    With `rows`, the table holds the rows of df at these positions, in this
+    order (npy tables are filled column by column, without copying df).
+    """
+    path = table_path(directory, name, fmt)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    if fmt == "npy":
+        _save_npy_table(df, path, rows)
+        return path
+    if rows is not None:
+        df = df.take(rows)
+    if fmt == "csv":
+        save_csv(df, path)
+    else:
+        _require_pyarrow()
+        df.to_parquet(path, index=False)
+    return path
+
+
+@timed()
+def load_table(path: Path, mmap: bool = True) -> pd.DataFrame:
+    """
+    Load a table written by save_table. The format is inferred from the path.
+    """
+    if path.is_dir():
+        return _load_npy_table(path, mmap=mmap)
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        return pd.read_parquet(path, memory_map=mmap)
+    return pd.read_csv(path)
+
+
+def table_columns(path: Path) -> List[str]:
+    """
+    Column names of a table written by save_table, without reading its rows.
+    """
+    if path.is_dir():
+        with open(path / _META_FILENAME, "r", encoding="utf-8") as f:
+            return list(json.load(f)["columns"])
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_table(path: Path, chunk_rows: int, rows: slice | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a table written by save_table by blocks of `chunk_rows` rows,
+    without loading it whole. The index of every chunk holds the row
+    positions in the table. `rows` (a slice of step 1) restricts the reading
+    to a range of rows.
+    """
+    start, stop = (rows.start or 0, rows.stop) if rows is not None else (0, None)
+    if path.is_dir():
+        yield from _iter_npy_table(path, chunk_rows, start, stop)
+        return
+    if path.suffix == ".parquet":
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        def batches():
+            offset = 0
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+                chunk = batch.to_pandas()
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                offset += len(chunk)
+                yield chunk
+
+        chunks = batches()
+    else:
+        chunks = pd.read_csv(path, chunksize=chunk_rows)
+
+    # Formats without random access are read from the start and trimmed.
+    for chunk in chunks:
+        first = chunk.index[0] if len(chunk) else start
+        if stop is not None and first >= stop:
+            break
+        lo = max(start - first, 0)
+        hi = len(chunk) if stop is None else min(stop - first, len(chunk))
+        if lo < hi:
+            yield chunk.iloc[lo:hi]
+
+
+def _require_pyarrow() -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(
+            "The parquet table format requires pyarrow (pip install pyarrow)."
+        ) from exc
+
+
+def _storage_kind(series: pd.Series) -> str:
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return np.dtype(series.dtype).str
+    # Non-numeric columns are stored as fixed-width unicode so they can be memory-mapped.
+    return "str"
+
+
+def _save_npy_table(df: pd.DataFrame, path: Path, rows: np.ndarray | None = None) -> None:
+    groups: Dict[str, List[str]] = {}
+    for col in df.columns:
+        groups.setdefault(_storage_kind(df[col]), []).append(col)
+
+    blocks = []
+    tmp_path = path.with_name(path.name + ".tmp")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    n_rows = len(df) if rows is None else len(rows)
+    for i, (kind, cols) in enumerate(groups.items()):
+        filename = f"block_{i}.npy"
+        if kind == "str":
+            values = df[cols].to_numpy()
+            block = np.asfortranarray((values if rows is None else values[rows]).astype(str))
+            np.save(tmp_path / filename, block)
+        else:
+            # Numeric blocks are written column by column into the mapped file,
+            # so that no dtype block of df is ever materialised in memory.
+            block = np.lib.format.open_memmap(
+                tmp_path / filename,
+                mode="w+",
+                dtype=np.dtype(kind),
+                shape=(n_rows, len(cols)),
+                fortran_order=True,
+            )
+            for j, col in enumerate(cols):
+                values = df[col].to_numpy()
+                block[:, j] = values if rows is None else values[rows]
+            block.flush()
+        blocks.append({"file": filename, "dtype": block.dtype.str, "columns": list(map(str, cols))})
+        del block
+
+    meta: Dict[str, Any] = {
+        "n_rows": int(n_rows),
+        "columns": list(map(str, df.columns)),
+        "blocks": blocks,
+    }
+    with open(tmp_path / _META_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Replace the previous version of the table in one step.
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+
+def _load_npy_table(path: Path, mmap: bool = True) -> pd.DataFrame:
+    with open(path / _META_FILENAME, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    frames = []
+    for block in meta["blocks"]:
+        values = np.load(path / block["file"], mmap_mode="r" if mmap else None)
+        frames.append(pd.DataFrame(values, columns=block["columns"], copy=False))
+
+    if not frames:
+        return pd.DataFrame(index=pd.RangeIndex(meta["n_rows"]))
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+    return df[meta["columns"]]
+
+
+def _iter_npy_table(
+    path: Path, chunk_rows: int, start: int = 0, stop: int | None = None
+) -> Iterator[pd.DataFrame]:
+    # Chunks are read with explicit offsets rather than through memory maps,
+    # whose pages would stay resident in the process for the whole pass.
+    with open(path / _META_FILENAME, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    blocks = []
+    for block in meta["blocks"]:
+        with open(path / block["file"], "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            blocks.append(
+                (path / block["file"], f.tell(), shape, fortran_order, dtype, block["columns"])
+            )
+
+    end = meta["n_rows"] if stop is None else min(stop, meta["n_rows"])
+    for first in range(start, end, chunk_rows):
+        last = min(first + chunk_rows, end)
+        index = pd.RangeIndex(first, last)
+        frames = []
+        for file, offset, (n_rows, n_cols), fortran_order, dtype, cols in blocks:
+            if fortran_order:
+                values = np.empty((last - first, n_cols), dtype=dtype, order="F")
+                for j in range(n_cols):
+                    values[:, j] = np.fromfile(
+                        file,
+                        dtype=dtype,
+                        count=last - first,
+                        offset=offset + (j * n_rows + first) * dtype.itemsize,
+                    )
+            else:
+                values = np.fromfile(
+                    file,
+                    dtype=dtype,
+                    count=(last - first) * n_cols,
+                    offset=offset + first * n_cols * dtype.itemsize,
+                ).reshape(last - first, n_cols)
+            frames.append(pd.DataFrame(values, columns=cols, index=index, copy=False))
+        chunk = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+        yield chunk[meta["columns"]]
@@ -0,0 +1,30 @@
+"""
+Deferred imports for the heavy dependencies of the script entry points.
+
+    pd = lazy_import("pandas")
+
+binds a module placeholder that imports pandas on its first attribute
+access, so that a script only pays for the libraries its code path
+actually uses. Modules using it for names that appear in annotations
+start with `from __future__ import annotations`.
+"""
+
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Placeholder importing the module of the same name on first use, then
+    exposing its attributes. Safe to use from several threads (the import
+    itself goes through importlib and its import lock).
+    """
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    return LazyModule(name)
@@ -12,11 +12,20 @@ DATA_RAW_DIR = DATA_DIR / "raw"
 DATA_INTERIM_DIR = DATA_DIR / "interim"
 DATA_PROCESSED_DIR = DATA_DIR / "processed"
 
+# Preprocessed CV folds shared by the training processes (src/features/cache.py)
+FOLD_CACHE_DIR = DATA_PROCESSED_DIR / "fold_cache"
+
 # Models directories
 MODELS_DIR = PROJECT_ROOT / "models"
 MODELS_ARTIFACTS_DIR = MODELS_DIR / "artifacts"
 MODELS_REPORTS_DIR = MODELS_DIR / "reports"
 
+# Row-level out-of-fold and test predictions of every model (prediction store)
+MODELS_PREDICTIONS_DIR = MODELS_DIR / "predictions"
+
+# Manifest of the inputs each trained model was built from (incremental training)
+TRAINING_MANIFEST_PATH = MODELS_DIR / "training_manifest.json"
+
 # Notebooks directory (optional)
 NOTEBOOKS_DIR = PROJECT_ROOT / "notebooks"
 
@@ -1,11 +1,47 @@
-import matplotlib.pyplot as plt
+"""
+Report figures. matplotlib (and the sklearn display helpers) are only
+imported by the first figure drawn, with the non-interactive Agg backend
+unless pyplot is already in use or MPLBACKEND is set, so that scripts
+run without plots never load them.
+"""
+
+import os
+import sys
+
 import numpy as np
-from sklearn.metrics import ConfusionMatrixDisplay, confusion_matrix, classification_report
+
+from src.utils.lazy import lazy_import
+
+metrics = lazy_import("sklearn.metrics")
+
+
+def _pyplot():
+    if "matplotlib.pyplot" not in sys.modules and not os.environ.get("MPLBACKEND"):
+        import matplotlib
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def preload_plotting() -> None:
+    """
+    Import the plotting libraries now, e.g. before forking figure workers
+    that would otherwise each import them.
+    """
+    _pyplot()
+    metrics.ConfusionMatrixDisplay
 
 
 def plot_confusion_matrix(y_true, y_pred, title: str, out_path: str):
-    cm = confusion_matrix(y_true, y_pred)
-    disp = ConfusionMatrixDisplay(confusion_matrix=cm)
+    plot_confusion_counts(metrics.confusion_matrix(y_true, y_pred), None, title, out_path)
+
+
+def plot_confusion_counts(cm: np.ndarray, labels, title: str, out_path: str):
+    """
+    Same figure as plot_confusion_matrix, from an already computed matrix.
+    """
+    plt = _pyplot()
+    disp = metrics.ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=labels)
     fig, ax = plt.subplots()
     disp.plot(ax=ax, colorbar=False)
     ax.set_title(title)
@@ -14,6 +50,6 @@ def plot_confusion_matrix(y_true, y_pred, title: str, out_path: str):
 
 
 def save_classification_report(y_true, y_pred, target_names, out_path: str):
-    report = classification_report(y_true, y_pred, target_names=target_names)
+    report = metrics.classification_report(y_true, y_pred, target_names=target_names)
     with open(out_path, "w", encoding="utf-8") as f:
         f.write(report)
@@ -0,0 +1,311 @@
+"""
+Timing instrumentation: spans, counters and optional per-stage profiles,
+written as a machine-readable trace next to the reports.
+
+    configure_profiling(config.training.profiling, "train")   # once per script
+    with span("search.fit", model="svm"):
+        ...
+    @timed("io.save_csv")
+    def save_csv(...): ...
+    count("fits", 40)
+
+While profiling is disabled (the default), spans and counters only check a
+flag. When enabled, every finished span is appended as one JSON line to
+models/reports/traces/<script>-<timestamp>.jsonl by the process that ran it
+(worker processes find the trace through the environment); with
+`format: chrome` the file is converted at exit to the Chrome trace format
+(chrome://tracing, Perfetto). Spans opened with `profile=True` are also
+captured by cProfile (`.prof`, for pstats / snakeviz) or by a sampling
+profiler (`.folded` stacks, for flame graph tools), as set by `profiler`.
+"""
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from src.utils.logging import get_logger
+from src.utils.paths import MODELS_REPORTS_DIR
+
+logger = get_logger(__name__)
+
+TRACES_DIR = MODELS_REPORTS_DIR / "traces"
+
+# Inherited by worker processes.
+TRACE_PATH_ENV = "ML_TRACE_PATH"
+PROFILER_ENV = "ML_TRACE_PROFILER"
+SAMPLE_INTERVAL_ENV = "ML_TRACE_SAMPLE_INTERVAL_MS"
+# `ML_PROFILING=1|jsonl|chrome` turns profiling on without editing the config.
+PROFILING_ENV = "ML_PROFILING"
+
+PROFILERS = ("cprofile", "sampling")
+
+
+def now_us() -> int:
+    """Wall-clock time in microseconds (trace timestamps, comparable across processes)."""
+    return time.time_ns() // 1000
+
+
+class _SamplingCapture:
+    """
+    Samples the call stack of one thread every `interval` seconds and
+    counts the stacks in the folded format (`outer;inner count`).
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def stop(self, path: Path) -> None:
+        self._stop.set()
+        self._thread.join()
+        with path.with_name(path.name + ".folded").open("w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+class _CProfileCapture:
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, path: Path) -> None:
+        self.profile.disable()
+        self.profile.dump_stats(path.with_name(path.name + ".prof"))
+
+
+class _Tracer:
+    """
+    Per-process trace writer, configured from the environment.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = None
+        self._file_pid = None
+        self._capturing = False
+        self.totals: Dict[str, float] = {}
+        self.load_env()
+
+    def load_env(self) -> None:
+        path = os.environ.get(TRACE_PATH_ENV)
+        self.path = Path(path) if path else None
+        self.profiler = os.environ.get(PROFILER_ENV) or None
+        self.interval = float(os.environ.get(SAMPLE_INTERVAL_ENV, "10")) / 1000
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        event.setdefault("pid", os.getpid())
+        event.setdefault("tid", threading.get_ident())
+        line = json.dumps(event, default=repr)
+        with self._lock:
+            # Reopen after a fork so that each process appends through its own handle.
+            if self._file is None or self._file_pid != os.getpid():
+                self._file = self.path.open("a", encoding="utf-8")
+                self._file_pid = os.getpid()
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def start_capture(self):
+        # One capture at a time: profilers cannot be nested.
+        if self.profiler not in PROFILERS or self._capturing:
+            return None
+        try:
+            capture = (
+                _CProfileCapture() if self.profiler == "cprofile"
+                else _SamplingCapture(threading.get_ident(), self.interval)
+            )
+        except ValueError:
+            # Another profiler is already active in this process.
+            return None
+        self._capturing = True
+        return capture
+
+    def stop_capture(self, capture, name: str, attrs: Dict[str, Any]) -> None:
+        self._capturing = False
+        label = "-".join([name, *(str(v) for v in attrs.values()), str(os.getpid())])
+        directory = self.path.with_suffix("")
+        directory.mkdir(parents=True, exist_ok=True)
+        capture.stop(directory / re.sub(r"[^\w.-]+", "_", label))
+
+
+_TRACER = _Tracer()
+
+
+@contextmanager
+def span(name: str, profile: bool = False, **attrs) -> Iterator[None]:
+    """
+    Time the enclosed block as one trace event; `attrs` are recorded with it.
+    With `profile=True` the block is also captured by the configured profiler.
+    """
+    tracer = _TRACER
+    if not tracer.enabled:
+        yield
+        return
+
+    stack = tracer.stack()
+    parent = stack[-1] if stack else None
+    stack.append(name)
+    capture = tracer.start_capture() if profile else None
+    ts, start = now_us(), time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        if capture is not None:
+            tracer.stop_capture(capture, name, attrs)
+        stack.pop()
+        tracer.emit({
+            "type": "span", "name": name, "ts_us": ts, "dur_us": int(duration * 1e6),
+            "parent": parent, "depth": len(stack), "attrs": attrs,
+        })
+
+
+def timed(name: str | None = None, profile: bool = False):
+    """
+    Decorator form of span (default name: module.qualname of the function).
+    """
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _TRACER.enabled:
+                return func(*args, **kwargs)
+            with span(label, profile=profile):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: float = 1, **attrs) -> None:
+    """
+    Add `value` to a per-process counter and record its new total.
+    """
+    tracer = _TRACER
+    if not tracer.enabled:
+        return
+    tracer.totals[name] = tracer.totals.get(name, 0) + value
+    tracer.emit({
+        "type": "counter", "name": name, "ts_us": now_us(), "value": tracer.totals[name],
+        "attrs": attrs,
+    })
+
+
+def record(
+    name: str, duration: float, ts_us: int | None = None, track: str | None = None, **attrs
+) -> None:
+    """
+    Record a span measured elsewhere (e.g. fit times from cv_results_),
+    optionally on its own `track` instead of the current thread.
+    """
+    tracer = _TRACER
+    if not tracer.enabled:
+        return
+    event = {
+        "type": "span", "name": name, "ts_us": ts_us if ts_us is not None else now_us(),
+        "dur_us": int(duration * 1e6), "parent": None, "depth": 0, "attrs": attrs,
+    }
+    if track is not None:
+        event["tid"] = track
+    tracer.emit(event)
+
+
+def profiling_enabled() -> bool:
+    return _TRACER.enabled
+
+
+def to_chrome_trace(jsonl_path: Path, out_path: Path) -> None:
+    """
+    Convert a JSON-lines trace to the Chrome trace event format.
+    """
+    events = []
+    with jsonl_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            common = {
+                "name": event["name"], "pid": event["pid"], "tid": event["tid"],
+                "ts": event["ts_us"],
+            }
+            if event["type"] == "span":
+                events.append({**common, "ph": "X", "dur": event["dur_us"], "args": event["attrs"]})
+            else:
+                events.append({**common, "ph": "C", "args": {event["name"]: event["value"]}})
+    with out_path.open("w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+def configure_profiling(profiling_cfg: Dict[str, Any], script: str) -> Path | None:
+    """
+    Start tracing for this script (and the processes it starts) when
+    `profiling_cfg["enabled"]` or the ML_PROFILING variable is set.
+    Returns the trace path.
+    """
+    cfg = dict(profiling_cfg or {})
+    override = os.environ.get(PROFILING_ENV)
+    if override is not None:
+        cfg["enabled"] = override.lower() not in ("", "0", "false", "no")
+        if override in ("jsonl", "chrome"):
+            cfg["format"] = override
+    if not cfg.get("enabled", False):
+        return None
+
+    profiler = cfg.get("profiler")
+    if profiler is not None and profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}'. Available: {', '.join(PROFILERS)}")
+
+    TRACES_DIR.mkdir(parents=True, exist_ok=True)
+    path = TRACES_DIR / f"{script}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl"
+    os.environ[TRACE_PATH_ENV] = str(path)
+    os.environ[PROFILER_ENV] = profiler or ""
+    os.environ[SAMPLE_INTERVAL_ENV] = str(cfg.get("sample_interval_ms", 10))
+    _TRACER.load_env()
+
+    atexit.register(_finish, path, cfg.get("format", "jsonl"))
+    logger.info("Profiling enabled, trace written to %s", path)
+    return path
+
+
+def _finish(path: Path, fmt: str) -> None:
+    if not path.exists():
+        return
+    if fmt == "chrome":
+        out_path = path.with_suffix(".trace.json")
+        to_chrome_trace(path, out_path)
+        path.unlink()
+        path = out_path
+    logger.info("Trace saved to %s", path)
@@ -0,0 +1,106 @@
+"""
+Fold cache of fitted preprocessors and transformed matrices
+(src/features/cache.py).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.features import cache
+
+
+@pytest.fixture()
+def frame():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, 4)), columns=list("abcd"))
+    y = (X["a"] + rng.normal(scale=0.5, size=200) > 0).astype(int)
+    return X, y
+
+
+@pytest.fixture()
+def fold_cache():
+    fold_cache = cache.FoldCache(cache.DEFAULT_MAX_BYTES)
+    previous, cache._FOLD_CACHE = cache._FOLD_CACHE, fold_cache
+    yield fold_cache
+    cache._FOLD_CACHE = previous
+
+
+def _wrapper(dataset_key="data", directory=None, **scaler):
+    return cache.FoldCachedPreprocessor(StandardScaler(**scaler), dataset_key, directory=directory)
+
+
+def test_same_rows_reuse_the_fit(frame, fold_cache):
+    X, y = frame
+    first = _wrapper().fit_transform(X.iloc[:150], y.iloc[:150])
+    second = _wrapper().fit_transform(X.iloc[:150], y.iloc[:150])
+    assert second is first
+    assert not first.flags.writeable
+    assert (fold_cache.hits, fold_cache.misses) == (1, 1)
+    np.testing.assert_allclose(first, StandardScaler().fit_transform(X.iloc[:150]))
+
+
+def test_rows_and_configuration_are_part_of_the_key(frame, fold_cache):
+    X, y = frame
+    _wrapper().fit_transform(X.iloc[:150], y.iloc[:150])
+    _wrapper().fit_transform(X.iloc[50:], y.iloc[50:])
+    _wrapper(with_mean=False).fit_transform(X.iloc[:150], y.iloc[:150])
+    _wrapper(dataset_key="other").fit_transform(X.iloc[:150], y.iloc[:150])
+    assert (fold_cache.hits, fold_cache.misses) == (0, 4)
+
+
+def test_transform_of_the_training_rows_reuses_the_fit(frame, fold_cache):
+    X, y = frame
+    wrapper = _wrapper()
+    Xt = wrapper.fit_transform(X.iloc[:150], y.iloc[:150])
+    assert wrapper.transform(X.iloc[:150]) is Xt
+    test = wrapper.transform(X.iloc[150:])
+    assert wrapper.transform(X.iloc[150:]) is test
+    assert fold_cache.stats()["entries"] == 2
+
+
+def test_without_dataset_key_the_wrapper_delegates(frame, fold_cache):
+    X, y = frame
+    Xt = _wrapper(dataset_key=None).fit_transform(X, y)
+    np.testing.assert_allclose(Xt, StandardScaler().fit_transform(X))
+    assert fold_cache.stats()["entries"] == 0
+
+
+def test_shared_directory_serves_other_processes(frame, fold_cache, tmp_path):
+    X, y = frame
+    Xt = _wrapper(directory=str(tmp_path)).fit_transform(X.iloc[:150], y.iloc[:150])
+    assert len(list((tmp_path / "data").glob("fit-*.joblib"))) == 1
+
+    # A fresh in-memory cache stands for another process.
+    other = cache.FoldCache(cache.DEFAULT_MAX_BYTES)
+    cache._FOLD_CACHE = other
+    shared = _wrapper(directory=str(tmp_path)).fit_transform(X.iloc[:150], y.iloc[:150])
+    assert isinstance(shared, np.memmap)
+    np.testing.assert_array_equal(shared, Xt)
+    assert (other.shared_hits, other.misses) == (1, 0)
+
+    cache.clear_shared_cache(tmp_path)
+    assert not tmp_path.exists()
+
+
+def test_in_memory_cache_is_bounded(frame):
+    block = frame[0].iloc[:100].to_numpy()
+    fold_cache = cache.FoldCache(max_bytes=2 * block.nbytes)
+    for start in range(4):
+        fold_cache.put(("fit", "data", str(start)), block, block.nbytes)
+    assert fold_cache.stats()["entries"] == 2
+    assert fold_cache.get(("fit", "data", "0")) is None
+    assert fold_cache.get(("fit", "data", "3")) is not None
+
+
+def test_unwrap_returns_a_copy(frame, fold_cache):
+    X, y = frame
+    pipeline = Pipeline([("preprocessor", _wrapper()), ("classifier", LogisticRegression())])
+    pipeline.fit(X, y)
+    unwrapped = cache.unwrap_cached_preprocessor(pipeline)
+    assert isinstance(unwrapped.steps[0][1], StandardScaler)
+    assert isinstance(pipeline.steps[0][1], cache.FoldCachedPreprocessor)
+    np.testing.assert_array_equal(unwrapped.predict(X), pipeline.predict(X))
@@ -0,0 +1,108 @@
+"""
+Epoch-level MLP search (src/evaluation/epoch_search.py): early stopping,
+pruning and the fallback of solvers without partial_fit.
+"""
+
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_breast_cancer
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.evaluation.epoch_search import EpochSearchCV, train_epochs
+
+OPTIONS = {
+    "batch_size": None,
+    "validation_fraction": 0.2,
+    "patience": 3,
+    "tol": 1e-4,
+    "max_epochs": 40,
+    "prune_margin": None,
+    "min_epochs": 1,
+    "check_every": 1,
+    "random_state": 0,
+}
+
+
+@pytest.fixture(scope="module")
+def train_split():
+    X, y = load_breast_cancer(return_X_y=True)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+    return StandardScaler().fit_transform(X_train), y_train
+
+
+def _macro_f1(clf, X, y):
+    return f1_score(y, clf.predict(X), average="macro")
+
+
+def _search(**options):
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("classifier", MLPClassifier(hidden_layer_sizes=(8,), max_iter=40, random_state=0)),
+    ])
+    grid = {
+        "classifier__solver": ["adam", "lbfgs"],
+        "classifier__learning_rate_init": [1e-2, 1e-5],
+    }
+    cv = StratifiedKFold(n_splits=3, shuffle=True, random_state=0)
+    return EpochSearchCV(
+        pipeline, grid, scoring="f1_macro", cv=cv, patience=3, max_epochs=40, random_state=0,
+        **options,
+    )
+
+
+def test_early_stopping_restores_the_best_epoch(train_split):
+    X, y = train_split
+    clf = MLPClassifier(hidden_layer_sizes=(8,), learning_rate_init=0.05, random_state=0)
+    (trainer,) = train_epochs([clf], X, y, _macro_f1, OPTIONS)
+
+    scores = [score for _, _, score in trainer.curve]
+    assert trainer.epoch == len(scores) <= OPTIONS["max_epochs"]
+    assert trainer.best_score == max(scores)
+    if trainer.epoch < OPTIONS["max_epochs"]:
+        # Stopped after `patience` epochs without an improvement larger than tol.
+        assert trainer.no_improvement >= OPTIONS["patience"]
+
+    # The restored weights give the best validation score again.
+    _, X_val, _, y_val = train_test_split(
+        X, y, test_size=OPTIONS["validation_fraction"], stratify=y, random_state=0
+    )
+    assert _macro_f1(trainer.clf, X_val, y_val) == pytest.approx(trainer.best_score)
+
+
+def test_search_counts_epochs_and_falls_back_for_lbfgs(train_split):
+    X, y = train_split
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        search = _search().fit(X, y)
+
+    results = search.cv_results_
+    lbfgs = np.array([p["classifier__solver"] == "lbfgs" for p in results["params"]])
+    assert np.isnan(results["mean_n_epochs"][lbfgs]).all()
+    assert (results["mean_n_epochs"][~lbfgs] <= 40).all()
+    assert not np.isnan(results["mean_test_score"]).any()
+    assert {row["fold"] for row in search.learning_curves_} == {0, 1, 2}
+    assert search.best_estimator_.predict(X).shape == y.shape
+
+
+def test_pruning_stops_the_candidates_behind(train_split):
+    X, y = train_split
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        search = _search(prune_margin=0.05, min_epochs=2, check_every=1).fit(X, y)
+
+    results = search.cv_results_
+    slow = np.array(
+        [p == {"classifier__solver": "adam", "classifier__learning_rate_init": 1e-5}
+         for p in results["params"]]
+    )
+    lbfgs = np.array([p["classifier__solver"] == "lbfgs" for p in results["params"]])
+    # The tiny learning rate falls behind on every fold; lbfgs is never pruned.
+    assert results["n_folds_pruned"][slow].item() == 3
+    assert (results["n_folds_pruned"][lbfgs] == 0).all()
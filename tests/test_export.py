@@ -0,0 +1,85 @@
+"""
+Parity of the NumPy predictor (src/inference/npy_predictor.py) with the
+scikit-learn pipelines it is compiled from.
+"""
+
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.datasets import load_breast_cancer, load_iris
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC, LinearSVC
+from sklearn.tree import DecisionTreeClassifier
+
+from src.inference.export import check_parity, compile_pipeline, save_compiled
+from src.inference.npy_predictor import CompiledPredictor
+
+ESTIMATORS = {
+    "logistic": lambda: LogisticRegression(max_iter=5000),
+    "linear_svc": lambda: LinearSVC(max_iter=20000),
+    "gaussian_nb": lambda: GaussianNB(),
+    "svc_linear": lambda: SVC(kernel="linear"),
+    "svc_rbf": lambda: SVC(kernel="rbf", gamma="scale"),
+    "svc_poly": lambda: SVC(kernel="poly", degree=2, gamma=0.05, coef0=1.0),
+    "svc_sigmoid": lambda: SVC(kernel="sigmoid", gamma=0.01),
+    "decision_tree": lambda: DecisionTreeClassifier(max_depth=6, random_state=0),
+    "mlp": lambda: MLPClassifier(hidden_layer_sizes=(16, 8), max_iter=2000, random_state=0),
+}
+
+MULTICLASS = ("logistic", "linear_svc", "gaussian_nb", "decision_tree", "mlp")
+
+
+def _pipeline(estimator, columns, scaled=True) -> Pipeline:
+    half = len(columns) // 2
+    transformers = [
+        ("num", StandardScaler(), columns[:half]),
+        ("raw", "passthrough", columns[half:]),
+    ]
+    if scaled:
+        transformers = [("num", StandardScaler(), columns)]
+    return Pipeline([("preprocessor", ColumnTransformer(transformers)), ("classifier", estimator)])
+
+
+def _compiled(pipeline, tmp_path) -> CompiledPredictor:
+    path = tmp_path / "compiled.npz"
+    save_compiled(compile_pipeline(pipeline), path)
+    return CompiledPredictor.load(path)
+
+
+@pytest.fixture(scope="module")
+def breast_cancer():
+    X, y = load_breast_cancer(return_X_y=True, as_frame=True)
+    return X, y
+
+
+@pytest.mark.parametrize("name", sorted(ESTIMATORS))
+def test_binary_parity(name, breast_cancer, tmp_path):
+    X, y = breast_cancer
+    pipeline = _pipeline(ESTIMATORS[name](), list(X.columns)).fit(X, y)
+    report = check_parity(pipeline, _compiled(pipeline, tmp_path), X)
+    assert report["prediction_mismatches"] == 0
+
+
+@pytest.mark.parametrize("name", MULTICLASS)
+def test_multiclass_parity(name, tmp_path):
+    X, y = load_iris(return_X_y=True, as_frame=True)
+    pipeline = _pipeline(ESTIMATORS[name](), list(X.columns)).fit(X, y)
+    report = check_parity(pipeline, _compiled(pipeline, tmp_path), X)
+    assert report["prediction_mismatches"] == 0
+
+
+def test_passthrough_columns(breast_cancer, tmp_path):
+    X, y = breast_cancer
+    pipeline = _pipeline(LogisticRegression(max_iter=5000), list(X.columns), scaled=False).fit(X, y)
+    report = check_parity(pipeline, _compiled(pipeline, tmp_path), X)
+    assert report["prediction_mismatches"] == 0
+
+
+def test_unsupported_pipeline_is_rejected(breast_cancer):
+    X, y = breast_cancer
+    pipeline = Pipeline([("classifier", LogisticRegression(max_iter=5000))]).fit(X, y)
+    with pytest.raises(NotImplementedError):
+        compile_pipeline(pipeline)
@@ -0,0 +1,79 @@
+"""
+Raw dataset sources (src/data/ingestion.py): source resolution, parallel
+CSV parsing by byte ranges, downcasting and the synthetic source.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config.config import Config
+from src.data import ingestion
+
+
+@pytest.fixture(scope="module")
+def dataset_cfg():
+    return replace(
+        Config().dataset, id_column="id", use_sklearn_loader=False, csv_path=None, ingestion={}
+    )
+
+
+@pytest.fixture(scope="module")
+def raw_csv(tmp_path_factory, dataset_cfg):
+    df = ingestion._load_sklearn(dataset_cfg, None, {})
+    path = tmp_path_factory.mktemp("raw") / "data.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def test_source_resolution(dataset_cfg, raw_csv):
+    path, _ = raw_csv
+    assert ingestion.resolve_source(dataset_cfg) == ("sklearn", None)
+    assert ingestion.resolve_source(replace(dataset_cfg, csv_path=str(path))) == ("csv", path)
+
+    synthetic = replace(dataset_cfg, ingestion={"source": "synthetic"})
+    assert ingestion.resolve_source(synthetic) == ("synthetic", None)
+
+    with pytest.raises(ValueError, match="Unknown dataset source"):
+        ingestion.resolve_source(replace(dataset_cfg, ingestion={"source": "hdf5"}))
+    with pytest.raises(FileNotFoundError):
+        ingestion.resolve_source(replace(dataset_cfg, ingestion={"path": str(path) + ".missing"}))
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_csv_ranges_parse_every_row_once(dataset_cfg, raw_csv, n_jobs):
+    path, df = raw_csv
+    options = {"path": str(path), "chunk_mb": 0.01, "n_jobs": n_jobs}
+    assert len(ingestion._csv_ranges(path, 0, int(0.01 * 1024**2))) > 5
+
+    loaded = ingestion.load_source(replace(dataset_cfg, ingestion=options))
+    assert loaded.columns.tolist() == df.columns.tolist()
+    assert loaded["mean radius"].dtype == np.float32
+    assert loaded[dataset_cfg.target_column].dtype == np.int8
+    np.testing.assert_array_equal(loaded[dataset_cfg.id_column], df[dataset_cfg.id_column])
+    np.testing.assert_allclose(loaded["mean radius"], df["mean radius"], rtol=1e-6)
+
+
+def test_csv_without_downcast_keeps_float64(dataset_cfg, raw_csv):
+    path, df = raw_csv
+    options = {"path": str(path), "downcast": False, "n_jobs": 1}
+    loaded = ingestion.load_source(replace(dataset_cfg, ingestion=options))
+    pd.testing.assert_frame_equal(loaded, pd.read_csv(path))
+
+
+def test_downcast_frame():
+    df = pd.DataFrame({"x": [0.5, 1.5], "target": [0.0, 1.0]})
+    out = ingestion.downcast_frame(df, "target")
+    assert out["x"].dtype == np.float32
+    assert out["target"].dtype == np.int8
+
+
+def test_synthetic_source(dataset_cfg):
+    options = {"source": "synthetic", "synthetic": {"n_rows": 1000, "width": 2, "random_state": 3}}
+    cfg = replace(dataset_cfg, ingestion=options)
+    df = ingestion.load_source(cfg)
+    assert df.shape == (1000, 2 + 60)
+    assert set(df[dataset_cfg.target_column].unique()) == {0, 1}
+    pd.testing.assert_frame_equal(ingestion.load_source(cfg), df)
@@ -0,0 +1,64 @@
+"""
+Binary table storage (src/utils/io.py): npy tables read back through
+memory maps, with the csv format as a plain-text alternative.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import io
+
+
+@pytest.fixture()
+def frame():
+    return pd.DataFrame({
+        "mean radius": np.linspace(0.0, 1.0, 6),
+        "count": np.arange(6, dtype=np.int32),
+        "name": list("uvwxyz"),
+        "flag": [True, False] * 3,
+        "target": np.array([0, 1, 0, 1, 1, 0], dtype=np.int64),
+    })
+
+
+def _memory_mapped(values: np.ndarray) -> bool:
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = values.base
+    return False
+
+
+def test_npy_table_round_trip(frame, tmp_path):
+    path = io.save_table(frame, tmp_path, "table", "npy")
+    assert path == tmp_path / "table" and path.is_dir()
+
+    loaded = io.load_table(path)
+    assert loaded.columns.tolist() == frame.columns.tolist()
+    for col in ("mean radius", "count", "flag", "target"):
+        assert loaded[col].dtype == frame[col].dtype
+        np.testing.assert_array_equal(loaded[col].to_numpy(), frame[col].to_numpy())
+    assert loaded["name"].tolist() == frame["name"].tolist()
+
+
+def test_npy_columns_are_memory_mapped(frame, tmp_path):
+    path = io.save_table(frame, tmp_path, "table", "npy")
+    assert _memory_mapped(io.load_table(path)["mean radius"].to_numpy())
+    assert not _memory_mapped(io.load_table(path, mmap=False)["mean radius"].to_numpy())
+
+
+def test_saving_again_replaces_the_table(frame, tmp_path):
+    io.save_table(frame, tmp_path, "table", "npy")
+    path = io.save_table(frame.iloc[:2, :2], tmp_path, "table", "npy")
+    loaded = io.load_table(path)
+    assert loaded.shape == (2, 2)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_csv_table_and_unknown_format(frame, tmp_path):
+    path = io.save_table(frame, tmp_path, "table", "csv")
+    assert path.name == "table.csv"
+    pd.testing.assert_frame_equal(io.load_table(path), frame, check_dtype=False)
+
+    with pytest.raises(ValueError, match="Unknown table format"):
+        io.save_table(frame, tmp_path, "table", "feather")
@@ -0,0 +1,70 @@
+"""
+Content-addressed training manifest (src/training/manifest.py) behind
+`scripts/train.py --incremental`.
+"""
+
+import copy
+from dataclasses import replace
+
+import pytest
+
+from src.config.config import Config
+from src.models.logistic import LogisticRegressionModel
+from src.training import manifest
+
+
+@pytest.fixture()
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "PROJECT_ROOT", tmp_path)
+    artifact = tmp_path / "models" / "model.joblib"
+    artifact.parent.mkdir()
+    artifact.write_bytes(b"fitted")
+    return tmp_path, artifact
+
+
+def _fingerprint(config, grid=None, data="data"):
+    model_cfg = config.models.models["logistic"]
+    grid = grid or {"C": [0.1, 1.0]}
+    return manifest.model_fingerprint(config, model_cfg, LogisticRegressionModel, grid, data)
+
+
+def test_recorded_model_is_up_to_date_until_an_artifact_changes(project):
+    root, artifact = project
+    entries = manifest.TrainingManifest(root / "manifest.json")
+    entries.record("logistic", "abc", [artifact])
+
+    reloaded = manifest.TrainingManifest(root / "manifest.json")
+    assert reloaded.is_up_to_date("logistic", "abc")
+    assert not reloaded.is_up_to_date("logistic", "def")
+    assert not reloaded.is_up_to_date("svm", "abc")
+
+    artifact.write_bytes(b"edited")
+    assert not reloaded.is_up_to_date("logistic", "abc")
+    artifact.unlink()
+    assert not reloaded.is_up_to_date("logistic", "abc")
+
+
+def test_directory_digest_covers_names_and_contents(tmp_path):
+    table = tmp_path / "table"
+    table.mkdir()
+    (table / "a.npy").write_bytes(b"1")
+    digest = manifest.file_digest(table)
+    assert manifest.file_digest(table) == digest
+
+    (table / "a.npy").write_bytes(b"2")
+    edited = manifest.file_digest(table)
+    assert edited != digest
+    (table / "a.npy").rename(table / "b.npy")
+    assert manifest.file_digest(table) != edited
+
+
+def test_fingerprint_changes_with_every_input():
+    config = Config()
+    reference = _fingerprint(config)
+    assert _fingerprint(config) == reference
+    assert _fingerprint(config, grid={"C": [1.0]}) != reference
+    assert _fingerprint(config, data="other") != reference
+
+    other = copy.copy(config)
+    other.training = replace(config.training, cv={**config.training.cv, "n_splits": 3})
+    assert _fingerprint(other) != reference
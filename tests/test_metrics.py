@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from sklearn.metrics import classification_report, confusion_matrix
+
+from src.evaluation.metrics import classification_report_from_confusion
+
+
+@pytest.mark.parametrize("n_classes", [2, 3, 5])
+def test_report_from_confusion_matches_sklearn(n_classes):
+    rng = np.random.default_rng(n_classes)
+    y_true = rng.integers(0, n_classes, 500)
+    y_pred = np.where(rng.random(500) < 0.7, y_true, rng.integers(0, n_classes, 500))
+    names = [f"class_{k}" for k in range(n_classes)]
+    labels = np.arange(n_classes)
+
+    cm = confusion_matrix(y_true, y_pred, labels=labels)
+    for digits in (2, 4):
+        expected = classification_report(
+            y_true, y_pred, labels=labels, target_names=names, digits=digits
+        )
+        assert classification_report_from_confusion(cm, names, digits=digits) == expected
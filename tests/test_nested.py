@@ -0,0 +1,81 @@
+"""
+Nested cross-validation (src/evaluation/nested.py): outer folds, scores of
+the chosen model on held-out rows and the per-model summary.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import load_breast_cancer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.evaluation import nested
+
+
+@pytest.fixture(scope="module")
+def train_split():
+    X, y = load_breast_cancer(return_X_y=True)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+    return X_train, y_train
+
+
+def test_outer_folds_partition_every_repeat(train_split):
+    _, y = train_split
+    folds = nested.outer_folds({"n_splits": 3, "n_repeats": 2, "random_state": 0}, y)
+    assert [f.name for f in folds] == ["r0f0", "r0f1", "r0f2", "r1f0", "r1f1", "r1f2"]
+    for repeat in (0, 1):
+        tests = [f.test_rows for f in folds if f.repeat == repeat]
+        np.testing.assert_array_equal(np.sort(np.concatenate(tests)), np.arange(len(y)))
+    for fold in folds:
+        assert not np.intersect1d(fold.train_rows, fold.test_rows).size
+        # Stratified: the class balance of every held-out part follows y.
+        assert abs(y[fold.test_rows].mean() - y.mean()) < 0.02
+    assert (folds[0].test_rows != folds[3].test_rows).any()
+
+
+def test_outer_fold_is_scored_on_held_out_rows(train_split):
+    X, y = train_split
+    (fold, *_) = nested.outer_folds({"n_splits": 3, "random_state": 0}, y)
+    search = GridSearchCV(
+        make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+        {"logisticregression__C": [0.01, 1.0]},
+        scoring="f1_macro",
+        cv=3,
+    ).fit(X[fold.train_rows], y[fold.train_rows])
+
+    X_test, y_test = X[fold.test_rows], y[fold.test_rows]
+    row = nested.score_outer_fold(search, X_test, y_test, "f1_macro")
+    expected = f1_score(y_test, search.best_estimator_.predict(X_test), average="macro")
+    assert row["outer_score"] == pytest.approx(expected)
+    assert row["f1_macro"] == row["outer_score"]
+    assert row["inner_score"] == search.best_score_
+    assert json.loads(row["params"]) == search.best_params_
+
+    roc = nested.score_outer_fold(search, X_test, y_test, "roc_auc")
+    assert 0.5 < roc["outer_score"] <= 1.0
+
+
+def test_summary_per_model():
+    metrics = {m: [0.9, 0.8, 0.7] for m in nested.REPORTED_METRICS}
+    results = pd.DataFrame({
+        "model": ["svm", "svm", "logistic"],
+        "inner_score": [0.95, 0.85, 0.9],
+        "outer_score": [0.9, 0.8, 0.7],
+        "params": ['{"C": 1}', '{"C": 1}', '{"C": 0.1}'],
+        **metrics,
+    })
+    summary = nested.summarise(results)
+    assert summary["model"].tolist() == ["svm", "logistic"]
+    svm = summary.iloc[0]
+    assert svm["n_outer_folds"] == 2
+    assert svm["outer_score_mean"] == pytest.approx(0.85)
+    assert svm["outer_score_std"] == pytest.approx(np.std([0.9, 0.8], ddof=1))
+    assert svm["optimism"] == pytest.approx(0.9 - 0.85)
+    assert svm["params_mode"] == '{"C": 1}' and svm["params_stability"] == 1.0
+    assert np.isnan(summary.iloc[1]["outer_score_std"])
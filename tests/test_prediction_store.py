@@ -0,0 +1,106 @@
+"""
+Prediction store (src/evaluation/prediction_store.py) and the out-of-fold
+outputs kept by the search engines (FoldSearchCV.fold_outputs_).
+"""
+
+import numpy as np
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.datasets import load_breast_cancer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from src.evaluation import prediction_store
+from src.evaluation.fold_search import FoldSearchCV
+from src.evaluation.nb_search import SmoothingSearchCV
+from src.evaluation.neighbors_search import NeighborsSearchCV
+from src.evaluation.tree_search import TreeSearchCV
+
+CV = StratifiedKFold(n_splits=5, shuffle=True, random_state=0)
+
+
+@pytest.fixture(scope="module")
+def train_split():
+    X, y = load_breast_cancer(return_X_y=True, as_frame=True)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+    return X_train, y_train
+
+
+@pytest.fixture()
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(prediction_store, "MODELS_PREDICTIONS_DIR", tmp_path)
+    return tmp_path
+
+
+def _pipeline(estimator, columns) -> Pipeline:
+    return Pipeline([
+        ("preprocessor", ColumnTransformer([("num", StandardScaler(), list(columns))])),
+        ("classifier", estimator),
+    ])
+
+
+def test_parts_are_written_and_read_separately(store_dir):
+    rows = np.array([4, 1, 3])
+    labels = np.array([0, 1, 1])
+    scores = np.array([[0.8, 0.2], [0.3, 0.7], [0.4, 0.6]])
+    prediction_store.write_predictions(
+        "model", "oof", rows, labels, labels, scores, ["score_0", "score_1"], folds=[1, 0, 1]
+    )
+    assert prediction_store.load_predictions("model", "test").empty
+
+    prediction_store.write_predictions("model", "test", rows[:2], labels[:2], labels[:2])
+    oof = prediction_store.load_predictions("model", "oof")
+    assert oof["fold"].tolist() == [0, 1, 1]
+    assert oof["row"].tolist() == [1, 3, 4]
+    assert oof["score_1"].dtype == np.float32
+
+    both = prediction_store.load_predictions("model")
+    assert both["fold"].tolist() == [prediction_store.TEST_FOLD] * 2 + [0, 1, 1]
+    assert prediction_store.stored_models() == ["model"]
+
+
+def test_unknown_part_is_rejected(store_dir):
+    with pytest.raises(ValueError, match="Unknown prediction part"):
+        prediction_store.store_path("model", "train")
+
+
+@pytest.mark.parametrize(
+    "search_cls, estimator, grid",
+    [
+        (FoldSearchCV, LogisticRegression(), {"classifier__C": [0.1, 1.0]}),
+        (NeighborsSearchCV, KNeighborsClassifier(), {"classifier__n_neighbors": [3, 7]}),
+        (SmoothingSearchCV, GaussianNB(), {"classifier__var_smoothing": [1e-9, 1e-3]}),
+        (TreeSearchCV, DecisionTreeClassifier(random_state=0), {"classifier__max_depth": [3, 8]}),
+    ],
+)
+def test_search_keeps_the_out_of_fold_outputs_of_the_best_candidate(
+    train_split, search_cls, estimator, grid
+):
+    X, y = train_split
+    search = search_cls(
+        _pipeline(estimator, X.columns), grid, scoring="f1_macro", cv=CV, keep_outputs_mb=16
+    ).fit(X, y)
+    folds, predictions, scores, names = search.fold_outputs_
+
+    # Same rows, folds and outputs as refitting the best candidate on every fold.
+    ref_folds, ref_predictions, ref_scores, ref_names = prediction_store.out_of_fold(
+        search.best_estimator_, X, y, CV
+    )
+    np.testing.assert_array_equal(folds, ref_folds)
+    np.testing.assert_array_equal(predictions, ref_predictions)
+    np.testing.assert_allclose(scores, ref_scores, atol=1e-6)
+    assert names == ref_names
+
+
+def test_outputs_over_budget_are_not_kept(train_split):
+    X, y = train_split
+    search = FoldSearchCV(
+        _pipeline(LogisticRegression(), X.columns), {"classifier__C": [0.1, 1.0]},
+        scoring="f1_macro", cv=CV, keep_outputs_mb=1e-3,
+    ).fit(X, y)
+    assert search.fold_outputs_ is None
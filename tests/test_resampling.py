@@ -0,0 +1,101 @@
+"""
+Bootstrap intervals and paired tests (src/evaluation/resampling.py and
+scripts/build_summary.py) computed from stored predictions and fold scores.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import f1_score
+
+from scripts import build_summary
+from src.evaluation import resampling
+
+OPTIONS = {"n_resamples": 4000, "confidence": 0.95, "random_state": 0}
+
+
+@pytest.fixture(scope="module")
+def predictions():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 300)
+    good = np.where(rng.random(300) < 0.95, y, 1 - y)
+    bad = np.where(rng.random(300) < 0.75, y, 1 - y)
+    return y, good, bad
+
+
+def _frame(y, pred, rows=None):
+    rows = np.arange(len(y)) if rows is None else rows
+    return pd.DataFrame({"row": rows, "label": y, "prediction": pred})
+
+
+def test_multinomial_bootstrap_matches_row_resampling(predictions):
+    y, good, _ = predictions
+    score, resampled = resampling.bootstrap_scores(
+        y, good, "f1_macro", n_resamples=4000, random_state=0
+    )
+    assert score == pytest.approx(f1_score(y, good, average="macro"))
+
+    rng = np.random.default_rng(1)
+    rows = rng.integers(0, len(y), size=(1000, len(y)))
+    reference = [f1_score(y[r], good[r], average="macro") for r in rows]
+    assert resampled.mean() == pytest.approx(np.mean(reference), abs=2e-3)
+    assert resampled.std() == pytest.approx(np.std(reference), rel=0.1)
+
+    ci = resampling.bootstrap_metric(y, good, "f1_macro", **OPTIONS)
+    assert ci["ci_low"] < ci["score"] < ci["ci_high"]
+
+    with pytest.raises(ValueError, match="label-based metric"):
+        resampling.bootstrap_metric(y, good, "roc_auc", **OPTIONS)
+
+
+def test_paired_bootstrap_detects_the_better_model(predictions):
+    y, good, bad = predictions
+    test = resampling.paired_bootstrap(y, good, bad, "accuracy", **OPTIONS)
+    assert test["diff"] == pytest.approx((good == y).mean() - (bad == y).mean())
+    assert 0 < test["ci_low"] < test["diff"] < test["ci_high"]
+    assert test["p_value"] < 0.01
+
+    same = resampling.paired_bootstrap(y, good, good, "accuracy", **OPTIONS)
+    assert same["diff"] == 0 and same["p_value"] == 1.0
+
+
+def test_corrected_ttest_is_more_conservative():
+    a = np.array([0.95, 0.96, 0.94, 0.97, 0.95])
+    b = np.array([0.94, 0.94, 0.93, 0.95, 0.95])
+    corrected = resampling.corrected_ttest(a, b, test_train_ratio=1 / 4)
+    plain = resampling.corrected_ttest(a, b, test_train_ratio=0.0)
+    assert corrected["diff"] == pytest.approx(0.012)
+    assert plain["p_value"] < corrected["p_value"] < 1
+    tie = resampling.corrected_ttest(a, a, 0.25)
+    assert tie["diff"] == 0 and np.isnan(tie["t"]) and tie["p_value"] == 1.0
+
+
+def test_summary_intervals_and_pairwise_tests(predictions):
+    y, good, bad = predictions
+    stored = {
+        "good": _frame(y, good),
+        "bad": _frame(y, bad),
+        "shifted": _frame(y, bad, np.arange(len(y)) + 1),
+    }
+    cv_scores = {
+        "good": np.array([0.95, 0.96, 0.94]),
+        "bad": np.array([0.8, 0.82, 0.79]),
+        "streaming": np.array([0.9, 0.9, 0.9]),
+    }
+    kfold = "StratifiedKFold(n_splits=3)"
+    schemes = {"good": kfold, "bad": kfold, "streaming": "hash_folds(n_splits=3)"}
+
+    intervals = build_summary.bootstrap_intervals(stored, cv_scores, OPTIONS).set_index("model")
+    row = intervals.loc["good"]
+    assert row["accuracy_ci_low"] < (good == y).mean() < row["accuracy_ci_high"]
+    assert row["cv_best_score_ci_low"] <= 0.95 <= row["cv_best_score_ci_high"]
+    assert np.isnan(intervals.loc["streaming", "accuracy_ci_low"])
+
+    pairs = build_summary.pairwise_tests(stored, cv_scores, schemes, "accuracy", OPTIONS)
+    pairs = pairs.set_index(["model_a", "model_b"])
+    assert pairs.loc[("bad", "good"), "test_diff"] < 0
+    assert pairs.loc[("bad", "good"), "cv_diff"] == pytest.approx(-0.1466, abs=1e-3)
+    # Different rows or different folds: the corresponding test is skipped.
+    assert np.isnan(pairs.loc[("bad", "shifted"), "test_diff"])
+    assert np.isnan(pairs.loc[("bad", "streaming"), "cv_p_value"])
+    assert np.isnan(pairs.loc[("good", "streaming"), "cv_p_value"])
@@ -0,0 +1,72 @@
+"""
+Model-level scheduling (src/training/scheduler.py): core budget split,
+longest-first order and the job runner.
+"""
+
+import pytest
+
+from src.training import scheduler
+
+
+def _cores(name, n_jobs=None):
+    return name, n_jobs
+
+
+def _fail_on_b(name, n_jobs=None):
+    if name == "b":
+        raise RuntimeError("boom")
+    return name
+
+
+def test_core_budget_follows_joblib_conventions(monkeypatch):
+    monkeypatch.setattr(scheduler, "available_cores", lambda: 8)
+    assert scheduler.resolve_core_budget(None) == 8
+    assert scheduler.resolve_core_budget(-1) == 8
+    assert scheduler.resolve_core_budget(-2) == 7
+    assert scheduler.resolve_core_budget(3) == 3
+    assert scheduler.resolve_core_budget(32) == 8
+
+
+@pytest.mark.parametrize(
+    "n_models, n_cores, max_parallel, expected",
+    [
+        (3, 8, 0, (3, 2)),
+        (5, 4, 2, (2, 2)),
+        (2, 7, -1, (2, 3)),
+        (8, 2, 0, (2, 1)),
+        (0, 4, 0, (1, 4)),
+    ],
+)
+def test_plan_core_split(n_models, n_cores, max_parallel, expected):
+    assert scheduler.plan_core_split(n_models, n_cores, max_parallel) == expected
+
+
+def test_longest_jobs_first_and_grid_cost():
+    assert scheduler.count_candidates([{"a": [1, 2], "b": [1, 2, 3]}, {"a": [0]}]) == 7
+    assert scheduler.grid_cost({"a": [1, 2, 3]}, n_splits=5) == 15
+    assert scheduler.order_longest_first([("small", 2), ("large", 30), ("medium", 10)]) == [
+        "large", "medium", "small",
+    ]
+
+
+def test_in_process_jobs_skip_failures():
+    seen = []
+    results = scheduler.run_jobs(
+        _fail_on_b, {name: (name,) for name in "abc"}, ["a", "b", "c"], n_workers=1,
+        on_result=lambda name, result: seen.append(name),
+    )
+    assert results == {"a": "a", "c": "c"}
+    assert seen == ["a", "c"]
+
+
+def test_pool_hands_leftover_cores_to_the_longest_jobs():
+    jobs = {name: (name,) for name in ("long", "short")}
+    results = scheduler.run_jobs(_cores, jobs, ["long", "short"], n_workers=2, n_cores=5)
+    # 5 cores for 2 jobs started together: the first (longest) one gets the remainder.
+    assert results == {"long": ("long", 3), "short": ("short", 2)}
+
+
+def test_pool_survives_a_failing_job():
+    jobs = {name: (name,) for name in "abc"}
+    results = scheduler.run_jobs(_fail_on_b, jobs, ["a", "b", "c"], n_workers=2)
+    assert results == {"a": "a", "c": "c"}
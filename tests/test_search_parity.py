@@ -0,0 +1,192 @@
+"""
+The specialised search engines (src/evaluation/*_search.py) must report
+what GridSearchCV reports for the same pipeline, grid and folds: same
+best_params_, best_score_ and mean_test_score of every candidate, on the
+training part of the breast-cancer split.
+"""
+
+import tracemalloc
+import warnings
+
+import numpy as np
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.datasets import load_breast_cancer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+from src.config.config import Config
+from src.evaluation.kernel_search import KernelSearchCV, gram_matrix
+from src.evaluation.nb_search import SmoothingSearchCV
+from src.evaluation.neighbors_search import NeighborsSearchCV
+from src.evaluation.path_search import RegularizationPathSearchCV
+from src.evaluation.tree_search import TreeSearchCV
+from src.models.logistic import LogisticRegressionModel
+
+SCORING = "f1_macro"
+# Largest mean_test_score drift of the warm-started path at the default solver
+# tolerance (2.3e-3 measured at C=100, see src/evaluation/path_search.py).
+PATH_ATOL = 5e-3
+
+
+@pytest.fixture(scope="module")
+def train_split():
+    X, y = load_breast_cancer(return_X_y=True, as_frame=True)
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+    return X_train, y_train
+
+
+def _pipeline(estimator, columns, scaled=True) -> Pipeline:
+    transformer = StandardScaler() if scaled else "passthrough"
+    return Pipeline([
+        ("preprocessor", ColumnTransformer([("num", transformer, list(columns))])),
+        ("classifier", estimator),
+    ])
+
+
+def _fit_both(search_cls, estimator, grid, train_split, scaled=True, **options):
+    X, y = train_split
+    common = {
+        "scoring": SCORING,
+        "cv": StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
+        "refit": True,
+        "return_train_score": True,
+    }
+    pipeline = _pipeline(estimator, X.columns, scaled)
+    reference = GridSearchCV(pipeline, grid, **common).fit(X, y)
+    search = search_cls(estimator=pipeline, param_grid=grid, **common, **options).fit(X, y)
+    return reference, search
+
+
+def _assert_same_search(reference, search, rows=slice(None), atol=0.0):
+    assert search.cv_results_["params"] == reference.cv_results_["params"]
+    np.testing.assert_allclose(
+        search.cv_results_["mean_test_score"][rows],
+        reference.cv_results_["mean_test_score"][rows],
+        atol=atol,
+    )
+    assert search.best_params_ == reference.best_params_
+    assert search.best_score_ == pytest.approx(reference.best_score_, abs=atol)
+
+
+def test_neighbors_search(train_split):
+    grid = {
+        "classifier__n_neighbors": [1, 3, 5, 7, 9, 15],
+        "classifier__weights": ["uniform", "distance"],
+        "classifier__p": [1, 2],
+    }
+    reference, search = _fit_both(NeighborsSearchCV, KNeighborsClassifier(), grid, train_split)
+    _assert_same_search(reference, search)
+
+
+def test_path_search(train_split):
+    grid = {
+        "classifier__C": [0.001, 0.01, 0.1, 1.0, 10.0, 100.0],
+        "classifier__max_iter": [5000],
+    }
+    reference, search = _fit_both(
+        RegularizationPathSearchCV, LogisticRegression(tol=1e-8), grid, train_split, path_param="C"
+    )
+    _assert_same_search(reference, search)
+
+
+def test_path_search_configured_grid(train_split):
+    # configs/models.yaml grid (max_iter=1000, default tol): lbfgs stops within
+    # its tolerance at a slightly different point for the weakest regularisation.
+    model_cfg = Config().models.models["logistic"]
+    model = LogisticRegressionModel(hyperparameters=model_cfg.hyperparameters)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        reference, search = _fit_both(
+            RegularizationPathSearchCV,
+            model.build_estimator(),
+            model.hyperparam_grid(),
+            train_split,
+            path_param=model_cfg.search["path_param"],
+        )
+    _assert_same_search(reference, search, atol=PATH_ATOL)
+
+
+def test_kernel_search(train_split, tmp_path):
+    grid = [
+        {
+            "classifier__kernel": ["rbf"],
+            "classifier__C": [0.1, 1.0, 10.0],
+            "classifier__gamma": ["scale", "auto", 0.01],
+        },
+        {"classifier__kernel": ["poly"], "classifier__C": [0.1, 1.0], "classifier__degree": [2, 3]},
+        {"classifier__kernel": ["linear"], "classifier__C": [0.01, 1.0]},
+    ]
+    # memmap_mb=0: every Gram matrix goes through the memory-mapped path.
+    reference, search = _fit_both(
+        KernelSearchCV, SVC(), grid, train_split, memmap_mb=0, cache_dir=str(tmp_path)
+    )
+    _assert_same_search(reference, search)
+
+
+def test_kernel_fit_reads_memmapped_gram_in_place(tmp_path):
+    # SVC.fit validates X as float64 / C order: gram_matrix's layout must not be copied.
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1500, 5))
+    K = gram_matrix(X, X, "rbf", {"gamma": 0.1}, memmap_path=tmp_path / "K.npy")
+    tracemalloc.start()
+    SVC(kernel="precomputed").fit(K, X[:, 0] > 0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < K.nbytes / 4
+
+
+def test_smoothing_search(train_split):
+    grid = {"classifier__var_smoothing": np.logspace(-12, 0, 25).tolist()}
+    reference, search = _fit_both(SmoothingSearchCV, GaussianNB(), grid, train_split, scaled=False)
+    _assert_same_search(reference, search, atol=1e-12)
+
+
+def test_tree_search(train_split):
+    grid = {
+        "classifier__criterion": ["gini", "entropy"],
+        "classifier__splitter": ["best", "random"],
+        "classifier__max_depth": [None, 2, 3, 5, 8],
+        "classifier__min_samples_split": [2, 5, 10, 20],
+        "classifier__min_samples_leaf": [1, 4],
+    }
+    reference, search = _fit_both(
+        TreeSearchCV, DecisionTreeClassifier(random_state=0), grid, train_split, scaled=False,
+        verify_top=10,
+    )
+    # Only fitted rows are scored and ranked; the pruning estimates rank last.
+    results = search.cv_results_
+    derived = np.asarray(results["derived_by_pruning"])
+    assert derived.any() and not derived.all()
+    assert np.isnan(results["mean_test_score"][derived]).all()
+    assert np.isnan(results["pruned_mean_test_score"][~derived]).all()
+    assert results["rank_test_score"][derived].min() > results["rank_test_score"][~derived].max()
+    np.testing.assert_allclose(
+        results["mean_test_score"][~derived], reference.cv_results_["mean_test_score"][~derived]
+    )
+    # The selection is GridSearchCV's among the fitted candidates.
+    fitted = np.flatnonzero(~derived)
+    best = fitted[np.argmax(reference.cv_results_["mean_test_score"][fitted])]
+    assert search.best_params_ == reference.cv_results_["params"][best]
+    assert search.best_score_ == reference.cv_results_["mean_test_score"][best]
+
+
+def test_tree_search_without_pruning(train_split):
+    grid = {
+        "classifier__criterion": ["gini", "entropy"],
+        "classifier__max_depth": [None, 3, 5],
+        "classifier__min_samples_split": [2, 10],
+        "classifier__min_samples_leaf": [1, 4],
+    }
+    reference, search = _fit_both(
+        TreeSearchCV, DecisionTreeClassifier(random_state=0), grid, train_split, scaled=False,
+        verify_top=None,
+    )
+    assert not np.any(search.cv_results_["derived_by_pruning"])
+    _assert_same_search(reference, search)
@@ -0,0 +1,103 @@
+"""
+Random, successive-halving and racing strategies of build_grid_search
+(src/evaluation/tuning.py, src/evaluation/racing.py).
+"""
+
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_breast_cancer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import GridSearchCV, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.evaluation.fold_search import FoldResults
+from src.evaluation.racing import RacingSearchCV
+from src.evaluation.tuning import build_grid_search
+
+SCORING = "f1_macro"
+GRID = {"classifier__C": [0.01, 0.1, 1.0, 10.0]}
+
+
+@pytest.fixture(scope="module")
+def data():
+    return load_breast_cancer(return_X_y=True)
+
+
+def _pipeline() -> Pipeline:
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("classifier", LogisticRegression(max_iter=1000)),
+    ])
+
+
+def _training_cfg(**search):
+    return SimpleNamespace(
+        cv={"n_splits": 4, "shuffle": True, "random_state": 0},
+        scoring=SCORING,
+        refit_metric=SCORING,
+        n_jobs=1,
+        verbose=0,
+        random_state=0,
+        search=search,
+    )
+
+
+def test_random_search_caps_n_iter_at_the_grid_size(data):
+    search = build_grid_search(_pipeline(), GRID, _training_cfg(strategy="random", n_iter=50))
+    search.fit(*data)
+    assert search.n_iter == len(GRID["classifier__C"])
+    assert sorted(p["classifier__C"] for p in search.cv_results_["params"]) == GRID["classifier__C"]
+
+
+def test_halving_ranks_the_last_iteration_first(data):
+    search = build_grid_search(_pipeline(), GRID, _training_cfg(strategy="halving", factor=2))
+    search.fit(*data)
+    results = search.cv_results_
+    last = results["iter"] == results["iter"].max()
+    assert results["rank_test_score"][search.best_index_] == 1
+    assert results["rank_test_score"][last].max() < results["rank_test_score"][~last].min()
+
+
+def test_racing_without_elimination_matches_grid_search(data):
+    search = build_grid_search(_pipeline(), GRID, _training_cfg(strategy="racing", z=1e9))
+    search.fit(*data)
+    reference = GridSearchCV(_pipeline(), GRID, scoring=SCORING, cv=search.cv).fit(*data)
+    np.testing.assert_allclose(
+        search.cv_results_["mean_test_score"], reference.cv_results_["mean_test_score"]
+    )
+    assert search.best_params_ == reference.best_params_
+    assert (search.cv_results_["n_folds_evaluated"] == 4).all()
+
+
+def test_racing_eliminates_worse_candidates():
+    search = RacingSearchCV(_pipeline(), GRID, z=1.0)
+    scores = np.array([[0.90, 0.91, 0.92], [0.60, 0.61, 0.59], [0.905, 0.90, 0.925]])
+    assert list(search._eliminate(scores, np.array([3, 5, 7]))) == [3, 7]
+
+
+def test_failed_candidates_are_scored_nan_and_ranked_last(data):
+    grid = {"classifier__C": [0.1, 1.0, -1.0]}
+    cv = StratifiedKFold(n_splits=4, shuffle=True, random_state=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        reference = GridSearchCV(_pipeline(), grid, scoring=SCORING, cv=cv).fit(*data)
+        search = RacingSearchCV(_pipeline(), grid, scoring=SCORING, cv=cv, z=1e9).fit(*data)
+    results, expected = search.cv_results_, reference.cv_results_
+    np.testing.assert_allclose(results["mean_test_score"], expected["mean_test_score"])
+    assert list(results["rank_test_score"]) == list(expected["rank_test_score"])
+    # The failing candidate is dropped at the first elimination.
+    assert search.cv_results_["n_folds_evaluated"][2] == search.min_folds
+
+
+def test_fold_results_tell_failed_from_missing_entries():
+    results = FoldResults(2, 3)
+    results.record(0, 0, 0.8)
+    results.record(0, 1, np.nan)
+    results.record(1, 0, 0.7)
+    assert list(results.n_evaluated()) == [2, 1]
+    assert list(results.failed()) == [True, False]
+    assert np.isnan(results.mean_test_scores()[0]) and results.mean_test_scores()[1] == 0.7
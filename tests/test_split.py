@@ -0,0 +1,86 @@
+"""
+Train/test split stored once (src/data/split.py): row positions over a
+single dataset table, and splits loaded back as memory-mapped views.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import load_breast_cancer
+from sklearn.model_selection import train_test_split
+
+from src.config.config import Config
+from src.data import split
+from src.utils.io import iter_table
+
+
+@pytest.fixture(scope="module")
+def config():
+    return Config()
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    X, y = load_breast_cancer(return_X_y=True, as_frame=True)
+    return X.assign(target=y)
+
+
+@pytest.fixture()
+def prepared(config, dataset, tmp_path):
+    splits = split.create_train_test_split(config, dataset, directory=tmp_path)
+    return splits, tmp_path
+
+
+def _memory_mapped(values: np.ndarray) -> bool:
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = values.base
+    return False
+
+
+def test_splits_are_contiguous_ranges_of_the_same_draw(config, dataset, prepared):
+    splits, directory = prepared
+    train_df, test_df = train_test_split(
+        dataset,
+        test_size=config.training.test_size,
+        random_state=config.training.random_state,
+        stratify=dataset["target"],
+    )
+    n_train = len(train_df)
+    np.testing.assert_array_equal(splits["train"], np.arange(n_train))
+    np.testing.assert_array_equal(splits["test"], np.arange(n_train, len(dataset)))
+    np.testing.assert_array_equal(splits["source_rows"][:n_train], train_df.index)
+    np.testing.assert_array_equal(splits["source_rows"][n_train:], test_df.index)
+
+    np.testing.assert_array_equal(split.split_rows("test", directory), splits["test"])
+    assert split.as_slice(splits["test"]) == slice(n_train, len(dataset))
+    assert (directory / "train.csv").exists() and (directory / "test.csv").exists()
+
+
+def test_load_split_returns_memory_mapped_views(config, dataset, prepared):
+    splits, directory = prepared
+    for name in ("train", "test"):
+        loaded = split.load_split(config, name, directory)
+        expected = dataset.take(splits["source_rows"][splits[name]])
+        np.testing.assert_array_equal(loaded.to_numpy(), expected.to_numpy())
+        assert loaded.columns.tolist() == dataset.columns.tolist()
+        assert _memory_mapped(loaded["mean radius"].to_numpy())
+
+
+def test_split_window_reads_the_same_rows_by_chunks(config, prepared):
+    splits, directory = prepared
+    window = split.as_slice(splits["test"])
+    chunks = list(iter_table(split.dataset_path(config, directory), 50, rows=window))
+    assert len(chunks) > 1
+    streamed = pd.concat(chunks, ignore_index=True)
+    loaded = split.load_split(config, "test", directory).reset_index(drop=True)
+    pd.testing.assert_frame_equal(streamed, loaded)
+
+
+def test_as_slice_and_missing_splits(config, tmp_path):
+    assert split.as_slice(np.array([3, 4, 5])) == slice(3, 6)
+    assert split.as_slice(np.array([3, 5, 6])) is None
+    assert split.as_slice(np.array([], dtype=int)) == slice(0, 0)
+    with pytest.raises(FileNotFoundError):
+        split.load_split(config, "train", tmp_path)
@@ -0,0 +1,84 @@
+"""
+Out-of-core training (src/training/streaming.py): running scaler
+statistics, hash folds and the chunked search on an npy table.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.datasets import load_breast_cancer
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from src.evaluation.crossval import hash_folds
+from src.features.preprocessing import StreamingScaler
+from src.training.streaming import StreamingSearch
+from src.utils.io import save_table
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    X, y = load_breast_cancer(return_X_y=True, as_frame=True)
+    return X.assign(target=y)
+
+
+def test_partial_fit_matches_standard_scaler(dataset):
+    numerical = ["mean radius", "mean texture", "worst area"]
+    scaler = StreamingScaler(numerical, passthrough=["target"])
+    for start in range(0, len(dataset), 97):
+        scaler.partial_fit(dataset.iloc[start:start + 97])
+
+    reference = StandardScaler().fit(dataset[numerical])
+    assert scaler.n_samples_seen_ == len(dataset)
+    np.testing.assert_allclose(scaler.mean_, reference.mean_)
+    np.testing.assert_allclose(scaler.var_, reference.var_)
+
+    Xt = scaler.transform(dataset)
+    np.testing.assert_allclose(Xt[:, :3], reference.transform(dataset[numerical]))
+    np.testing.assert_array_equal(Xt[:, 3], dataset["target"])
+
+
+def test_unscaled_columns_are_passed_through(dataset):
+    scaler = StreamingScaler(["mean radius"], with_scaling=False).fit(dataset)
+    np.testing.assert_array_equal(scaler.transform(dataset)[:, 0], dataset["mean radius"])
+
+
+def test_hash_folds_do_not_depend_on_the_chunks():
+    keys = np.arange(10_000)
+    folds = hash_folds(keys, n_splits=5, random_state=0)
+    chunked = np.concatenate([hash_folds(keys[i:i + 333], 5, 0) for i in range(0, len(keys), 333)])
+    np.testing.assert_array_equal(folds, chunked)
+
+    assert set(np.unique(folds)) == set(range(5))
+    assert np.bincount(folds).min() > 0.9 * len(keys) / 5
+    assert (hash_folds(keys, 5, random_state=1) != folds).any()
+    np.testing.assert_array_equal(hash_folds(pd.Index(keys), 5, 0), folds)
+
+
+def test_streaming_search_on_a_table(dataset, tmp_path):
+    path = save_table(dataset, tmp_path, "dataset", "npy")
+    features = [c for c in dataset.columns if c != "target"]
+    search = StreamingSearch(
+        SGDClassifier(random_state=0),
+        {"classifier__alpha": [1e-4, 1e-2], "classifier__loss": ["hinge", "log_loss"]},
+        numerical_features=features,
+        categorical_features=[],
+        target_column="target",
+        scoring="f1_macro",
+        n_splits=3,
+        chunk_rows=128,
+        n_epochs=3,
+        random_state=0,
+    ).fit(path)
+
+    results = search.cv_results_
+    assert len(results["params"]) == 4
+    assert search.n_samples_ == len(dataset)
+    assert search.best_score_ == results["mean_test_score"].max() > 0.85
+    assert results["rank_test_score"][search.best_index_] == 1
+    assert search.best_estimator_.predict(dataset).shape == (len(dataset),)
+
+    with pytest.raises(ValueError, match="only tunes classifier parameters"):
+        StreamingSearch(
+            SGDClassifier(), {"scaler__with_mean": [True]}, features, [], "target"
+        ).fit(path)